@@ -1,16 +1,19 @@
 import importlib.util
 import os
+import shutil
+import tempfile
+import zipfile
 import tkinter as tk
 from tkinterdnd2 import TkinterDnD, DND_FILES
 from tkinter import ttk, filedialog, messagebox
 from pdf2docx import Converter
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 import asyncio
+import collections
+import concurrent.futures
+import multiprocessing
+import queue
 import threading
 import time
-from prettytable import PrettyTable
 from pathlib import Path
 import logging
 import subprocess
@@ -19,8 +22,94 @@ import importlib
 import configparser
 import json
 
+# Große Dokumente werden wie in der Engine in Seitenbereichen konvertiert und
+# zusammengefügt; Schwelle, Aufteilung und Zusammenführung stammen aus src/sharding.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+from sharding import SHARD_THRESHOLD_PAGES, convert_sharded
+
+# Abstand, in dem der GUI-Thread Aktualisierungen aus dem Konvertierungs-Thread übernimmt
+UI_POLL_MS = 50
+# Höchstzahl der Dateinamen, die die Zusammenfassung einzeln aufführt
+SUMMARY_MAX_FAILED = 10
+# Sichtbare Zeilen im Log-Fenster, ältere Einträge stehen nur noch in LOG_HISTORY_FILE
+LOG_VISIBLE_ROWS = 500
+LOG_HISTORY_FILE = 'pdf_magic_history.log'
+
 logging.basicConfig(level=logging.INFO, filename='pdf_magic.log', filemode='a', format='%(asctime)s - %(levelname)s - %(message)s')
 
+class LogView:
+    """
+    Tabellarisches Log in einem tk.Text. Neue Zeilen werden nur angehängt, im
+    Fenster bleiben höchstens max_rows Zeilen (Ringpuffer), der vollständige
+    Verlauf wird fortlaufend in history_file geschrieben. Spaltenbreiten wachsen
+    mit jeder Zeile mit; nur wenn eine Spalte breiter wird, werden die sichtbaren
+    Zeilen neu ausgerichtet. Der Aufwand pro Meldung hängt so nicht vom Verlauf ab.
+    """
+
+    def __init__(self, text_widget, headers, align, max_rows=LOG_VISIBLE_ROWS, history_file=LOG_HISTORY_FILE):
+        """
+        :param text_widget: tk.Text, in das geschrieben wird.
+        :param headers: Spaltenüberschriften.
+        :param align: Ausrichtung je Spalte, 'l' oder 'r'.
+        :param max_rows: Anzahl sichtbarer Zeilen.
+        :param history_file: Datei für den vollständigen Verlauf, None schreibt keinen Verlauf.
+        """
+        self.text = text_widget
+        self.headers = list(headers)
+        self.align = list(align)
+        self.widths = [len(header) for header in self.headers]
+        self.rows = collections.deque(maxlen=max_rows)
+        self.history = None
+        if history_file:
+            try:
+                self.history = open(history_file, 'a', encoding='utf-8', buffering=1)
+            except OSError as e:
+                logging.error(f"Log-Verlauf kann nicht geschrieben werden: {str(e)}")
+        self._render_all()
+
+    def add_row(self, cells):
+        cells = [' '.join(str(cell).split()) for cell in cells]
+        if self.history:
+            self.history.write('\t'.join(cells) + '\n')
+        widened = False
+        for i, cell in enumerate(cells):
+            if len(cell) > self.widths[i]:
+                self.widths[i] = len(cell)
+                widened = True
+
+        dropped = len(self.rows) == self.rows.maxlen
+        self.rows.append(cells)
+        if widened:
+            self._render_all()
+            return
+        self.text.config(state=tk.NORMAL)
+        if dropped:
+            # Erste Datenzeile nach Rahmen, Überschrift und Rahmen entfernen
+            self.text.delete('4.0', '5.0')
+        self.text.insert(tk.END, self._format_row(cells) + '\n')
+        self.text.config(state=tk.DISABLED)
+        self.text.see(tk.END)
+
+    def close(self):
+        if self.history:
+            self.history.close()
+            self.history = None
+
+    def _format_row(self, cells):
+        parts = [cell.ljust(width) if align == 'l' else cell.rjust(width)
+                 for cell, width, align in zip(cells, self.widths, self.align)]
+        return '| ' + ' | '.join(parts) + ' |'
+
+    def _render_all(self):
+        border = '+' + '+'.join('-' * (width + 2) for width in self.widths) + '+'
+        lines = [border, self._format_row(self.headers), border]
+        lines.extend(self._format_row(cells) for cells in self.rows)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, '\n'.join(lines) + '\n')
+        self.text.config(state=tk.DISABLED)
+        self.text.see(tk.END)
+
 class PDFMagicApp:
 
 # ------ GUI Setup ------
@@ -31,6 +120,9 @@ class PDFMagicApp:
         self.root.title("PDF Magic")
         self.root.geometry("900x700")
         self.after_id = None
+        # Widget-Aktualisierungen aus anderen Threads, ausgeführt im GUI-Thread
+        self.ui_queue = queue.Queue()
+        self.reserved_paths = set()
         self._setup_ui()
         self._initialize_conversion_table()
         self.progress_var = tk.DoubleVar()
@@ -39,6 +131,7 @@ class PDFMagicApp:
         self.config_file = 'pdf_magic_config.ini'
         self.load_settings()
         self._create_settings_ui()
+        self.root.after(UI_POLL_MS, self._process_ui_queue)
 
     def _setup_ui(self):
         self._create_file_selection_area()
@@ -82,6 +175,17 @@ class PDFMagicApp:
         save_button = tk.Button(settings_frame, text="Einstellungen speichern", command=self.save_output_dir, bg='#333333', fg='#ffffff')
         save_button.pack(side=tk.LEFT, padx=5)
 
+        concurrency_frame = tk.Frame(self.root, bg='#1a1a1a')
+        concurrency_frame.pack(fill=tk.X, padx=15, pady=5)
+
+        concurrency_label = tk.Label(concurrency_frame, text="Parallele Konvertierungen:", bg='#1a1a1a', fg='#ffffff')
+        concurrency_label.pack(side=tk.LEFT, padx=5)
+
+        self.concurrency_var = tk.StringVar(value=self.config['Settings'].get('max_concurrency', str(os.cpu_count() or 1)))
+        concurrency_spinbox = tk.Spinbox(concurrency_frame, from_=1, to=64, width=5, textvariable=self.concurrency_var,
+                                         bg='#2c2c2c', fg='#ffffff')
+        concurrency_spinbox.pack(side=tk.LEFT, padx=5)
+
     def browse_output_dir(self):
         directory = filedialog.askdirectory()
         if directory:
@@ -91,6 +195,7 @@ class PDFMagicApp:
     def save_output_dir(self):
         output_dir = self.output_dir_entry.get()
         self.config['Settings']['output_directory'] = output_dir
+        self.config['Settings']['max_concurrency'] = str(self.concurrency_limit())
         self.save_settings()
         messagebox.showinfo("Einstellungen gespeichert", "Der bevorzugte Ausgabeordner wurde gespeichert.")
 
@@ -111,19 +216,39 @@ class PDFMagicApp:
 
     def _create_conversion_button(self):
         # Button zum Starten der Konvertierung
-        convert_button = tk.Button(self.root, text="Konvertieren", 
-                                   bg='#444444', fg='#ffffff',
-                                   command=self.start_conversion_wrapper,
-                                   relief='flat',
-                                   overrelief='ridge',
-                                   borderwidth=0)
-        convert_button.pack(pady=22)
+        self.convert_button = tk.Button(self.root, text="Konvertieren", 
+                                        bg='#444444', fg='#ffffff',
+                                        command=self.start_conversion_wrapper,
+                                        relief='flat',
+                                        overrelief='ridge',
+                                        borderwidth=0)
+        self.convert_button.pack(pady=22)
 
     def start_conversion_wrapper(self):
-        threading.Thread(target=self.run_async_conversion, daemon=True).start()
+        # Eingaben und Rückfragen im GUI-Thread, die Konvertierung im Event-Loop eines eigenen Threads
+        pdf_paths = self._get_pdf_paths()
+        if not pdf_paths:
+            self.update_log("Keine gültigen PDF-Dateien ausgewählt.\n", "info\n")
+            return
+        conversion_type = self.ask_conversoin_type()
+        if not conversion_type: # Abbrechen ausgewählt
+            self.update_log("Konvertierung abgebrochen.\n", "info\n")
+            return
+
+        self.convert_button.config(state=tk.DISABLED)
+        self.progress_bar.pack(fill=tk.X, padx=15, pady=5)
+        self.progress_var.set(0)
+        threading.Thread(target=self.run_async_conversion,
+                         args=(pdf_paths, conversion_type, self.concurrency_limit()), daemon=True).start()
+
+    def run_async_conversion(self, pdf_paths, conversion_type, limit):
+        asyncio.run(self.start_conversion(pdf_paths, conversion_type, limit))
 
-    def run_async_conversion(self):
-        asyncio.run(self.start_conversion())
+    def concurrency_limit(self):
+        try:
+            return max(1, int(self.concurrency_var.get()))
+        except ValueError:
+            return os.cpu_count() or 1
 
     def _create_browse_button(self):
         # Button zum Auswählen der Datei
@@ -139,16 +264,27 @@ class PDFMagicApp:
 
 ## ------ UPDATE LOGS ------
 
+    def post(self, func, *args):
+        """
+        Führt func(*args) im GUI-Thread aus. Tk-Widgets dürfen nur dort verändert werden.
+        """
+        self.ui_queue.put((func, args))
+
+    def _process_ui_queue(self):
+        try:
+            while True:
+                func, args = self.ui_queue.get_nowait()
+                func(*args)
+        except queue.Empty:
+            pass
+        self.root.after(UI_POLL_MS, self._process_ui_queue)
+
     def update_log(self, message, status="info"):
+        if threading.current_thread() is not threading.main_thread():
+            self.post(self.update_log, message, status)
+            return
         current_time = time.strftime("%H:%M:%S")
         self.conversion_table.add_row([message, status, current_time])
-        
-        log_content = str(self.conversion_table)
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, log_content)
-        self.log_text.config(state=tk.DISABLED)
-        self.log_text.see(tk.END)
 
     def _create_log_text_area(self):
         # Textfeld zur Anzeige des Logs (Konsolenausgabe)
@@ -158,11 +294,8 @@ class PDFMagicApp:
         self.log_text.pack(padx=15, pady=10)
 
     def _initialize_conversion_table(self):
-        # Initialisiere PrettyTable für die Konvertierungstabelle
-        self.conversion_table = PrettyTable(["--Dateiname--", "--Status--", "--Zeit--"])
-        self.conversion_table.align["--Dateiname--"] = "l"
-        self.conversion_table.align["--Status--"] = "l"
-        self.conversion_table.align["--Zeit--"] = "r"
+        # Initialisiere die Konvertierungstabelle im Log-Fenster
+        self.conversion_table = LogView(self.log_text, ["--Dateiname--", "--Status--", "--Zeit--"], ['l', 'l', 'r'])
 
     def _create_progress_bar(self):
         self.progress_bar = ttk.Progressbar(self.root, variable=self.progress_var, maximum=100)
@@ -191,37 +324,101 @@ class PDFMagicApp:
 # ------ END OF INITIALISIERUNG ------
 
 # -----------------------Konvertierung Beginn hier----------------------------------------
-    async def start_conversion(self):
+    async def start_conversion(self, pdf_paths, conversion_type, limit):
+        """
+        Verteilt die Dateien auf einen Prozess-Pool. Höchstens limit Dateien sind
+        gleichzeitig in Arbeit; der Event-Loop wartet nur und blockiert nie.
+        """
+        results = []
         try:
-            self.progress_bar.pack(fill=tk.X, padx=15, pady=5)
-            self.progress_var.set(0)
-
-            pdf_paths = await self._get_pdf_paths()
-            conversion_type = self.ask_conversoin_type()
-
-            if not conversion_type: # Abbrechen ausgewählt
-                self.update_log("Konvertierung abgebrochen.\n", "info\n")
-                return
-
             total_files = len(pdf_paths)
-            for i, pdf_path in enumerate(pdf_paths):
-                output_dir = await self._create_output_directory(pdf_path, conversion_type)
-
-                if conversion_type == 'docx':
-                    await self.convert_pdf_to_docx(pdf_path, output_dir)
-                
-                progress = (i + 1) / total_files * 100
-                self.progress_var.set(progress)
-                await asyncio.sleep(0.1)
+            semaphore = asyncio.Semaphore(limit)
+            # Große Dokumente teilen sich die übrigen Kerne in Seitenbereichen
+            shard_workers = max(1, (os.cpu_count() or 1) // limit)
+            # spawn statt fork, da der Prozess bereits Tk- und Loop-Threads enthält
+            context = multiprocessing.get_context('spawn')
+            # Fertige Seitenbereiche melden die Worker über diese Queue, siehe convert_pdf_file
+            shard_queue = context.Queue()
+            # Fertige Dateien und der Anteil fertiger Seiten der laufenden Dateien
+            progress = {'done': 0, 'running': {}, 'finished': set()}
+            forwarder = threading.Thread(target=self._forward_shard_progress,
+                                         args=(shard_queue, progress, total_files), daemon=True)
+            forwarder.start()
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=limit, mp_context=context,
+                                                            initializer=_init_worker,
+                                                            initargs=(shard_queue,)) as executor:
+
+                    async def convert(pdf_path):
+                        async with semaphore:
+                            output_dir = await self._create_output_directory(pdf_path, conversion_type)
+                            result = None
+                            if conversion_type == 'docx':
+                                result = await self.convert_pdf_to_docx(pdf_path, output_dir, executor,
+                                                                        shard_workers)
+                        progress['finished'].add(pdf_path)
+                        progress['running'].pop(pdf_path, None)
+                        progress['done'] += 1
+                        self.post(self._show_progress, progress, total_files)
+                        return pdf_path, result
+
+                    results = await asyncio.gather(*(convert(pdf_path) for pdf_path in pdf_paths))
+            finally:
+                # Alle Worker sind beendet, ihre Meldungen liegen vollständig in der Queue
+                shard_queue.put(None)
+                forwarder.join()
             self.update_log("Konvertierung abgeschlossen\n", "info\n")
 
         except Exception as e:
             self.update_log(f"Fehler während der Konvertierung: {str(e)}\n", "Error\n")
-            messagebox.showerror("Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {str(e)}")
+            self.post(messagebox.showerror, "Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {str(e)}")
         finally:
-            self.progress_bar.pack_forget()
-
-    async def _get_pdf_paths(self):
+            self.post(self.finish_conversion, results)
+
+    def _forward_shard_progress(self, shard_queue, progress, total_files):
+        """
+        Überträgt die Meldungen fertiger Seitenbereiche in den Anteil der laufenden
+        Dateien, damit der Fortschrittsbalken auch innerhalb großer Dokumente steigt.
+        """
+        for pdf_path, pages, page_count in iter(shard_queue.get, None):
+            # Meldungen können erst nach dem Ergebnis der Datei eintreffen
+            if pdf_path in progress['finished']:
+                continue
+            running = progress['running']
+            running[pdf_path] = running.get(pdf_path, 0) + pages / page_count
+            self.post(self._show_progress, progress, total_files)
+
+    def _show_progress(self, progress, total_files):
+        done = progress['done'] + sum(list(progress['running'].values()))
+        self.progress_var.set(min(done, total_files) / total_files * 100)
+
+    def finish_conversion(self, results):
+        """
+        Fasst den Batch in einer einzigen Rückfrage zusammen, statt nach jedem Dokument zu fragen.
+        """
+        self.progress_bar.pack_forget()
+        self.convert_button.config(state=tk.NORMAL)
+        self.reserved_paths.clear()
+        if not results:
+            return
+
+        converted = [docx_path for _, docx_path in results if docx_path]
+        failed = [pdf_path for pdf_path, docx_path in results if not docx_path]
+        message = f"{len(converted)} von {len(results)} Dateien konvertiert."
+        if failed:
+            names = [os.path.basename(pdf_path) for pdf_path in failed[:SUMMARY_MAX_FAILED]]
+            if len(failed) > SUMMARY_MAX_FAILED:
+                names.append(f"... und {len(failed) - SUMMARY_MAX_FAILED} weitere")
+            message += "\n\nFehlgeschlagen:\n" + "\n".join(names)
+
+        if not converted:
+            messagebox.showwarning("Konvertierung abgeschlossen", message)
+            return
+        if messagebox.askyesno("Konvertierung abgeschlossen", message + "\n\nAusgabeordner jetzt öffnen?"):
+            for output_dir in sorted({os.path.dirname(docx_path) for docx_path in converted}):
+                self.open_document(output_dir)
+
+    def _get_pdf_paths(self):
         pdf_paths = [path.strip() for path in self.file_entry.get().split(",") if path.strip()]
         
         valid_paths = []
@@ -243,71 +440,52 @@ class PDFMagicApp:
         
         return output_dir    
 
-    async def convert_pdf_to_docx(self, pdf_path, output_dir):
+    def _reserve_docx_path(self, pdf_path, output_dir):
+        # Läuft nur im Event-Loop-Thread, daher genügt ein Set gegen doppelte Namen im selben Batch
+        pdf_filename = os.path.basename(pdf_path)
+        docx_filename = os.path.splitext(pdf_filename)[0] + '.docx'
+        docx_path = os.path.join(output_dir, docx_filename)
+        i = 1
+        while os.path.exists(docx_path) or docx_path in self.reserved_paths:
+            docx_filename = f"{os.path.splitext(pdf_filename)[0]}({i}).docx"
+            docx_path = os.path.join(output_dir, docx_filename)
+            i += 1
+        self.reserved_paths.add(docx_path)
+        return docx_path
+
+    async def convert_pdf_to_docx(self, pdf_path, output_dir, executor=None, shard_workers=1):
         try:
             pdf_filename = os.path.basename(pdf_path)
-            docx_filename = os.path.splitext(pdf_filename)[0] + '.docx'
-            docx_path = os.path.join(output_dir, docx_filename)
-            
-            if os.path.exists(docx_path):
-                i = 1
-                while os.path.exists(docx_path):    
-                    docx_filename = f"{os.path.splitext(pdf_filename)[0]}({i}).docx"
-                    docx_path = os.path.join(output_dir, docx_filename)
-                    i += 1
+            docx_path = self._reserve_docx_path(pdf_path, output_dir)
+            docx_filename = os.path.basename(docx_path)
             
             self.update_log(f"Starte Konvertierung in DOCX: {pdf_filename}\n", "fortschritt\n")
-            
-            cv = Converter(pdf_path)
-            cv.convert(docx_path, start=0, end=None)
-            cv.close()
-            
-            await self.optimize_docx(docx_path)
-            self.update_log(f"Konvertierung in DOCX abgeschlossen: {docx_filename}\n", "erfolgreich\n")
-            
-            open_document = messagebox.askyesnocancel("Dokument öffnen", "Möchten Sie das konvertierte Dokument jetzt öffnen?")
-
-            # Benutzer fragen ob Doc geöffnet werden soll
-            if open_document:
-                await self.open_document(docx_path)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, convert_pdf_file, pdf_path, docx_path, shard_workers)
+
+            # Die DOCX ist bereits geschrieben und bleibt auch ohne Optimierung ein gültiges Ergebnis
+            self.update_log(f"Optimiere Dokument: {docx_filename}\n", "bearbeiten\n")
+            error = await loop.run_in_executor(executor, optimize_docx_file, docx_path)
+            if error is None:
+                self.update_log(f"Dokument optimiert: {docx_filename}\n", "erfolgreich\n")
             else:
-                self.update_log(f"Dokument wurde nicht geöffnet: {docx_filename}\n", "info\n")
-            
+                self.update_log(f"Fehler bei der Optimierung der DOCX-Datei: {error}\n", "Fehler\n")
+                logging.error(f"DOCX Optimierung fehlgeschlagen: {error}\n")
+            self.update_log(f"Konvertierung in DOCX abgeschlossen: {docx_filename}\n", "erfolgreich\n")
             return docx_path
         
         except Exception as e:
             self.update_log(f"Fehler bei der Konvertierung: {str(e)}\n", "Fehler\n")
             logging.error(f"Konvertierung fehlgeschlahgen: {str(e)}\n")
             return None
-        
-    async def optimize_docx(self, docx_path):
-        try:
-            self.update_log(f"Optimiere Dokument: {os.path.basename(docx_path)}\n", "bearbeiten\n")
-            doc = Document(docx_path)
-            for paragraph in doc.paragraphs:
-                paragraph.text = ' '.join(paragraph.text.split())
-                for run in paragraph.runs:
-                    run.font.name = 'Arial'
-                    run.font.size = Pt(11)
-            
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                            for run in paragraph.runs:
-                                run.font.name = 'Arial'
-                                run.font.size = Pt(10)
-            doc.save(docx_path)
-            self.update_log(f"Dokument optimiert: {os.path.basename(docx_path)}\n", "erfolgreich\n")
-        except Exception as e:
-            self.update_log(f"Fehler bei der Optimierung der DOCX-Datei: {str(e)}\n", "Fehler\n")
-            logging.error(f"DOCX Optimierung fehlgeschlagen: {str(e)}\n")
 
-    async def open_document(self, docx_path):
+    def open_document(self, path):
         try:
-            self.update_log(f"Öffne Dokument: {os.path.basename(docx_path)}\n", "info\n")
-            os.startfile(docx_path)  
+            self.update_log(f"Öffne: {os.path.basename(path)}\n", "info\n")
+            if hasattr(os, 'startfile'):
+                os.startfile(path)
+            else:
+                subprocess.Popen(['open' if sys.platform == 'darwin' else 'xdg-open', path])
         except Exception as e:
             self.update_log(f"Fehler beim Öffnen des Dokuments: {str(e)}\n", "Fehler\n")
             logging.error(f"Fehler beim Öffnen des Dokuments: {str(e)}\n")
@@ -340,12 +518,163 @@ class PDFMagicApp:
         window.destroy()
 
     def run(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.conversion_table.close()
 
 # ---------------------------------------------------------------------------------------------------------------------------
 
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+# Kindelemente von w:pPr und w:rPr, die laut OOXML-Schema nach w:jc bzw. w:sz stehen
+PPR_AFTER_JC = ('textDirection', 'textAlignment', 'textboxTightWrap', 'outlineLvl', 'divId', 'cnfStyle',
+                'rPr', 'sectPr', 'pPrChange')
+RPR_AFTER_SZ = ('szCs', 'highlight', 'u', 'effect', 'bdr', 'shd', 'fitText', 'vertAlign', 'rtl', 'cs', 'em',
+                'lang', 'eastAsianLayout', 'specVanish', 'oMath')
+
+def w(tag):
+    return f"{{{W_NS}}}{tag}"
+
+def insert_before(parent, child, successors):
+    successors = {w(name) for name in successors}
+    for sibling in parent:
+        if sibling.tag in successors:
+            sibling.addprevious(child)
+            return child
+    parent.append(child)
+    return child
+
+def set_run_font(run, half_points):
+    # Entspricht run.font.name = 'Arial' und run.font.size in python-docx
+    r_pr = run.find(w('rPr'))
+    if r_pr is None:
+        r_pr = run.makeelement(w('rPr'), {})
+        run.insert(0, r_pr)
+    fonts = r_pr.find(w('rFonts'))
+    if fonts is None:
+        fonts = r_pr.makeelement(w('rFonts'), {})
+        r_pr.insert(1 if r_pr.find(w('rStyle')) is not None else 0, fonts)
+    fonts.set(w('ascii'), 'Arial')
+    fonts.set(w('hAnsi'), 'Arial')
+    size = r_pr.find(w('sz'))
+    if size is None:
+        size = insert_before(r_pr, r_pr.makeelement(w('sz'), {}), RPR_AFTER_SZ)
+    size.set(w('val'), str(half_points))
+
+def paragraph_text(paragraph):
+    # Text wie paragraph.text in python-docx, inklusive Läufen in Hyperlinks
+    parts = []
+    for child in paragraph:
+        runs = [child] if child.tag == w('r') else child.findall(w('r')) if child.tag == w('hyperlink') else []
+        for run in runs:
+            for item in run:
+                if item.tag == w('t'):
+                    parts.append(item.text or '')
+                elif item.tag == w('tab'):
+                    parts.append('\t')
+                elif item.tag in (w('br'), w('cr')):
+                    parts.append('\n')
+    return ''.join(parts)
+
+def optimize_document_xml(document_xml):
+    from lxml import etree
+    root = etree.fromstring(document_xml)
+    body = root.find(w('body'))
+
+    # Absätze im Dokumentkörper: Leerraum zusammenfassen, ein Lauf in Arial 11
+    for paragraph in body.iterfind(w('p')):
+        text = ' '.join(paragraph_text(paragraph).split())
+        for child in list(paragraph):
+            if child.tag != w('pPr'):
+                paragraph.remove(child)
+        run = etree.SubElement(paragraph, w('r'))
+        set_run_font(run, 22)
+        if text:
+            etree.SubElement(run, w('t')).text = text
+
+    # Tabellenzellen: linksbündig, Läufe in Arial 10
+    for paragraph in body.iterfind(f"{w('tbl')}/{w('tr')}/{w('tc')}/{w('p')}"):
+        p_pr = paragraph.find(w('pPr'))
+        if p_pr is None:
+            p_pr = paragraph.makeelement(w('pPr'), {})
+            paragraph.insert(0, p_pr)
+        jc = p_pr.find(w('jc'))
+        if jc is None:
+            jc = insert_before(p_pr, p_pr.makeelement(w('jc'), {}), PPR_AFTER_JC)
+        jc.set(w('val'), 'left')
+        for run in paragraph.iterfind(w('r')):
+            set_run_font(run, 20)
+
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+def optimize_docx_xml(docx_path):
+    # Passt nur word/document.xml an und kopiert alle übrigen Teile unverändert,
+    # statt das ganze Dokument über python-docx zu laden und neu zu speichern
+    with zipfile.ZipFile(docx_path) as source:
+        document_xml = optimize_document_xml(source.read('word/document.xml'))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(docx_path)), suffix='.docx')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, 'w') as target:
+                for info in source.infolist():
+                    target_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    target_info.compress_type = info.compress_type
+                    target_info.external_attr = info.external_attr
+                    if info.filename == 'word/document.xml':
+                        target.writestr(target_info, document_xml)
+                        continue
+                    with source.open(info) as src, target.open(target_info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, docx_path)
+
+# Queue für die Meldungen fertiger Seitenbereiche, wird von _init_worker im Worker-Prozess gesetzt
+_shard_queue = None
+
+def _init_worker(shard_queue):
+    global _shard_queue
+    _shard_queue = shard_queue
+
+def convert_pdf_file(pdf_path, docx_path, shard_workers=1):
+    """
+    Konvertiert eine PDF in eine DOCX. Läuft in einem Worker-Prozess, damit
+    pdf2docx weder den Event-Loop noch den GIL der GUI blockiert.
+
+    :param shard_workers: Prozesse für Seitenbereiche großer Dokumente.
+    :return: Pfad der DOCX-Datei.
+    """
+    cv = Converter(pdf_path)
+    page_count = len(cv.fitz_doc)
+    try:
+        if shard_workers <= 1 or page_count < SHARD_THRESHOLD_PAGES:
+            cv.convert(docx_path, start=0, end=None)
+    finally:
+        cv.close()
+    if shard_workers > 1 and page_count >= SHARD_THRESHOLD_PAGES:
+        # Große Dokumente in Seitenbereichen auf mehrere Prozesse verteilen und zusammenfügen
+        on_pages = None
+        if _shard_queue is not None:
+            on_pages = lambda pages: _shard_queue.put((pdf_path, pages, page_count))
+        convert_sharded(pdf_path, docx_path, page_count, workers=shard_workers, on_pages=on_pages)
+    return docx_path
+
+def optimize_docx_file(docx_path):
+    """
+    Optimiert eine fertige DOCX im Worker-Prozess. Fehler werden nicht ausgelöst,
+    sondern als Meldung für das Log zurückgegeben.
+
+    :return: Fehlermeldung oder None.
+    """
+    try:
+        optimize_docx_xml(docx_path)
+    except Exception as e:
+        return str(e)
+    return None
+
 def check_modules_installed():
-    required_modules = ['tkinterdnd2', 'pdf2docx', 'python-docx', 'prettytable', 'docx']
+    required_modules = ['tkinterdnd2', 'pdf2docx', 'python-docx', 'docx']
     return all(importlib.util.find_spec(module) is not None for module in required_modules)
 
 def save_installation_status(status):
@@ -371,8 +700,7 @@ def install_required_packages():
     packages = [
         'tkinterdnd2',
         'pdf2docx',
-        'python-docx',
-        'prettytable'
+        'python-docx'
     ]
 
     print("Beginne mit der Installation der erforderlichen Pakete...")
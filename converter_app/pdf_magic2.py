@@ -7,6 +7,10 @@ from PyQt5.QtGui import QDropEvent, QDragEnterEvent
 from pdf2docx import Converter
 import docx
 
+# Schwelle, Aufteilung und Zusammenführung der Seitenbereiche stammen aus src/sharding.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+from sharding import SHARD_THRESHOLD_PAGES, convert_sharded
+
 class PDFConverter(QThread):
     update_progress = pyqtSignal(int)
     update_log = pyqtSignal(str)
@@ -21,8 +25,22 @@ class PDFConverter(QThread):
             try:
                 docx_file = pdf_file.rsplit('.', 1)[0] + '.docx'
                 cv = Converter(pdf_file)
-                cv.convert(docx_file)
-                cv.close()
+                page_count = len(cv.fitz_doc)
+                if page_count >= SHARD_THRESHOLD_PAGES:
+                    cv.close()
+                    # Große Dokumente in Seitenbereichen auf mehrere Prozesse verteilen,
+                    # der Fortschritt steigt mit jedem fertigen Bereich
+                    pages_done = 0
+
+                    def on_pages(pages):
+                        nonlocal pages_done
+                        pages_done += pages
+                        self.update_progress.emit(int((index - 1 + pages_done / page_count) / total_files * 100))
+
+                    convert_sharded(pdf_file, docx_file, page_count, on_pages=on_pages)
+                else:
+                    cv.convert(docx_file)
+                    cv.close()
                 
                 # Formatierung anpassen
                 doc = docx.Document(docx_file)
@@ -0,0 +1,176 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic admission file
+import os
+import threading
+from render import DEFAULT_DPI
+from extract import PARALLEL_TEXT_THRESHOLD_PAGES
+from sharding import SHARD_THRESHOLD_PAGES
+
+MB = 1024 * 1024
+# Grundbedarf eines Worker-Prozesses mit geladenen Bibliotheken
+WORKER_BASE_BYTES = 150 * MB
+# pdf2docx hält das Seitenlayout aller Seiten bis zum Schreiben der DOCX im Speicher
+DOCX_BYTES_PER_PAGE = 2 * MB
+# Puffer für Dekodieren und Kodieren einer gerasterten Seite in pdftoppm bzw. tesseract
+RASTER_FACTOR = 3
+# Anteil des physischen Speichers, der ohne Vorgabe verplant wird
+DEFAULT_BUDGET_FRACTION = 0.75
+# Annahme, falls der physische Speicher nicht ermittelt werden kann
+FALLBACK_MEMORY_BYTES = 8 * 1024 * MB
+# A4 in Punkt, falls die Seitengröße nicht gelesen werden kann
+DEFAULT_PAGE_SIZE = (595, 842)
+
+
+def physical_memory():
+    """
+    Größe des physischen Speichers in Bytes.
+    """
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    except (AttributeError, OSError):
+        pass
+    return FALLBACK_MEMORY_BYTES
+
+
+def default_memory_budget():
+    return int(physical_memory() * DEFAULT_BUDGET_FRACTION)
+
+
+def parse_size(value):
+    """
+    Wandelt Größenangaben wie '512M', '8G' oder '2048' (Bytes) in Bytes um.
+    """
+    value = str(value).strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': MB, 'G': 1024 * MB, 'T': 1024 * 1024 * MB}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def read_page_geometry(pdf_file):
+    """
+    Liest Seitenzahl und größte Seitenfläche, ohne Seiteninhalte zu dekodieren.
+
+    :return: Tupel (Seitenzahl, (Breite, Höhe) der größten Seite in Punkt).
+    """
+    from PyPDF2 import PdfReader
+    reader = PdfReader(pdf_file)
+    largest = None
+    for page in reader.pages:
+        box = page.mediabox
+        size = (abs(float(box.width)), abs(float(box.height)))
+        if largest is None or size[0] * size[1] > largest[0] * largest[1]:
+            largest = size
+    return len(reader.pages), largest or DEFAULT_PAGE_SIZE
+
+
+def estimate_memory(pdf_file, stage_options=None, dpi=DEFAULT_DPI):
+    """
+    Schätzt den Speicherbedarf der Verarbeitung einer Datei in einem Worker
+    aus Seitenzahl, Seitengröße und Auflösung.
+
+    :param pdf_file: Pfad zur PDF-Datei.
+    :param stage_options: Optionen für ConversionStages, bestimmen die ausgeführten Schritte.
+    :param dpi: Auflösung, mit der Seiten gerastert werden.
+    :return: Geschätzter Höchstbedarf in Bytes.
+    """
+    from stages import select_stages
+    stage_options = stage_options or {}
+    stages = select_stages(stage_options.get('stages'))
+    try:
+        page_count, (width, height) = read_page_geometry(pdf_file)
+    except Exception:
+        # Unlesbare Dateien scheitern im Worker ohnehin früh
+        return WORKER_BASE_BYTES
+    image_options = stage_options.get('image_options') or {}
+    dpi = image_options.get('dpi', dpi)
+    raster_bytes = (width / 72 * dpi) * (height / 72 * dpi) * 3
+
+    docx_bytes = 0
+    if 'docx' in stages:
+        docx_bytes = page_count * DOCX_BYTES_PER_PAGE
+        if stage_options.get('sharding') and page_count >= SHARD_THRESHOLD_PAGES:
+            # Jeder Seitenbereich läuft in einem eigenen Prozess mit eigenem Grundbedarf
+            shard_workers = stage_options.get('shard_workers') or os.cpu_count() or 1
+            docx_bytes += shard_workers * WORKER_BASE_BYTES
+
+    # Bilder und OCR laufen als unabhängige Schritte gleichzeitig
+    raster_jobs = 0
+    if 'images' in stages:
+        # Seiten werden parallel kodiert
+        raster_jobs += min(image_options.get('workers') or os.cpu_count() or 1, page_count)
+    if 'text' in stages and stage_options.get('use_ocr'):
+        ocr_workers = stage_options.get('ocr_workers') or os.cpu_count() or 1
+        raster_jobs += min(ocr_workers, page_count)
+    text_bytes = 0
+    if 'text' in stages and stage_options.get('parallel_text') and page_count >= PARALLEL_TEXT_THRESHOLD_PAGES:
+        # Jeder Seitenbereich läuft in einem eigenen Prozess; die PDF selbst ist eingeblendet, nicht kopiert
+        text_workers = stage_options.get('text_workers') or os.cpu_count() or 1
+        text_bytes = text_workers * WORKER_BASE_BYTES
+    return int(WORKER_BASE_BYTES + docx_bytes + text_bytes + raster_jobs * raster_bytes * RASTER_FACTOR)
+
+
+class MemoryBudget:
+    """
+    Zulassungskontrolle für gleichzeitige Aufträge. Ein Auftrag startet erst,
+    wenn sein geschätzter Bedarf ins verbleibende Budget passt. Ein Auftrag,
+    der allein schon größer als das Budget ist, läuft nur, wenn sonst nichts läuft.
+    Mehrere Engines können sich ein Budget teilen; max_jobs begrenzt dann
+    zusätzlich die Anzahl der insgesamt gleichzeitig laufenden Aufträge.
+    """
+
+    def __init__(self, budget_bytes, max_jobs=None):
+        """
+        :param budget_bytes: Speicherbudget in Bytes.
+        :param max_jobs: Optionale Obergrenze gleichzeitig laufender Aufträge, z. B. die Anzahl der CPU-Kerne.
+        """
+        self.budget_bytes = budget_bytes
+        self.max_jobs = max_jobs
+        self.reserved = 0
+        self.running = 0
+        self.lock = threading.Condition()
+
+    def try_reserve(self, cost):
+        """
+        Reserviert den Bedarf eines Auftrags, falls er ins Budget passt.
+
+        :return: True, wenn der Auftrag starten darf.
+        """
+        with self.lock:
+            if self.running and self.reserved + cost > self.budget_bytes:
+                return False
+            if self.max_jobs is not None and self.running >= self.max_jobs:
+                return False
+            self.reserved += cost
+            self.running += 1
+            return True
+
+    def release(self, cost):
+        with self.lock:
+            self.reserved -= cost
+            self.running -= 1
+            self.lock.notify_all()
+
+    def wait(self, timeout):
+        """
+        Wartet, bis ein Auftrag freigegeben wird, höchstens timeout Sekunden.
+        """
+        with self.lock:
+            self.lock.wait(timeout)
@@ -0,0 +1,327 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic assemble file
+import os
+import zlib
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.jfif', '.png', '.tif', '.tiff', '.bmp', '.gif', '.webp')
+# Blockgröße beim Kopieren von Bilddaten in die PDF
+CHUNK_SIZE = 1024 * 1024
+# Auflösung, wenn das Bild keine enthält; entspricht der bisherigen Ausgabe von PIL
+FALLBACK_DPI = 72
+# Kleinere Werte stammen von TIFF-Dateien ohne Auflösungseinheit, PIL meldet dort 1 DPI
+MIN_DPI = 10
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_COLORS = {0: 1, 2: 3, 3: 1}
+JPEG_COLOR_SPACES = {'L': '/DeviceGray', 'RGB': '/DeviceRGB', 'CMYK': '/DeviceCMYK'}
+# TIFF-Tags für die direkte Übernahme von CCITT-Daten
+TIFF_PHOTOMETRIC = 262
+TIFF_FILL_ORDER = 266
+TIFF_STRIP_OFFSETS = 273
+TIFF_STRIP_BYTE_COUNTS = 279
+
+
+class PdfImage:
+    """
+    Bildobjekt einer Seite: Größe, Einträge des Image-Dictionarys und die
+    Datenquelle des Streams. Die Daten werden erst beim Schreiben gelesen.
+    """
+
+    def __init__(self, width, height, entries, length, chunks, dpi=None, smask=None):
+        """
+        :param width: Breite in Pixeln.
+        :param height: Höhe in Pixeln.
+        :param entries: Dict mit weiteren Einträgen des Image-Dictionarys in PDF-Syntax.
+        :param length: Länge der Streamdaten in Bytes.
+        :param chunks: Funktion ohne Argumente, die die Streamdaten blockweise liefert.
+        :param dpi: Tupel (x, y) der Auflösung, bestimmt die Seitengröße.
+        :param smask: Optionales PdfImage mit dem Alphakanal.
+        """
+        self.width = width
+        self.height = height
+        self.entries = entries
+        self.length = length
+        self.chunks = chunks
+        self.dpi = dpi or (FALLBACK_DPI, FALLBACK_DPI)
+        self.smask = smask
+
+
+def _number(value):
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+def _file_chunks(path, ranges):
+    """
+    Liefert die angegebenen Bytebereiche einer Datei blockweise, ohne sie ganz zu laden.
+
+    :param ranges: Liste von (Offset, Länge)-Tupeln.
+    """
+    def chunks():
+        with open(path, 'rb') as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                while length:
+                    chunk = f.read(min(length, CHUNK_SIZE))
+                    if not chunk:
+                        raise ValueError(f"Datei endet unerwartet: {path}")
+                    length -= len(chunk)
+                    yield chunk
+    return chunks
+
+
+def _image_dpi(image):
+    dpi = image.info.get('dpi')
+    try:
+        if dpi and dpi[0] >= MIN_DPI and dpi[1] >= MIN_DPI:
+            return float(dpi[0]), float(dpi[1])
+    except (TypeError, IndexError):
+        pass
+    return None
+
+
+def _jpeg_image(path, image):
+    """
+    JPEG-Daten werden unverändert als DCTDecode-Stream übernommen.
+    """
+    entries = {'ColorSpace': JPEG_COLOR_SPACES[image.mode], 'BitsPerComponent': '8', 'Filter': '/DCTDecode'}
+    if image.mode == 'CMYK' and 'adobe' in image.info:
+        # Photoshop speichert CMYK-JPEGs invertiert
+        entries['Decode'] = '[1 0 1 0 1 0 1 0]'
+    size = os.path.getsize(path)
+    return PdfImage(image.width, image.height, entries, size, _file_chunks(path, [(0, size)]), _image_dpi(image))
+
+
+def _png_image(path, image):
+    """
+    Die IDAT-Daten einer PNG sind bereits ein zlib-Stream mit PNG-Prädiktoren,
+    den PDF direkt dekodieren kann. Transparenz und Interlacing werden nicht
+    unterstützt, dafür liefert die Funktion None.
+    """
+    with open(path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        header = None
+        palette = None
+        idat = []
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return None
+            length = int.from_bytes(head[:4], 'big')
+            chunk_type = head[4:]
+            if chunk_type == b'IHDR':
+                header = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+            elif chunk_type == b'PLTE':
+                palette = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+            elif chunk_type == b'IDAT':
+                idat.append((f.tell(), length))
+                f.seek(length + 4, os.SEEK_CUR)
+            elif chunk_type in (b'tRNS', b'IEND'):
+                break
+            else:
+                f.seek(length + 4, os.SEEK_CUR)
+    if chunk_type == b'tRNS' or header is None or not idat:
+        return None
+
+    bit_depth, color_type, interlace = header[8], header[9], header[12]
+    if color_type not in PNG_COLORS or interlace:
+        return None
+    if color_type == 3:
+        if palette is None:
+            return None
+        color_space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+    else:
+        color_space = '/DeviceGray' if color_type == 0 else '/DeviceRGB'
+    width, height = int.from_bytes(header[:4], 'big'), int.from_bytes(header[4:8], 'big')
+    entries = {
+        'ColorSpace': color_space,
+        'BitsPerComponent': str(bit_depth),
+        'Filter': '/FlateDecode',
+        'DecodeParms': f"<< /Predictor 15 /Colors {PNG_COLORS[color_type]} /BitsPerComponent {bit_depth} "
+                       f"/Columns {width} >>",
+    }
+    length = sum(chunk_length for _, chunk_length in idat)
+    return PdfImage(width, height, entries, length, _file_chunks(path, idat), _image_dpi(image))
+
+
+def _ccitt_image(path, image):
+    """
+    Group-4-komprimierte TIFF-Seiten in einem einzigen Streifen werden als
+    CCITTFaxDecode-Stream übernommen, sonst liefert die Funktion None.
+    """
+    if image.mode != '1' or image.info.get('compression') != 'group4':
+        return None
+    tags = image.tag_v2
+    offsets = tags.get(TIFF_STRIP_OFFSETS)
+    counts = tags.get(TIFF_STRIP_BYTE_COUNTS)
+    if not offsets or not counts or len(offsets) != 1 or tags.get(TIFF_FILL_ORDER, 1) != 1:
+        return None
+    # Bei BlackIsZero stehen gesetzte Bits für Weiß, die Kodierung ist dann invertiert
+    black_is_1 = 'true' if tags.get(TIFF_PHOTOMETRIC, 0) == 1 else 'false'
+    entries = {
+        'ColorSpace': '/DeviceGray',
+        'BitsPerComponent': '1',
+        'Filter': '/CCITTFaxDecode',
+        'DecodeParms': f"<< /K -1 /Columns {image.width} /Rows {image.height} /BlackIs1 {black_is_1} >>",
+    }
+    return PdfImage(image.width, image.height, entries, counts[0], _file_chunks(path, [(offsets[0], counts[0])]),
+                    _image_dpi(image))
+
+
+def _flate_image(data, width, height, color_space, bits=8, dpi=None, smask=None):
+    data = zlib.compress(data, 6)
+    entries = {'ColorSpace': color_space, 'BitsPerComponent': str(bits), 'Filter': '/FlateDecode'}
+    return PdfImage(width, height, entries, len(data), lambda: iter((data,)), dpi, smask)
+
+
+def _decoded_image(image):
+    """
+    Rückfall für alle übrigen Bilder: dekodieren und verlustfrei mit Deflate
+    komprimieren. Ein Alphakanal wird als Soft-Mask übernommen.
+    """
+    dpi = _image_dpi(image)
+    if image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    smask = None
+    if image.mode in ('LA', 'RGBA'):
+        alpha = image.getchannel('A')
+        smask = _flate_image(alpha.tobytes(), image.width, image.height, '/DeviceGray')
+        image = image.convert('L' if image.mode == 'LA' else 'RGB')
+    if image.mode == '1':
+        return _flate_image(image.tobytes(), image.width, image.height, '/DeviceGray', bits=1, dpi=dpi)
+    if image.mode not in JPEG_COLOR_SPACES:
+        image = image.convert('RGB')
+    return _flate_image(image.tobytes(), image.width, image.height, JPEG_COLOR_SPACES[image.mode], dpi=dpi,
+                        smask=smask)
+
+
+def read_images(path):
+    """
+    Liefert die Seiten einer Bilddatei als PdfImage. JPEG, PNG ohne Transparenz
+    und Group-4-TIFF werden ohne Dekodierung übernommen, mehrseitige TIFF-Dateien
+    ergeben eine Seite je Bild.
+
+    :param path: Pfad zur Bilddatei.
+    """
+    from PIL import Image, ImageSequence
+    with Image.open(path) as image:
+        if image.format == 'JPEG' and image.mode in JPEG_COLOR_SPACES:
+            yield _jpeg_image(path, image)
+            return
+        if image.format == 'PNG':
+            pdf_image = _png_image(path, image)
+            if pdf_image is not None:
+                yield pdf_image
+                return
+        for frame in ImageSequence.Iterator(image):
+            pdf_image = _ccitt_image(path, frame) if image.format == 'TIFF' else None
+            yield pdf_image or _decoded_image(frame)
+
+
+class PdfStreamWriter:
+    """
+    Schreibt eine PDF mit einer Bildseite je Aufruf von add_page direkt in die
+    Datei. Im Speicher bleiben nur die Offsets der Objekte für die xref-Tabelle.
+    """
+
+    def __init__(self, output_pdf):
+        self.output_pdf = output_pdf
+        self.file = open(output_pdf, 'wb', buffering=CHUNK_SIZE)
+        self.offsets = [None]
+        self.page_ids = []
+        self.file.write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+        self.catalog_id = self._reserve()
+        self.pages_id = self._reserve()
+
+    def _reserve(self):
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n{body}\nendobj\n".encode('latin-1'))
+
+    def _stream(self, dictionary, length, chunks):
+        obj_id = self._reserve()
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n<< {dictionary} /Length {length} >>\nstream\n".encode('latin-1'))
+        written = 0
+        for chunk in chunks():
+            self.file.write(chunk)
+            written += len(chunk)
+        if written != length:
+            raise ValueError(f"Bilddaten haben sich während des Schreibens geändert ({written} statt {length} Bytes).")
+        self.file.write(b'\nendstream\nendobj\n')
+        return obj_id
+
+    def _image(self, image):
+        entries = dict(image.entries)
+        if image.smask is not None:
+            entries['SMask'] = f"{self._image(image.smask)} 0 R"
+        dictionary = ' '.join([f"/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height}"]
+                              + [f"/{key} {value}" for key, value in entries.items()])
+        return self._stream(dictionary, image.length, image.chunks)
+
+    def add_page(self, image):
+        """
+        Hängt eine Seite an, deren Größe sich aus Pixelmaßen und Auflösung des Bildes ergibt.
+        """
+        image_id = self._image(image)
+        width = _number(image.width * 72 / image.dpi[0])
+        height = _number(image.height * 72 / image.dpi[1])
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode('latin-1')
+        content_id = self._stream('', len(content), lambda: iter((content,)))
+        page_id = self._reserve()
+        self._object(page_id, f"<< /Type /Page /Parent {self.pages_id} 0 R /MediaBox [0 0 {width} {height}] "
+                              f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>")
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """
+        Schreibt Seitenbaum, Katalog und xref-Tabelle und schließt die Datei.
+        """
+        kids = ' '.join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._object(self.pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._object(self.catalog_id, f"<< /Type /Catalog /Pages {self.pages_id} 0 R >>")
+        xref_offset = self.file.tell()
+        lines = [f"xref\n0 {len(self.offsets)}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{offset:010d} 00000 n \n" for offset in self.offsets[1:])
+        lines.append(f"trailer\n<< /Size {len(self.offsets)} /Root {self.catalog_id} 0 R >>\n"
+                     f"startxref\n{xref_offset}\n%%EOF\n")
+        self.file.write(''.join(lines).encode('latin-1'))
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.output_pdf)
+
+
+def images_to_pdf(image_files, output_pdf, on_page=None):
+    """
+    Fügt Bilddateien in der angegebenen Reihenfolge zu einer mehrseitigen PDF
+    zusammen. Die Seiten werden nacheinander in eine temporäre Datei geschrieben,
+    die erst am Ende die Zieldatei ersetzt.
+
+    :param image_files: Pfade der Bilddateien.
+    :param output_pdf: Pfad der zu schreibenden PDF.
+    :param on_page: Optionaler Callback mit dem Pfad der Bilddatei nach jeder geschriebenen Seite.
+    :return: Anzahl der geschriebenen Seiten.
+    """
+    part_file = output_pdf + '.part'
+    writer = PdfStreamWriter(part_file)
+    try:
+        for image_file in image_files:
+            for image in read_images(image_file):
+                writer.add_page(image)
+                if on_page is not None:
+                    on_page(image_file)
+        if not writer.page_ids:
+            raise ValueError("Keine Bilder zum Zusammenfügen.")
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    os.replace(part_file, output_pdf)
+    return len(writer.page_ids)
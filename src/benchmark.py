@@ -0,0 +1,355 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic benchmark file
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(SRC_DIR, 'benchmark_baseline.json')
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), 'pdf_magic_bench')
+
+CORPUS_KINDS = ('text', 'table', 'image', 'scanned')
+CORPUS_SIZES = (1, 50, 1000)
+BENCH_STAGES = ('docx', 'format', 'images', 'text', 'convert_from_file', 'process_file')
+# Erlaubte Abweichung vom Baseline-Wert, bevor ein Fall als Regression gilt
+DEFAULT_TOLERANCE = 0.15
+# Kleinere absolute Abweichungen gelten als Messrauschen
+MIN_DELTA = {'seconds': 0.1, 'peak_rss_mb': 5}
+CORPUS_SEED = 20261018
+# Anzahl unterschiedlicher Scan-Vorlagen, die sich im gescannten Korpus wiederholen
+SCAN_TEMPLATES = 8
+
+WORDS = ('rechnung', 'vertrag', 'lieferung', 'betrag', 'kunde', 'datum', 'projekt', 'seite', 'anlage',
+         'bericht', 'umsatz', 'steuer', 'adresse', 'zahlung', 'frist', 'angebot', 'position', 'menge',
+         'summe', 'auftrag', 'konto', 'bestellung', 'artikel', 'preis', 'leistung', 'zeitraum')
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _add_text_page(doc, rng):
+    page = doc.new_page()
+    paragraphs = '\n\n'.join(' '.join(_sentence(rng) for _ in range(4)) for _ in range(6))
+    page.insert_textbox(page.rect + (50, 50, -50, -50), paragraphs, fontsize=10)
+    return page
+
+
+def _add_table_page(doc, rng, rows=24, cols=5):
+    import fitz
+    page = doc.new_page()
+    left, top, width, height = 50, 60, page.rect.width - 100, 18
+    col_width = width / cols
+    for row in range(rows + 1):
+        y = top + row * height
+        page.draw_line(fitz.Point(left, y), fitz.Point(left + width, y))
+    for col in range(cols + 1):
+        x = left + col * col_width
+        page.draw_line(fitz.Point(x, top), fitz.Point(x, top + rows * height))
+    for row in range(rows):
+        for col in range(cols):
+            text = rng.choice(WORDS) if col < 2 else f"{rng.uniform(1, 9999):.2f}"
+            page.insert_text(fitz.Point(left + col * col_width + 3, top + row * height + 13), text, fontsize=9)
+    return page
+
+
+def _add_image_page(doc, rng):
+    import fitz
+    page = doc.new_page()
+    page.insert_text(fitz.Point(50, 50), _sentence(rng, 8), fontsize=12)
+    # Kleine Bilder mit zufälligen Farbblöcken, skaliert auf die halbe Seite
+    for index in range(2):
+        size = 96
+        samples = bytearray()
+        for _ in range(size * size // 64):
+            samples += bytes(rng.randrange(256) for _ in range(3)) * 64
+        pixmap = fitz.Pixmap(fitz.csRGB, size, size, bytes(samples), 0)
+        top = 80 + index * 340
+        page.insert_image(fitz.Rect(50, top, page.rect.width - 50, top + 320), pixmap=pixmap)
+    return page
+
+
+def _scan_template(rng, dpi=100):
+    """
+    Rendert eine Textseite als Graustufenbild, wie sie ein Scanner liefern würde.
+    """
+    import fitz
+    template = fitz.open()
+    _add_text_page(template, rng)
+    pixmap = template[0].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    template.close()
+    return pixmap
+
+
+def generate_pdf(pdf_file, kind, pages, seed=CORPUS_SEED):
+    """
+    Erzeugt eine reproduzierbare PDF-Datei für den Benchmark.
+
+    :param pdf_file: Pfad der zu erzeugenden Datei.
+    :param kind: Art der Seiten, siehe CORPUS_KINDS.
+    :param pages: Seitenzahl.
+    :param seed: Startwert des Zufallsgenerators.
+    """
+    import fitz
+    rng = random.Random(f"{seed}-{kind}-{pages}")
+    doc = fitz.open()
+    if kind == 'scanned':
+        # Gescannte Seiten enthalten nur ein Bild und keine Textebene; die Vorlagen
+        # werden per xref wiederverwendet, damit der Korpus klein bleibt
+        templates = [_scan_template(rng) for _ in range(min(pages, SCAN_TEMPLATES))]
+        xrefs = []
+        for number in range(pages):
+            page = doc.new_page()
+            index = number % len(templates)
+            if index < len(xrefs):
+                page.insert_image(page.rect, xref=xrefs[index])
+            else:
+                xrefs.append(page.insert_image(page.rect, pixmap=templates[index]))
+    else:
+        add_page = {'text': _add_text_page, 'table': _add_table_page, 'image': _add_image_page}[kind]
+        for _ in range(pages):
+            add_page(doc, rng)
+    tmp_file = pdf_file + '.tmp'
+    doc.save(tmp_file, garbage=3, deflate=True)
+    doc.close()
+    os.replace(tmp_file, pdf_file)
+
+
+def generate_image(image_file, seed=CORPUS_SEED):
+    """
+    Erzeugt das Eingabebild für convert_from_file.
+    """
+    import fitz
+    rng = random.Random(f"{seed}-image")
+    doc = fitz.open()
+    _add_image_page(doc, rng)
+    doc[0].get_pixmap(dpi=150).save(image_file)
+    doc.close()
+
+
+def ensure_corpus(corpus_dir, kinds=CORPUS_KINDS, sizes=CORPUS_SIZES):
+    """
+    Legt fehlende Dateien des Korpus an. Vorhandene Dateien werden wiederverwendet.
+
+    :return: Dict mit (Art, Seitenzahl) -> Pfad, sowie dem Schlüssel 'image' für das Eingabebild.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = {}
+    for kind in kinds:
+        for pages in sizes:
+            pdf_file = os.path.join(corpus_dir, f"{kind}_{pages}.pdf")
+            if not os.path.exists(pdf_file):
+                print(f"Erzeuge {os.path.basename(pdf_file)} ...", file=sys.stderr)
+                generate_pdf(pdf_file, kind, pages)
+            corpus[(kind, pages)] = pdf_file
+    image_file = os.path.join(corpus_dir, 'image.png')
+    if not os.path.exists(image_file):
+        generate_image(image_file)
+    corpus['image'] = image_file
+    return corpus
+
+
+def _peak_rss_mb():
+    """
+    Höchster Speicherbedarf dieses Prozesses und seiner Kindprozesse (pdftoppm,
+    tesseract, Sharding-Worker) in MB, None wenn das Betriebssystem ihn nicht liefert.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux meldet Kilobyte, macOS Bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_case(case):
+    """
+    Führt einen einzelnen Messfall im aktuellen Prozess aus.
+
+    :param case: Dict mit 'stage', 'input', 'work_dir' und 'use_ocr'.
+    :return: Dict mit 'seconds', 'cpu_seconds', 'peak_rss_mb' und 'success'.
+    """
+    from stages import ConversionStages
+    logger = logging.getLogger('pdf_magic.benchmark')
+    logger.setLevel(logging.WARNING)
+    stage, input_file, work_dir = case['stage'], case['input'], case['work_dir']
+    stages = ConversionStages(work_dir, logger, use_ocr=case['use_ocr'])
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    if stage == 'docx':
+        success = stages.convert_pdf_to_docx(input_file) is not None
+    elif stage == 'format':
+        # Die DOCX-Datei hat measure_case in einem eigenen Prozess vorbereitet
+        docx_file = stages.docx_path(input_file)
+        success = os.path.exists(docx_file) and stages.format_docx(docx_file)
+    elif stage == 'images':
+        success = stages.convert_pdf_to_images(input_file) is not None
+    elif stage == 'text':
+        success = stages.extract_text_from_pdf(input_file, use_ocr=case['use_ocr']) is not None
+    elif stage == 'convert_from_file':
+        stages.convert_from_file(input_file)
+        success = os.path.exists(os.path.join(work_dir, os.path.basename(input_file).rsplit('.', 1)[0] + '.pdf'))
+    else:
+        success = stages.process_file(input_file)
+    return {
+        'seconds': time.perf_counter() - started,
+        'cpu_seconds': time.process_time() - cpu_started,
+        'peak_rss_mb': _peak_rss_mb(),
+        'success': bool(success),
+    }
+
+
+def measure_case(case, repeat=1):
+    """
+    Misst einen Fall in frischen Interpreter-Prozessen, damit der Speicherbedarf
+    nicht von vorherigen Fällen beeinflusst wird. Gemeldet wird der schnellste Lauf.
+    """
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix='pdf_magic_bench_') as work_dir:
+            # Die Formatierung braucht eine DOCX-Datei, die außerhalb der Messung entsteht
+            if case['stage'] == 'format':
+                _run_child(dict(case, stage='docx', work_dir=work_dir))
+            measurement = _run_child(dict(case, work_dir=work_dir))
+        if 'error' in measurement:
+            return measurement
+        if best is None or measurement['seconds'] < best['seconds']:
+            best = measurement
+    return best
+
+
+def _run_child(case):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)],
+                            cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'Abbruch'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def build_cases(corpus, kinds, sizes, stages):
+    cases = {}
+    for kind in kinds:
+        for pages in sizes:
+            for stage in stages:
+                if stage == 'convert_from_file':
+                    continue
+                cases[f"{kind}-{pages}/{stage}"] = {'stage': stage, 'input': corpus[(kind, pages)],
+                                                    'use_ocr': kind == 'scanned'}
+    if 'convert_from_file' in stages:
+        cases['image/convert_from_file'] = {'stage': 'convert_from_file', 'input': corpus['image'],
+                                            'use_ocr': False}
+    return cases
+
+
+def compare(results, baseline, tolerance):
+    """
+    Vergleicht die Messwerte mit der Baseline.
+
+    :return: Liste von (Fall, Kennzahl, Baseline, aktuell) für jede Regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or 'error' in result or 'error' in reference:
+            continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            old, new = reference.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + tolerance) and new - old > MIN_DELTA[metric]:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def _format_delta(result, reference, metric):
+    if not reference or not reference.get(metric) or result.get(metric) is None:
+        return ''
+    return f"{(result[metric] / reference[metric] - 1) * 100:+.0f} %"
+
+
+def print_results(results, baseline):
+    print(f"{'Fall':<32} {'Zeit':>10} {'Δ':>7} {'RSS':>10} {'Δ':>7}")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<32} Fehler: {result['error']}")
+            continue
+        reference = baseline.get(name)
+        rss = '-' if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']:.0f} MB"
+        flag = '' if result['success'] else '  (fehlgeschlagen)'
+        print(f"{name:<32} {result['seconds']:>8.2f} s {_format_delta(result, reference, 'seconds'):>7} "
+              f"{rss:>10} {_format_delta(result, reference, 'peak_rss_mb'):>7}{flag}")
+
+
+def _split(value, allowed, convert=str):
+    items = [convert(item.strip()) for item in value.split(',') if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unbekannt: {', '.join(map(str, unknown))} "
+                                         f"(erlaubt: {', '.join(map(str, allowed))})")
+    return items
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark der Konvertierungsschritte mit einem synthetischen Korpus.")
+    parser.add_argument('--kinds', type=lambda v: _split(v, CORPUS_KINDS), default=list(CORPUS_KINDS),
+                        help=f"Kommagetrennte Seitenarten (Standard: {','.join(CORPUS_KINDS)}).")
+    parser.add_argument('--sizes', type=lambda v: _split(v, CORPUS_SIZES, int), default=list(CORPUS_SIZES),
+                        help=f"Kommagetrennte Seitenzahlen (Standard: {','.join(map(str, CORPUS_SIZES))}).")
+    parser.add_argument('--stages', type=lambda v: _split(v, BENCH_STAGES), default=list(BENCH_STAGES),
+                        help=f"Kommagetrennte Schritte (Standard: {','.join(BENCH_STAGES)}).")
+    parser.add_argument('--repeat', type=int, default=1, help="Läufe pro Fall, gemeldet wird der schnellste.")
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR, help="Verzeichnis des generierten Korpus.")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline-Datei für den Vergleich.")
+    parser.add_argument('--save-baseline', action='store_true', help="Ergebnisse als neue Baseline speichern.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Erlaubte Verschlechterung gegenüber der Baseline (Standard: 0.15 = 15 %%).")
+    parser.add_argument('--json', dest='json_file', default=None, help="Ergebnisse zusätzlich als JSON schreiben.")
+    parser.add_argument('--run-case', default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    corpus = ensure_corpus(args.corpus_dir, args.kinds, args.sizes)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for name, case in build_cases(corpus, args.kinds, args.sizes, args.stages).items():
+        print(f"Messe {name} ...", file=sys.stderr)
+        results[name] = measure_case(case, args.repeat)
+    print_results(results, baseline)
+
+    report = {'python': sys.version.split()[0], 'platform': sys.platform, 'results': results}
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        # Bestehende Fälle anderer Läufe beibehalten
+        merged = dict(baseline, **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(dict(report, results=merged), f, indent=2, ensure_ascii=False)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name}: {metric} {old:.2f} -> {new:.2f}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic cache file
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+# Bei inkompatiblen Änderungen an den Ausgaben erhöhen, damit alte Einträge ungültig werden
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pdf_magic')
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+MANIFEST_NAME = 'manifest.json'
+
+# Bekannte Cachegröße je Verzeichnis in diesem Prozess. Die Engine legt je Datei
+# einen neuen ResultCache an, der Stand muss daher über die Instanz hinaus gelten.
+_known_sizes = {}
+_known_sizes_lock = threading.Lock()
+
+
+class ResultCache:
+    """
+    Persistenter Cache für Konvertierungsergebnisse auf der Festplatte.
+    Der Schlüssel ist ein Hash über den Dateiinhalt und die Konvertierungsoptionen,
+    der Dateiname spielt keine Rolle. Überschreitet der Cache seine Maximalgröße,
+    werden die am längsten nicht genutzten Einträge entfernt. Die Größe wird je
+    Prozess einmal gezählt und danach fortgeschrieben; das Verzeichnis wird nur
+    erneut durchsucht, wenn die Maximalgröße überschritten scheint. Einträge
+    anderer Prozesse fallen so erst beim nächsten Durchsuchen ins Gewicht.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        :param cache_dir: Verzeichnis des Caches, standardmäßig ~/.cache/pdf_magic.
+        :param max_bytes: Maximale Größe des Caches in Bytes.
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_file, options):
+        """
+        Berechnet den Cache-Schlüssel einer Datei.
+
+        :param pdf_file: Pfad zur Eingabedatei.
+        :param options: JSON-serialisierbares Dict der Optionen, die die Ausgabe beeinflussen.
+        :return: Hex-String des SHA-256-Hashes.
+        """
+        digest = hashlib.sha256()
+        with open(pdf_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps({'version': CACHE_FORMAT_VERSION, 'options': options}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def materialize(self, key, save_dir, name):
+        """
+        Legt die gespeicherten Ausgaben eines Eintrags in save_dir an.
+
+        :param key: Cache-Schlüssel.
+        :param save_dir: Zielverzeichnis.
+        :param name: Dateiname der Eingabe ohne Endung, wird in die Ausgabepfade eingesetzt.
+        :return: Liste der angelegten Dateien oder None, wenn kein gültiger Eintrag existiert.
+        """
+        entry_dir = self._entry_dir(key)
+        manifest_file = os.path.join(entry_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_file, encoding='utf-8') as f:
+                manifest = json.load(f)
+            outputs = []
+            for item in manifest['files']:
+                target = os.path.join(save_dir, item['template'].format(name=name))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(entry_dir, item['blob']), target)
+                outputs.append(target)
+            # Zugriffszeit für die LRU-Verdrängung aktualisieren
+            os.utime(manifest_file)
+            return outputs
+        except (OSError, ValueError, KeyError):
+            # Fehlender, unvollständiger oder gerade verdrängter Eintrag
+            return None
+
+    def store(self, key, outputs):
+        """
+        Speichert die Ausgaben einer Datei unter dem Schlüssel.
+
+        :param key: Cache-Schlüssel.
+        :param outputs: Liste von (Vorlage, Pfad)-Tupeln. Die Vorlage ist der Pfad
+                        relativ zu save_dir mit {name} anstelle des Dateinamens.
+        """
+        entry_dir = self._entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_dir), prefix='.tmp_')
+        try:
+            files = []
+            size = 0
+            for index, (template, path) in enumerate(outputs):
+                blob = str(index)
+                shutil.copyfile(path, os.path.join(tmp_dir, blob))
+                size += os.path.getsize(path)
+                files.append({'template': template, 'blob': blob})
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump({'files': files, 'size': size}, f)
+            # Eintrag atomar veröffentlichen; ein paralleler Worker kann ihn bereits angelegt haben
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        cache_id = os.path.realpath(self.cache_dir)
+        with _known_sizes_lock:
+            total = _known_sizes.get(cache_id)
+            if total is not None:
+                total = _known_sizes[cache_id] = total + size
+        if total is None or total > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Entfernt die am längsten nicht genutzten Einträge, bis der Cache
+        wieder unter seiner Maximalgröße liegt, und merkt sich die neue Größe.
+        """
+        entries = []
+        total = 0
+        for prefix in os.scandir(self.cache_dir):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                manifest_file = os.path.join(entry.path, MANIFEST_NAME)
+                try:
+                    with open(manifest_file, encoding='utf-8') as f:
+                        size = json.load(f)['size']
+                    last_used = os.path.getmtime(manifest_file)
+                except (OSError, ValueError, KeyError):
+                    continue
+                entries.append((last_used, size, entry.path))
+                total += size
+
+        for last_used, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+        with _known_sizes_lock:
+            _known_sizes[os.path.realpath(self.cache_dir)] = total
@@ -0,0 +1,351 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic command line file
+import argparse
+import glob
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from admission import parse_size
+from assemble import IMAGE_EXTENSIONS, images_to_pdf
+from encode import IMAGE_FORMATS, IMAGE_MODES, ImageOptions
+from engine import ProcessEngine
+from metrics import METRICS_NAME, StageMetrics
+from stages import STAGES as STAGE_NAMES, find_name_collisions
+from service import DEFAULT_HOST, DEFAULT_MAX_QUEUED, DEFAULT_PORT, JobManager, create_server
+from watch import DEFAULT_SETTLE_SECONDS, HotFolder
+
+logger = logging.getLogger('pdf_magic.cli')
+
+
+def expand_inputs(patterns, extensions=('.pdf',)):
+    """
+    Löst Glob-Muster und Verzeichnisse in eine sortierte Liste von PDF-Dateien auf.
+
+    :param patterns: Liste von Dateipfaden, Glob-Mustern oder Verzeichnissen.
+    :param extensions: Zulässige Dateiendungen, standardmäßig nur PDF.
+    :return: Liste eindeutiger Pfade in der Reihenfolge der Muster.
+    """
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*')
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            # Dieselbe Datei über verschiedene Pfade, z. B. ./a.pdf und a.pdf, nur einmal aufnehmen
+            real_path = os.path.realpath(path)
+            if path.lower().endswith(extensions) and os.path.isfile(path) and real_path not in seen:
+                seen.add(real_path)
+                files.append(path)
+    return files
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"muss mindestens 1 sein: {value}")
+    return number
+
+
+def parse_stages(value):
+    stages = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGE_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unbekannte Schritte: {', '.join(unknown)} (erlaubt: {', '.join(STAGE_NAMES)})")
+    return stages
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pdf_magic', description="PDF Magic ohne grafische Oberfläche.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Ausführliche Log-Ausgabe.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help="PDF-Dateien im Batch konvertieren.")
+    convert.add_argument('inputs', nargs='+', help="PDF-Dateien, Glob-Muster (z. B. 'scans/**/*.pdf') oder Verzeichnisse.")
+    add_stage_arguments(convert)
+    convert.add_argument('--resume', action='store_true', help="Abgebrochenen Batch anhand des Journals fortsetzen.")
+    convert.add_argument('--json', dest='json_file', default=None,
+                         help="Zusammenfassung als JSON in diese Datei schreiben ('-' für stdout).")
+    convert.add_argument('--progress', choices=('text', 'jsonl'), default=None,
+                         help="Fortschritt auf Seitenebene auf stderr ausgeben, als Text oder als JSON-Zeilen.")
+    convert.add_argument('--metrics', action='store_true',
+                         help=f"Zeit, CPU-Zeit und Speicherbedarf je Schritt nach {METRICS_NAME} im Zielverzeichnis schreiben.")
+    convert.add_argument('--prometheus', default=None,
+                         help="Pfad der Prometheus-Textdatei (Standard: pdf_magic.prom im Zielverzeichnis, nur mit --metrics).")
+    convert.add_argument('--profile', default=None,
+                         help="Dateiname einer PDF, deren Verarbeitung mit cProfile und tracemalloc profiliert wird.")
+    convert.set_defaults(func=command_convert)
+
+    assemble = subparsers.add_parser('assemble', help="Bilder ohne Neukodierung zu einer mehrseitigen PDF zusammenfügen.")
+    assemble.add_argument('inputs', nargs='+', help="Bilddateien, Glob-Muster oder Verzeichnisse, in dieser Reihenfolge.")
+    assemble.add_argument('-o', '--output', required=True, help="Pfad der zu schreibenden PDF.")
+    assemble.set_defaults(func=command_assemble)
+
+    watch = subparsers.add_parser('watch', help="Eingangsordner überwachen und neue PDFs fortlaufend konvertieren.")
+    watch.add_argument('inputs', nargs='+', help="Zu überwachende Eingangsordner.")
+    add_stage_arguments(watch)
+    watch.add_argument('--done-dir', default=None,
+                       help="Zielordner für verarbeitete Eingaben (Standard: done/ im jeweiligen Eingangsordner).")
+    watch.add_argument('--error-dir', default=None,
+                       help="Zielordner für fehlgeschlagene Eingaben (Standard: error/ im jeweiligen Eingangsordner).")
+    watch.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help="Sekunden ohne Änderung, nach denen eine Datei als vollständig gilt "
+                            f"(Standard: {DEFAULT_SETTLE_SECONDS:g}).")
+    watch.set_defaults(func=command_watch)
+
+    serve = subparsers.add_parser('serve', help="Lokalen HTTP-Dienst mit Auftragswarteschlange starten.")
+    add_stage_arguments(serve)
+    serve.add_argument('--host', default=DEFAULT_HOST, help=f"Adresse des Dienstes (Standard: {DEFAULT_HOST}).")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port des Dienstes (Standard: {DEFAULT_PORT}).")
+    serve.add_argument('--max-queued', type=int, default=DEFAULT_MAX_QUEUED,
+                       help=f"Höchstzahl wartender Aufträge (Standard: {DEFAULT_MAX_QUEUED}).")
+    serve.add_argument('--max-upload', type=parse_size, default='512M',
+                       help="Maximale Größe einer hochgeladenen PDF (Standard: 512M).")
+    serve.add_argument('--allow-path', action='append', default=[],
+                       help="Verzeichnis, aus dem Dateien per Pfad eingereicht werden dürfen (mehrfach angebbar).")
+    serve.set_defaults(func=command_serve)
+    return parser
+
+
+def add_stage_arguments(parser):
+    """
+    Optionen für Zielverzeichnis, Schritte und Worker, gemeinsam für convert und watch.
+    """
+    parser.add_argument('-o', '--output-dir', required=True, help="Zielverzeichnis für alle Ausgaben.")
+    parser.add_argument('-s', '--stages', type=parse_stages, default=list(STAGE_NAMES),
+                        help=f"Kommagetrennte Schritte (Standard: {','.join(STAGE_NAMES)}).")
+    parser.add_argument('-w', '--workers', type=positive_int, default=None, help="Anzahl der Worker-Prozesse (Standard: CPU-Kerne).")
+    parser.add_argument('--memory-budget', type=parse_size, default=None,
+                        help="Speicherbudget für gleichzeitig laufende Dateien, z. B. 8G (Standard: 75 %% des RAM).")
+    parser.add_argument('--ocr', action='store_true', help="Seiten ohne Textebene per OCR erkennen.")
+    parser.add_argument('--ocr-workers', type=positive_int, default=None,
+                        help="Gleichzeitige OCR-Aufrufe je Datei (Standard: CPU-Kerne).")
+    parser.add_argument('--sharding', action='store_true', help="Große PDFs in parallelen Seitenbereichen konvertieren.")
+    parser.add_argument('--parallel-text', action='store_true',
+                        help="Textebene großer PDFs in parallelen Seitenbereichen lesen und je Seite eine Textdatei schreiben.")
+    parser.add_argument('--text-workers', type=positive_int, default=None,
+                        help="Prozesse für --parallel-text (Standard: CPU-Kerne).")
+    parser.add_argument('--shard-workers', type=positive_int, default=None,
+                        help="Prozesse für die Seitenbereiche einer DOCX-Konvertierung (Standard: CPU-Kerne).")
+    parser.add_argument('--image-format', choices=IMAGE_FORMATS, default='png',
+                        help="Format der Seitenbilder, 'tiff' schreibt eine mehrseitige Datei (Standard: png).")
+    parser.add_argument('--dpi', type=int, default=None, help="Auflösung der Seitenbilder (Standard: 200).")
+    parser.add_argument('--image-mode', choices=IMAGE_MODES, default='color',
+                        help="Farbmodus der Seitenbilder, 'bitonal' schreibt 1-Bit-Bilder (Standard: color).")
+    parser.add_argument('--png-compression', type=int, default=6,
+                        help="zlib-Kompressionsstufe für PNG, 0 (schnell) bis 9 (klein) (Standard: 6).")
+    parser.add_argument('--quality', type=int, default=85, help="Qualität für JPEG und WebP, 1 bis 100 (Standard: 85).")
+    parser.add_argument('--image-workers', type=positive_int, default=None,
+                        help="Gleichzeitig kodierte Seiten je Datei (Standard: CPU-Kerne).")
+    parser.add_argument('--write-workers', type=positive_int, default=None,
+                        help="Threads, die kodierte Seitenbilder schreiben, je Datei (Standard: 2).")
+    parser.add_argument('--cache-dir', default=None, help="Verzeichnis des Ergebnis-Caches.")
+
+
+def build_stage_options(args):
+    """
+    Optionen für ConversionStages aus den gemeinsamen Argumenten.
+
+    :raises ValueError: Bei ungültigen Bildoptionen.
+    """
+    stage_options = {'stages': args.stages, 'use_ocr': args.ocr, 'sharding': args.sharding,
+                     'parallel_text': args.parallel_text}
+    for name in ('ocr_workers', 'shard_workers', 'text_workers'):
+        if getattr(args, name) is not None:
+            stage_options[name] = getattr(args, name)
+    if args.cache_dir:
+        stage_options['cache_dir'] = args.cache_dir
+    image_options = {'fmt': args.image_format, 'mode': args.image_mode, 'png_compression': args.png_compression,
+                     'quality': args.quality, 'workers': args.image_workers, 'write_workers': args.write_workers}
+    if args.dpi:
+        image_options['dpi'] = args.dpi
+    ImageOptions(**image_options)
+    stage_options['image_options'] = image_options
+    return stage_options
+
+
+def command_convert(args):
+    """
+    Führt einen Batch über die ProcessEngine aus.
+
+    :return: Exit-Code, 0 wenn alle Dateien erfolgreich verarbeitet wurden.
+    """
+    pdf_files = expand_inputs(args.inputs)
+    if not pdf_files:
+        logger.error("Keine PDF-Dateien gefunden.")
+        return 2
+    # Ausgaben werden nach dem Dateinamen benannt; gleichnamige Dateien würden sich überschreiben
+    collisions = find_name_collisions(pdf_files)
+    if collisions:
+        for files in collisions.values():
+            logger.error(f"Gleichnamige Eingaben, Ausgaben würden sich überschreiben: {', '.join(files)}")
+        return 2
+
+    try:
+        stage_options = build_stage_options(args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    if args.metrics:
+        stage_options['metrics'] = True
+    if args.profile:
+        stage_options['profile'] = args.profile
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.monotonic()
+    engine = ProcessEngine(args.output_dir, max_workers=args.workers, logger=logger,
+                           stage_options=stage_options, resume=args.resume, memory_budget=args.memory_budget)
+    last_progress = []
+
+    def on_progress(progress):
+        last_progress[:] = [progress]
+        write_progress(progress, args.progress)
+
+    results = engine.run(pdf_files, on_progress=on_progress)
+    elapsed = time.monotonic() - started
+
+    failed = [pdf_file for pdf_file in pdf_files if not results.get(pdf_file)]
+    summary = {
+        'output_dir': os.path.abspath(args.output_dir),
+        'stages': args.stages,
+        'total': len(pdf_files),
+        'succeeded': len(pdf_files) - len(failed),
+        'failed': len(failed),
+        'elapsed_seconds': round(elapsed, 3),
+        'progress': last_progress[0].to_dict() if last_progress else None,
+        'files': [{'file': pdf_file, 'success': bool(results.get(pdf_file))} for pdf_file in pdf_files],
+    }
+    if args.metrics:
+        prom_file = StageMetrics(args.output_dir).write_prometheus(args.prometheus)
+        logger.info(f"Metriken geschrieben: {os.path.join(args.output_dir, METRICS_NAME)}, {prom_file}")
+    write_summary(summary, args.json_file)
+    logger.info(f"{summary['succeeded']} von {summary['total']} Dateien erfolgreich verarbeitet ({elapsed:.1f} s).")
+    return 1 if failed else 0
+
+
+def command_assemble(args):
+    """
+    Fügt Bilder zu einer PDF zusammen. JPEG-Daten werden unverändert übernommen.
+
+    :return: Exit-Code, 0 wenn die PDF geschrieben wurde.
+    """
+    image_files = expand_inputs(args.inputs, IMAGE_EXTENSIONS)
+    if not image_files:
+        logger.error("Keine Bilddateien gefunden.")
+        return 2
+    started = time.monotonic()
+    try:
+        page_count = images_to_pdf(image_files, args.output)
+    except Exception as e:
+        logger.error(f"Fehler beim Zusammenfügen der Bilder: {str(e)}")
+        return 1
+    logger.info(f"{page_count} Seiten aus {len(image_files)} Bildern nach {args.output} geschrieben "
+                f"({time.monotonic() - started:.1f} s).")
+    return 0
+
+
+def command_watch(args):
+    """
+    Überwacht die Eingangsordner, bis der Prozess SIGINT oder SIGTERM erhält.
+    Laufende Dateien werden vor dem Beenden noch fertig verarbeitet.
+
+    :return: Exit-Code, 0 nach regulärem Beenden, 1 nach einem Abbruch der Verarbeitung.
+    """
+    try:
+        stage_options = build_stage_options(args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    os.makedirs(args.output_dir, exist_ok=True)
+    engine = ProcessEngine(args.output_dir, max_workers=args.workers, logger=logger,
+                           stage_options=stage_options, memory_budget=args.memory_budget)
+    hot_folder = HotFolder(args.inputs, engine, done_dir=args.done_dir, error_dir=args.error_dir,
+                           settle=args.settle, logger=logger)
+
+    def stop(signum, frame):
+        logger.info("Beende nach Abschluss der laufenden Dateien ...")
+        hot_folder.stop()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    hot_folder.run()
+    logger.info(f"{hot_folder.processed} Dateien verarbeitet, {hot_folder.failed} fehlgeschlagen.")
+    return 1 if hot_folder.error is not None else 0
+
+
+def command_serve(args):
+    """
+    Startet den HTTP-Dienst, bis der Prozess SIGINT oder SIGTERM erhält.
+    Das Zielverzeichnis enthält hochgeladene Eingaben (uploads/) und Ausgaben (output/).
+
+    :return: Exit-Code, 0 nach regulärem Beenden, 1 nach einem Abbruch der Verarbeitung.
+    """
+    try:
+        stage_options = build_stage_options(args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    def engine_factory(save_dir):
+        return ProcessEngine(save_dir, max_workers=args.workers, logger=logger, stage_options=stage_options,
+                             memory_budget=args.memory_budget)
+
+    def shutdown():
+        # shutdown() wartet auf serve_forever und darf daher nicht in dessen Thread laufen
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    manager = JobManager(args.output_dir, engine_factory, max_queued=args.max_queued,
+                         allowed_paths=args.allow_path, logger=logger, on_failure=shutdown)
+    server = create_server(manager, args.host, args.port, args.max_upload)
+    manager.start()
+
+    def stop(signum, frame):
+        logger.info("Beende nach Abschluss der laufenden Aufträge ...")
+        shutdown()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    logger.info(f"Dienst läuft auf http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        manager.stop()
+    return 1 if manager.error is not None else 0
+
+
+def write_progress(progress, fmt):
+    if fmt == 'text':
+        sys.stderr.write(f"\r{progress}")
+        if progress.files_done >= progress.files_total:
+            sys.stderr.write('\n')
+    elif fmt == 'jsonl':
+        sys.stderr.write(json.dumps(progress.to_dict()) + '\n')
+    sys.stderr.flush()
+
+
+def write_summary(summary, json_file):
+    if json_file is None:
+        return
+    if json_file == '-':
+        json.dump(summary, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Log-Ausgabe auf stderr, damit stdout für die JSON-Zusammenfassung frei bleibt
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic DOCX patch file
+import os
+import shutil
+import tempfile
+import zipfile
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+DOCUMENT_PART = 'word/document.xml'
+STYLES_PART = 'word/styles.xml'
+
+# Reihenfolge der Kindelemente laut OOXML-Schema; neue Elemente müssen davor eingefügt werden
+STYLE_CHILDREN = ('name', 'aliases', 'basedOn', 'next', 'link', 'autoRedefine', 'uiPriority', 'semiHidden',
+                  'unhideWhenUsed', 'qFormat', 'locked', 'personal', 'personalCompose', 'personalReply',
+                  'rsid', 'pPr', 'rPr', 'tblPr', 'trPr', 'tcPr', 'tblStylePr')
+RPR_CHILDREN = ('rStyle', 'rFonts', 'b', 'bCs', 'i', 'iCs', 'caps', 'smallCaps', 'strike', 'dstrike', 'outline',
+                'shadow', 'emboss', 'imprint', 'noProof', 'snapToGrid', 'vanish', 'webHidden', 'color', 'spacing',
+                'w', 'kern', 'position', 'sz', 'szCs', 'highlight', 'u', 'effect', 'bdr', 'shd', 'fitText',
+                'vertAlign', 'rtl', 'cs', 'em', 'lang', 'eastAsianLayout', 'specVanish', 'oMath')
+
+
+def w(tag):
+    return f"{{{W_NS}}}{tag}"
+
+
+def get_or_add_child(parent, tag, order):
+    """
+    Liefert das Kindelement `tag` oder legt es an der vom Schema vorgegebenen Position an.
+
+    :param order: Reihenfolge der Kindelemente von `parent` als Tupel lokaler Namen.
+    """
+    child = parent.find(w(tag))
+    if child is not None:
+        return child
+    child = parent.makeelement(w(tag), {})
+    successors = {w(name) for name in order[order.index(tag) + 1:]}
+    for index, sibling in enumerate(parent):
+        if sibling.tag in successors:
+            parent.insert(index, child)
+            return child
+    parent.append(child)
+    return child
+
+
+def collect_paragraph_styles(document_stream):
+    """
+    Ermittelt in einem Durchlauf die Formatvorlagen der Absätze im Dokumentkörper
+    und in den Zellen der Tabellen auf oberster Ebene, wie sie python-docx über
+    doc.paragraphs und doc.tables liefert.
+
+    :param document_stream: Dateiobjekt mit word/document.xml.
+    :return: Tupel (Menge der Vorlagen-IDs, ob Absätze ohne Vorlage vorkommen).
+    """
+    from lxml import etree
+
+    body_paths = ((w('document'), w('body'), w('p')),
+                  (w('document'), w('body'), w('tbl'), w('tr'), w('tc'), w('p')))
+    release_paths = ((w('document'), w('body')), (w('document'), w('body'), w('tbl')))
+    style_ids = set()
+    uses_default = False
+    stack = []
+    pending = []
+    for event, element in etree.iterparse(document_stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element.tag)
+            if element.tag == w('p'):
+                pending.append(tuple(stack) in body_paths)
+            continue
+
+        stack.pop()
+        if element.tag == w('p'):
+            if pending.pop():
+                style = element.find(f"{w('pPr')}/{w('pStyle')}")
+                if style is None:
+                    uses_default = True
+                else:
+                    style_ids.add(style.get(w('val')))
+        # Abgeschlossene Kinder des Körpers und der Tabellen auf oberster Ebene leeren und
+        # samt ihrer Vorgänger aus dem Baum lösen, damit der Speicher begrenzt bleibt
+        if tuple(stack) in release_paths:
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    return style_ids, uses_default
+
+
+def patch_style_fonts(styles_xml, style_ids, uses_default, font_name, half_points):
+    """
+    Setzt Schriftart und -größe der angegebenen Absatzvorlagen in styles.xml.
+
+    :return: Geändertes styles.xml als Bytes.
+    """
+    from lxml import etree
+
+    root = etree.fromstring(styles_xml)
+    for style in root.iterfind(w('style')):
+        if style.get(w('type')) != 'paragraph':
+            continue
+        is_default = style.get(w('default')) in ('1', 'true', 'on')
+        if style.get(w('styleId')) not in style_ids and not (uses_default and is_default):
+            continue
+        r_pr = get_or_add_child(style, 'rPr', STYLE_CHILDREN)
+        fonts = get_or_add_child(r_pr, 'rFonts', RPR_CHILDREN)
+        fonts.set(w('ascii'), font_name)
+        fonts.set(w('hAnsi'), font_name)
+        get_or_add_child(r_pr, 'sz', RPR_CHILDREN).set(w('val'), str(half_points))
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def patch_docx_fonts(docx_file, font_name='Arial', font_size_pt=11):
+    """
+    Setzt Schriftart und -größe aller von Absätzen verwendeten Formatvorlagen
+    direkt im Zip-Archiv. Entspricht dem Setzen von paragraph.style.font über
+    python-docx, ohne das Dokument als Objektmodell zu laden: document.xml wird
+    nur gelesen, styles.xml angepasst und alle übrigen Teile unverändert kopiert.
+
+    :param docx_file: Pfad zur DOCX-Datei, wird überschrieben.
+    :param font_name: Schriftart.
+    :param font_size_pt: Schriftgröße in Punkt.
+    """
+    with zipfile.ZipFile(docx_file) as source:
+        with source.open(DOCUMENT_PART) as document_stream:
+            style_ids, uses_default = collect_paragraph_styles(document_stream)
+        styles_xml = patch_style_fonts(source.read(STYLES_PART), style_ids, uses_default,
+                                       font_name, int(font_size_pt * 2))
+
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(docx_file)), suffix='.docx')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_file, 'w') as target:
+                for info in source.infolist():
+                    target_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    target_info.compress_type = info.compress_type
+                    target_info.external_attr = info.external_attr
+                    if info.filename == STYLES_PART:
+                        target.writestr(target_info, styles_xml)
+                        continue
+                    with source.open(info) as src, target.open(target_info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+    os.replace(tmp_file, docx_file)
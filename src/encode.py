@@ -0,0 +1,205 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic encode file
+import io
+import os
+import tempfile
+from pipeline import Pipeline, Stage
+from render import DEFAULT_DPI, DEFAULT_WINDOW, get_page_count, render_to_files
+
+IMAGE_FORMATS = ('png', 'jpeg', 'webp', 'tiff')
+IMAGE_MODES = ('color', 'gray', 'bitonal')
+FILE_EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp', 'tiff': 'tiff'}
+# Name der mehrseitigen TIFF-Datei im Bildverzeichnis einer PDF
+TIFF_NAME = 'pages.tiff'
+# Threads, die kodierte Seiten auf die Festplatte schreiben
+DEFAULT_WRITE_WORKERS = 2
+
+
+class ImageOptions:
+    """
+    Ausgabeoptionen für gerenderte Seiten.
+    """
+
+    def __init__(self, fmt='png', dpi=DEFAULT_DPI, mode='color', png_compression=6, quality=85, workers=None,
+                 write_workers=None):
+        """
+        :param fmt: Bildformat, siehe IMAGE_FORMATS. TIFF erzeugt eine mehrseitige Datei.
+        :param dpi: Auflösung der gerenderten Seiten.
+        :param mode: Farbmodus, siehe IMAGE_MODES. 'bitonal' schreibt 1-Bit-Bilder.
+        :param png_compression: zlib-Kompressionsstufe für PNG, 0 (schnell) bis 9 (klein).
+        :param quality: Qualität für JPEG und WebP, 1 bis 100.
+        :param workers: Anzahl gleichzeitig kodierter Seiten, standardmäßig die Anzahl der CPU-Kerne.
+        :param write_workers: Anzahl der Threads, die kodierte Seiten schreiben, standardmäßig DEFAULT_WRITE_WORKERS.
+        """
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unbekanntes Bildformat: {fmt} (erlaubt: {', '.join(IMAGE_FORMATS)})")
+        if mode not in IMAGE_MODES:
+            raise ValueError(f"Unbekannter Farbmodus: {mode} (erlaubt: {', '.join(IMAGE_MODES)})")
+        if fmt in ('jpeg', 'webp') and mode == 'bitonal':
+            raise ValueError(f"{fmt.upper()} unterstützt keine 1-Bit-Bilder, bitte PNG oder TIFF verwenden.")
+        if not 0 <= png_compression <= 9:
+            raise ValueError("Die PNG-Kompressionsstufe muss zwischen 0 und 9 liegen.")
+        if not 1 <= quality <= 100:
+            raise ValueError("Die Qualität muss zwischen 1 und 100 liegen.")
+        self.fmt = fmt
+        self.dpi = dpi
+        self.mode = mode
+        self.png_compression = png_compression
+        self.quality = quality
+        self.workers = workers
+        self.write_workers = write_workers
+
+    @classmethod
+    def from_dict(cls, options=None):
+        return options if isinstance(options, cls) else cls(**(options or {}))
+
+    def to_dict(self):
+        """
+        Optionen, die das Ergebnis beeinflussen, z. B. für den Cache-Schlüssel.
+        """
+        return {'fmt': self.fmt, 'dpi': self.dpi, 'mode': self.mode,
+                'png_compression': self.png_compression, 'quality': self.quality}
+
+    @property
+    def extension(self):
+        return FILE_EXTENSIONS[self.fmt]
+
+    @property
+    def reusable_for_ocr(self):
+        """
+        Farbige PNG-Seiten mit 200 DPI kann die OCR derselben Sitzung wiederverwenden.
+        """
+        return self.fmt == 'png' and self.mode == 'color' and self.dpi == DEFAULT_DPI
+
+    def save_arguments(self):
+        if self.fmt == 'png':
+            return {'format': 'PNG', 'compress_level': self.png_compression}
+        if self.fmt == 'jpeg':
+            return {'format': 'JPEG', 'quality': self.quality, 'optimize': False}
+        if self.fmt == 'webp':
+            return {'format': 'WEBP', 'quality': self.quality, 'method': 4}
+        # CCITT Group 4 ist für 1-Bit-Scans deutlich kleiner als Deflate
+        return {'format': 'TIFF', 'compression': 'group4' if self.mode == 'bitonal' else 'tiff_deflate'}
+
+
+def _prepare(image, mode):
+    if mode == 'gray':
+        return image.convert('L')
+    if mode == 'bitonal':
+        # Schwellenwert statt Dithering, damit Text für OCR und Group-4-Kompression scharf bleibt
+        return image.convert('L').point(lambda value: 255 if value >= 128 else 0, mode='1')
+    return image.convert('RGB')
+
+
+def encode_page_data(raw_file, options):
+    """
+    Kodiert eine unkomprimiert gerenderte Seite im gewünschten Format im
+    Speicher und löscht die Rohdatei.
+
+    :return: Kodierte Bilddaten als bytes.
+    """
+    from PIL import Image
+    buffer = io.BytesIO()
+    with Image.open(raw_file) as image:
+        page = _prepare(image, options.mode)
+        page.save(buffer, dpi=(options.dpi, options.dpi), **options.save_arguments())
+    os.remove(raw_file)
+    return buffer.getvalue()
+
+
+def encode_page(raw_file, image_file, options):
+    """
+    Kodiert eine unkomprimiert gerenderte Seite im gewünschten Format und löscht die Rohdatei.
+
+    :return: Pfad der geschriebenen Bilddatei.
+    """
+    data = encode_page_data(raw_file, options)
+    with open(image_file, 'wb') as f:
+        f.write(data)
+    return image_file
+
+
+def encode_pages(pdf_file, output_dir, options=None, page_count=None, window=DEFAULT_WINDOW, on_pages=None):
+    """
+    Rendert die Seiten fensterweise ohne Kompression (PPM/PGM) und reicht sie
+    durch eine Pipeline mit begrenzten Queues: pdftoppm rendert im aufrufenden
+    Thread, options.workers Threads kodieren (Pillow gibt den GIL dabei frei),
+    options.write_workers Threads schreiben die fertigen Bilder. Ist eine Stufe
+    ausgelastet, wartet die vorherige, daher liegen höchstens zwei Fenster als
+    Rohdaten auf der Festplatte. Mehrseitige TIFF-Dateien werden nacheinander
+    in eine Datei geschrieben.
+
+    :param pdf_file: Pfad zur PDF-Datei.
+    :param output_dir: Zielverzeichnis der Bilder.
+    :param options: ImageOptions oder Dict mit deren Argumenten.
+    :param page_count: Seitenzahl, falls bereits bekannt.
+    :param window: Anzahl der Seiten pro Renderdurchlauf.
+    :param on_pages: Optionaler Callback mit der Anzahl der jeweils fertig geschriebenen Seiten.
+    :return: Liste der geschriebenen Dateipfade in Seitenreihenfolge.
+    """
+    options = ImageOptions.from_dict(options)
+    os.makedirs(output_dir, exist_ok=True)
+    page_count = page_count or get_page_count(pdf_file)
+    grayscale = options.mode != 'color'
+
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix='.raw_') as raw_dir:
+        if options.fmt == 'tiff':
+            return [_write_tiff(pdf_file, output_dir, raw_dir, options, page_count, window, grayscale, on_pages)]
+
+        def image_path(page_number):
+            return os.path.join(output_dir, f"page_{page_number}.{options.extension}")
+
+        def rendered():
+            for first in range(1, page_count + 1, window):
+                last = min(first + window - 1, page_count)
+                raw_files = render_to_files(pdf_file, raw_dir, dpi=options.dpi, window=window, page_count=page_count,
+                                            fmt='ppm', first_page=first, last_page=last, grayscale=grayscale)
+                yield from enumerate(raw_files, start=first)
+
+        def encode(item):
+            page_number, raw_file = item
+            return image_path(page_number), encode_page_data(raw_file, options)
+
+        def write(item):
+            image_file, data = item
+            with open(image_file, 'wb') as f:
+                f.write(data)
+            if on_pages is not None:
+                on_pages(1)
+            return image_file
+
+        pipeline = Pipeline([
+            Stage('encode', encode, workers=options.workers or os.cpu_count() or 1, queue_size=window),
+            Stage('write', write, workers=options.write_workers or DEFAULT_WRITE_WORKERS),
+        ])
+        pipeline.run(rendered())
+        return [image_path(page_number) for page_number in range(1, page_count + 1)]
+
+
+def _write_tiff(pdf_file, output_dir, raw_dir, options, page_count, window, grayscale, on_pages):
+    """
+    Schreibt alle Seiten in eine mehrseitige TIFF-Datei. Die Seiten werden beim
+    Schreiben nacheinander geladen, daher liegt immer nur ein Fenster auf der Festplatte.
+    """
+    from PIL import Image
+
+    def pages():
+        for first in range(1, page_count + 1, window):
+            last = min(first + window - 1, page_count)
+            raw_files = render_to_files(pdf_file, raw_dir, dpi=options.dpi, window=window, page_count=page_count,
+                                        fmt='ppm', first_page=first, last_page=last, grayscale=grayscale)
+            for raw_file in raw_files:
+                with Image.open(raw_file) as image:
+                    page = _prepare(image, options.mode)
+                os.remove(raw_file)
+                yield page
+                if on_pages is not None:
+                    on_pages(1)
+
+    tiff_file = os.path.join(output_dir, TIFF_NAME)
+    images = pages()
+    first_page = next(images)
+    first_page.save(tiff_file, save_all=True, append_images=images, dpi=(options.dpi, options.dpi),
+                    **options.save_arguments())
+    return tiff_file
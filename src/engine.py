@@ -0,0 +1,467 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic engine file
+import concurrent.futures
+import functools
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from admission import MemoryBudget, default_memory_budget, estimate_memory
+from journal import BatchJournal
+from metrics import StageMetrics
+from progress import ProgressTracker, QueueReporter, apply_message
+from stages import ConversionStages, find_name_collisions, output_name, select_stages
+
+WORKER_LOGGER_NAME = 'pdf_magic.worker'
+# Wartezeit in Sekunden, nach der auf neue Dateien, Stopp- und Abbruchsignal geprüft wird
+SERVE_POLL_INTERVAL = 0.5
+# Zeit in Sekunden, die laufende Dateien nach cancel() zum Abbrechen haben, bevor ihre Worker beendet werden
+CANCEL_GRACE_SECONDS = 5
+# Zeit in Sekunden, die auf einen Weiterleitungs-Thread gewartet wird, nachdem Worker hart beendet wurden
+FORWARD_ABANDON_TIMEOUT = 1
+
+# Fortschritts-Queue und Abbruchsignal des Worker-Prozesses, werden von _init_worker gesetzt
+_progress_queue = None
+_cancel_event = None
+
+
+def _init_worker(log_queue, progress_queue=None, cancel_event=None, pid_queue=None):
+    """
+    Leitet das Logging eines Worker-Prozesses in die gemeinsame Queue um.
+    Jeder Worker bildet eine eigene Prozessgruppe, damit ein harter Abbruch auch
+    seine Kindprozesse (Seitenbereiche, pdftoppm, tesseract) erfasst und ein
+    SIGINT im Terminal nur den Elternprozess erreicht.
+    """
+    global _progress_queue, _cancel_event
+    _progress_queue = progress_queue
+    _cancel_event = cancel_event
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    if pid_queue is not None:
+        pid_queue.put(os.getpid())
+    worker_logger = logging.getLogger(WORKER_LOGGER_NAME)
+    worker_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    worker_logger.setLevel(logging.INFO)
+    worker_logger.propagate = False
+
+
+def _process_file(save_dir, pdf_file, stage_options, done_stages, job_id=None, journal=True):
+    """
+    Verarbeitet eine PDF-Datei innerhalb eines Worker-Prozesses.
+
+    :param journal: Abgeschlossene Schritte im Batch-Journal festhalten.
+    :return: stages.FileResult, wahr bei vollständigem Erfolg.
+    """
+    progress = QueueReporter(_progress_queue) if _progress_queue is not None else None
+    stages = ConversionStages(save_dir, logging.getLogger(WORKER_LOGGER_NAME), journal=journal, progress=progress,
+                              cancel_event=_cancel_event, job_id=job_id, **stage_options)
+    return stages.process_file(pdf_file, done_stages=done_stages)
+
+
+def _kill_process_groups(pid_queue):
+    """
+    Beendet die Prozessgruppen aller Worker, deren PID in der Queue steht, samt Kindprozessen.
+    """
+    while True:
+        try:
+            pid = pid_queue.get_nowait()
+        except (queue.Empty, OSError, EOFError):
+            return
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(pid, signal.SIGKILL)
+            else:
+                os.kill(pid, signal.SIGTERM)
+        except OSError:
+            # Worker bereits beendet
+            pass
+
+
+class _QueueForwarder:
+    """
+    Liest eine Queue der Worker-Prozesse in einem Thread und übergibt jeden
+    Eintrag an handle. Es wird mit Zeitlimit gelesen statt auf ein Endezeichen
+    gewartet, da ein hart beendeter Worker die Schreibsperre der Queue halten kann.
+    """
+
+    def __init__(self, source, handle):
+        self.source = source
+        self.handle = handle
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self.source.get(timeout=SERVE_POLL_INTERVAL)
+            except queue.Empty:
+                if self.stopping.is_set():
+                    return
+                continue
+            except (OSError, EOFError, ValueError):
+                return
+            self.handle(item)
+
+    def stop(self, abandon=False):
+        """
+        Beendet den Thread, sobald die Queue geleert ist, und schließt die Queue.
+
+        :param abandon: Worker wurden hart beendet; nicht auf eine womöglich
+                        unvollständige Nachricht warten und die Queue ohne Leeren schließen.
+        """
+        self.stopping.set()
+        self.thread.join(timeout=FORWARD_ABANDON_TIMEOUT if abandon else None)
+        self.source.cancel_join_thread()
+        self.source.close()
+
+
+class ProcessEngine:
+    """
+    Führt die Konvertierung von PDF-Dateien in einem Prozess-Pool aus.
+    Log-Einträge und Ergebnisse der Worker werden an den Elternprozess
+    zurückgegeben, ein Fehler betrifft immer nur die jeweilige Datei.
+    """
+
+    def __init__(self, save_dir, max_workers=None, logger=None, stage_options=None, resume=False, memory_budget=None,
+                 budget=None, job_id=None):
+        """
+        :param save_dir: Zielverzeichnis für alle Ausgaben.
+        :param max_workers: Anzahl der Worker-Prozesse, standardmäßig die Anzahl der CPU-Kerne.
+        :param logger: Logger im Elternprozess, der die Worker-Meldungen erhält.
+        :param stage_options: Zusätzliche Argumente für ConversionStages in den Workern.
+        :param resume: Einen abgebrochenen Batch anhand des Journals in save_dir fortsetzen.
+        :param memory_budget: Speicherbudget in Bytes für alle gleichzeitig laufenden Dateien,
+                              standardmäßig drei Viertel des physischen Speichers.
+        :param budget: Optionales admission.MemoryBudget, das sich mehrere Engines teilen,
+                       z. B. die gleichzeitigen Aufträge der GUI; ersetzt memory_budget.
+        :param job_id: Kennung des Auftrags, wenn mehrere Engines gleichzeitig in save_dir
+                       schreiben; Journal und Metrikdatei sind dann je Auftrag getrennt.
+        """
+        self.save_dir = save_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logger or logging.getLogger(__name__)
+        self.stage_options = stage_options or {}
+        self.resume = resume
+        self.budget = budget
+        self.memory_budget = budget.budget_bytes if budget is not None else memory_budget or default_memory_budget()
+        self.job_id = job_id
+        # Wird mit den Workern geteilt, die laufende Dateien daraufhin selbst abbrechen
+        self.cancel_event = multiprocessing.Event()
+
+    def cancel(self):
+        """
+        Bricht run() ab: wartende Dateien werden nicht mehr gestartet, laufende
+        brechen zwischen zwei Seiten oder Schritten ab. Worker, die nicht innerhalb
+        von CANCEL_GRACE_SECONDS reagieren, werden samt Kindprozessen beendet.
+        Kann aus einem beliebigen Thread aufgerufen werden.
+        """
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self, pdf_files, on_result=None, on_progress=None):
+        """
+        Verarbeitet alle Dateien parallel.
+
+        :param pdf_files: Liste von Pfaden zu PDF-Dateien.
+        :param on_result: Optionaler Callback (pdf_file, success, done, total), der im
+                          Elternprozess nach jeder fertigen Datei aufgerufen wird.
+        :param on_progress: Optionaler Callback, der im Elternprozess regelmäßig eine
+                            progress.BatchProgress-Momentaufnahme auf Seitenebene erhält.
+        :return: Dict mit Dateipfad -> stages.FileResult, für übersprungene oder abgestürzte Dateien True/False.
+        """
+        results = {}
+        if not pdf_files:
+            return results
+
+        total = len(pdf_files)
+        tracker = ProgressTracker(pdf_files, on_progress)
+
+        def finished(pdf_file, *args):
+            tracker.finish(pdf_file)
+            if on_result:
+                on_result(pdf_file, *args)
+
+        # Gleichnamige Dateien würden dieselben Ausgaben schreiben, nur die erste wird verarbeitet
+        for files in find_name_collisions(pdf_files).values():
+            for pdf_file in files[1:]:
+                self.logger.error(f"Ausgabename bereits durch {files[0]} belegt, übersprungen: {pdf_file}")
+                self._record(results, pdf_file, False, finished, total)
+        pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file not in results]
+
+        journal = BatchJournal(self.save_dir, self.job_id)
+        if self.resume:
+            journal.seal()
+            done_stages = journal.completed_stages(pdf_files)
+        else:
+            journal.reset()
+            done_stages = {}
+            if self.stage_options.get('metrics'):
+                StageMetrics(self.save_dir, self.job_id).reset()
+
+        # Vollständig abgeschlossene Dateien gar nicht erst an die Worker geben
+        selected = set(select_stages(self.stage_options.get('stages')))
+        pending = []
+        for pdf_file in pdf_files:
+            if done_stages.get(pdf_file, set()) >= selected:
+                self.logger.info(f"Bereits verarbeitet, übersprungen: {pdf_file}")
+                self._record(results, pdf_file, True, finished, total)
+            else:
+                pending.append(pdf_file)
+        if not pending:
+            return results
+
+        # Speicherbedarf vor dem Start schätzen, damit große Scans nicht gleichzeitig laufen
+        costs = {}
+        for pdf_file in pending:
+            if self.cancelled:
+                return results
+            costs[pdf_file] = estimate_memory(pdf_file, self.stage_options)
+        for pdf_file, cost in costs.items():
+            if cost > self.memory_budget:
+                self.logger.info(f"Geschätzter Speicherbedarf {cost // 1024 ** 2} MB übersteigt das Budget, "
+                                 f"Datei wird allein verarbeitet: {pdf_file}")
+
+        log_queue = multiprocessing.Queue()
+        log_forwarder = _QueueForwarder(log_queue, self.logger.handle)
+        # Seitenmeldungen der Worker laufen über eine eigene Queue zum Tracker
+        progress_queue = multiprocessing.Queue() if on_progress else None
+        if progress_queue is not None:
+            progress_forwarder = _QueueForwarder(progress_queue, functools.partial(apply_message, tracker))
+        crashed = []
+        try:
+            crashed = self._run_pool(pending, self.max_workers, log_queue, progress_queue, done_stages, costs,
+                                     results, finished, total)
+
+            # Dateien, deren Worker abgestürzt ist, einzeln erneut versuchen,
+            # damit ein defektes Dokument keine anderen Dateien mitreißt
+            for pdf_file in crashed:
+                if self.cancelled:
+                    break
+                if self._run_pool([pdf_file], 1, log_queue, progress_queue, done_stages, costs, results, finished,
+                                  total):
+                    self.logger.error(f"Worker-Prozess bei der Verarbeitung von {pdf_file} abgestürzt.")
+                    self._record(results, pdf_file, False, finished, total)
+        finally:
+            # Ein abgestürzter oder beendeter Worker kann eine halbe Nachricht hinterlassen haben
+            abandon = self.cancelled or bool(crashed)
+            log_forwarder.stop(abandon)
+            if progress_queue is not None:
+                progress_forwarder.stop(abandon)
+        if self.cancelled:
+            self.logger.info(f"Abgebrochen nach {len(results)} von {total} Dateien.")
+        return results
+
+    def _run_pool(self, pdf_files, max_workers, log_queue, progress_queue, done_stages, costs, results, on_result,
+                  total, journal=True):
+        """
+        Verarbeitet die Dateien in einem neuen Pool. Eine Datei wird erst an den Pool
+        übergeben, wenn ein Worker frei ist und ihr geschätzter Speicherbedarf ins
+        Budget passt; passt die nächste Datei nicht, dürfen kleinere vorziehen.
+
+        :param journal: Abgeschlossene Schritte im Batch-Journal festhalten.
+        :return: Liste der Dateien, die wegen eines abgestürzten Workers nicht verarbeitet wurden.
+        """
+        crashed = []
+        budget = self.budget or MemoryBudget(self.memory_budget)
+        waiting = list(pdf_files)
+        max_workers = min(max_workers, len(pdf_files))
+        pid_queue = multiprocessing.Queue()
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                          initargs=(log_queue, progress_queue, self.cancel_event,
+                                                                    pid_queue))
+        futures = {}
+        try:
+            while (waiting or futures) and not self.cancelled:
+                for pdf_file in list(waiting):
+                    if len(futures) >= max_workers:
+                        break
+                    if budget.try_reserve(costs[pdf_file]):
+                        waiting.remove(pdf_file)
+                        futures[executor.submit(_process_file, self.save_dir, pdf_file, self.stage_options,
+                                                done_stages.get(pdf_file, set()), self.job_id, journal)] = pdf_file
+                if not futures:
+                    # Ein geteiltes Budget ist durch andere Engines belegt
+                    budget.wait(SERVE_POLL_INTERVAL)
+                    continue
+
+                done, _ = concurrent.futures.wait(futures, timeout=SERVE_POLL_INTERVAL,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pdf_file = futures.pop(future)
+                    budget.release(costs[pdf_file])
+                    try:
+                        success = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(pdf_file)
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Fehler bei der Verarbeitung von {pdf_file}: {str(e)}")
+                        success = False
+                    self._record(results, pdf_file, success, on_result, total)
+
+                # Nach einem Absturz nimmt der Pool keine Aufträge mehr an; laufende
+                # Dateien gelten als betroffen, noch nicht gestartete kommen in einen neuen Pool
+                if crashed:
+                    crashed.extend(futures.values())
+                    break
+        except BaseException:
+            # z. B. KeyboardInterrupt: die Worker in eigenen Prozessgruppen erhalten kein SIGINT
+            self.cancel()
+            raise
+        finally:
+            if self.cancelled:
+                self._stop_workers(executor, futures, pid_queue)
+            else:
+                executor.shutdown(wait=True)
+            pid_queue.close()
+            # Nach Absturz oder Abbruch nicht mehr laufende Dateien freigeben, das Budget kann geteilt sein
+            for pdf_file in futures.values():
+                budget.release(costs[pdf_file])
+        if self.cancelled:
+            return []
+        if crashed and waiting:
+            crashed.extend(self._run_pool(waiting, max_workers, log_queue, progress_queue, done_stages, costs,
+                                          results, on_result, total, journal))
+        return crashed
+
+    def _stop_workers(self, executor, futures, pid_queue):
+        """
+        Beendet einen Pool nach cancel(). Nicht gestartete Dateien werden verworfen,
+        laufende brechen über das gemeinsame cancel_event ab. Reagiert ein Worker
+        nicht innerhalb von CANCEL_GRACE_SECONDS, z. B. weil pdf2docx ein Dokument
+        in einem Stück konvertiert, wird seine Prozessgruppe beendet.
+        """
+        executor.shutdown(wait=False, cancel_futures=True)
+        _, running = concurrent.futures.wait(futures, timeout=CANCEL_GRACE_SECONDS)
+        if running:
+            self.logger.info(f"{len(running)} Worker reagieren nicht auf den Abbruch und werden beendet.")
+            _kill_process_groups(pid_queue)
+        # Der Pool erkennt beendete Worker selbst und räumt im Hintergrund auf
+        executor.shutdown(wait=not running)
+
+    def serve(self, file_queue, stop_event, on_result=None, tracker=None):
+        """
+        Verarbeitet fortlaufend Dateien aus einer Queue, z. B. für einen überwachten
+        Eingangsordner. Der Pool bleibt zwischen den Dateien bestehen; eine Datei
+        startet, sobald ein Worker frei ist und ihr Speicherbedarf ins Budget passt.
+        Kehrt zurück, sobald stop_event gesetzt ist und alle übernommenen Dateien
+        fertig sind. Im Dauerbetrieb wird kein Batch-Journal geführt, es würde
+        unbegrenzt wachsen und nie gelesen. Jede Übernahme aus der Queue zählt
+        einzeln, dieselbe Datei darf also mehrfach eingereicht werden.
+
+        :param file_queue: queue.Queue mit Pfaden zu PDF-Dateien.
+        :param stop_event: threading.Event, beendet die Verarbeitung.
+        :param on_result: Optionaler Callback (pdf_file, success), der nach jeder Datei aufgerufen wird.
+        :param tracker: Optionaler progress.ProgressTracker, der die Seitenmeldungen der Worker erhält.
+        """
+        log_queue = multiprocessing.Queue()
+        log_forwarder = _QueueForwarder(log_queue, self.logger.handle)
+        progress_queue = multiprocessing.Queue() if tracker is not None else None
+        if progress_queue is not None:
+            progress_forwarder = _QueueForwarder(progress_queue, functools.partial(apply_message, tracker))
+        abandon = False
+        budget = self.budget or MemoryBudget(self.memory_budget)
+        # (Datei, geschätzter Speicherbedarf) je Übernahme aus der Queue
+        waiting = []
+        futures = {}
+        executor = None
+        try:
+            while True:
+                self._take(file_queue, waiting, block=not waiting and not futures)
+                if stop_event.is_set() and not waiting and not futures:
+                    break
+                if waiting and executor is None:
+                    executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers,
+                                                                      initializer=_init_worker,
+                                                                      initargs=(log_queue, progress_queue))
+                # Eine Datei wartet, solange eine gleichnamige läuft, da beide dieselben Ausgaben schreiben
+                running_names = {os.path.normcase(output_name(pdf_file)) for pdf_file, _ in futures.values()}
+                for entry in list(waiting):
+                    if len(futures) >= self.max_workers:
+                        break
+                    pdf_file, cost = entry
+                    name = os.path.normcase(output_name(pdf_file))
+                    if name in running_names:
+                        continue
+                    if budget.try_reserve(cost):
+                        running_names.add(name)
+                        waiting.remove(entry)
+                        futures[executor.submit(_process_file, self.save_dir, pdf_file, self.stage_options,
+                                                set(), self.job_id, False)] = entry
+                if not futures:
+                    if waiting:
+                        budget.wait(SERVE_POLL_INTERVAL)
+                    continue
+
+                done, _ = concurrent.futures.wait(futures, timeout=SERVE_POLL_INTERVAL,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                crashed = []
+                for future in done:
+                    pdf_file, cost = entry = futures.pop(future)
+                    budget.release(cost)
+                    try:
+                        success = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(entry)
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Fehler bei der Verarbeitung von {pdf_file}: {str(e)}")
+                        success = False
+                    self._finish(pdf_file, success, on_result)
+                if not crashed:
+                    continue
+
+                # Der Pool ist unbrauchbar: alle laufenden Dateien einzeln erneut
+                # versuchen, danach mit einem neuen Pool weitermachen
+                abandon = True
+                for future, (pdf_file, cost) in futures.items():
+                    budget.release(cost)
+                    crashed.append((pdf_file, cost))
+                futures = {}
+                executor.shutdown(wait=False)
+                executor = None
+                for pdf_file, cost in crashed:
+                    results = {}
+                    if self._run_pool([pdf_file], 1, log_queue, progress_queue, {}, {pdf_file: cost}, results, None, 1,
+                                      journal=False):
+                        self.logger.error(f"Worker-Prozess bei der Verarbeitung von {pdf_file} abgestürzt.")
+                    self._finish(pdf_file, results.get(pdf_file, False), on_result)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            log_forwarder.stop(abandon)
+            if progress_queue is not None:
+                progress_forwarder.stop(abandon)
+
+    def _take(self, file_queue, waiting, block):
+        """
+        Übernimmt alle bereitliegenden Dateien aus der Queue samt ihrem geschätzten
+        Speicherbedarf. Ist nichts zu tun, wird kurz auf die nächste Datei gewartet.
+        """
+        try:
+            pdf_file = file_queue.get(timeout=SERVE_POLL_INTERVAL) if block else file_queue.get_nowait()
+            while True:
+                waiting.append((pdf_file, estimate_memory(pdf_file, self.stage_options)))
+                pdf_file = file_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    @staticmethod
+    def _finish(pdf_file, success, on_result):
+        if on_result:
+            on_result(pdf_file, success)
+
+    @staticmethod
+    def _record(results, pdf_file, success, on_result, total):
+        results[pdf_file] = success
+        if on_result:
+            on_result(pdf_file, success, len(results), total)
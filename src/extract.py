@@ -0,0 +1,72 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic extract file
+import concurrent.futures
+import os
+from ocr import needs_ocr
+from sharding import plan_shards
+
+# Ab dieser Seitenzahl wird die Textebene in parallelen Seitenbereichen gelesen
+PARALLEL_TEXT_THRESHOLD_PAGES = 200
+# Jeder Worker liest die Querverweistabelle selbst, kleinere Bereiche lohnen sich nicht
+MIN_TEXT_RANGE_PAGES = 25
+MAX_TEXT_RANGE_PAGES = 250
+
+
+def page_text_path(output_dir, page_number):
+    """
+    Pfad der Textdatei einer Seite.
+    """
+    return os.path.join(output_dir, f"page_{page_number}.txt")
+
+
+def _extract_range(pdf_file, start, end, output_dir):
+    """
+    Liest die Textebene eines Seitenbereichs in einem Worker-Prozess und
+    schreibt jede Seite sofort in ihre eigene Datei. Die PDF wird nur lesend
+    in den Speicher eingeblendet, alle Worker teilen sich so den Seitencache
+    des Betriebssystems, statt die Datei einzeln zu kopieren.
+
+    :return: Liste mit True für jede Seite ohne brauchbare Textebene.
+    """
+    import mmap
+    from PyPDF2 import PdfReader
+    missing = []
+    with open(pdf_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        reader = PdfReader(data)
+        for index in range(start, end):
+            text = reader.pages[index].extract_text() or ""
+            with open(page_text_path(output_dir, index + 1), 'w', encoding='utf-8') as page_file:
+                page_file.write(text)
+            missing.append(needs_ocr(text))
+        del reader
+    return missing
+
+
+def extract_pages_parallel(pdf_file, output_dir, page_count, workers=None):
+    """
+    Liest die Textebene einer großen PDF in parallelen Seitenbereichen. Die
+    Seiten werden in Seitenreihenfolge geliefert, sobald ihr Bereich fertig ist;
+    der Text liegt dabei nur in den Seitendateien, nicht im Speicher.
+
+    :param pdf_file: Pfad zur PDF-Datei.
+    :param output_dir: Verzeichnis für die Seitendateien page_<n>.txt.
+    :param page_count: Anzahl der Seiten im Dokument.
+    :param workers: Anzahl der Worker-Prozesse, standardmäßig die Anzahl der CPU-Kerne.
+    :return: Generator von (Seitennummer, Dateipfad, True ohne brauchbare Textebene)-Tupeln.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Mit nur einem Worker würde jede Aufteilung die Querverweistabelle mehrfach lesen
+    ranges = [(0, page_count)]
+    if workers > 1:
+        ranges = plan_shards(page_count, workers, MIN_TEXT_RANGE_PAGES, MAX_TEXT_RANGE_PAGES)
+    os.makedirs(output_dir, exist_ok=True)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [executor.submit(_extract_range, pdf_file, start, end, output_dir) for start, end in ranges]
+        try:
+            for (start, end), future in zip(ranges, futures):
+                for page_number, missing in enumerate(future.result(), start=start + 1):
+                    yield page_number, page_text_path(output_dir, page_number), missing
+        finally:
+            for future in futures:
+                future.cancel()
@@ -3,46 +3,90 @@
 # Projekt: PDF Magic impl file
 from header import PDFConverterInterface
 import logging
-from PyQt5.QtCore import pyqtSignal
-from pdf2docx import Converter
-import docx
-import os
-from pdf2image import convert_from_path
-import pytesseract
-from PIL import Image
-from PyPDF2 import PdfReader
-import concurrent.futures
+from PyQt5.QtCore import QTimer, pyqtSignal
+from engine import ProcessEngine
+from log_pipeline import get_log_pipeline
+from stages import ConversionStages
+
+# Abstand, in dem gesammelte Log-Meldungen an die GUI gegeben werden
+LOG_FEED_INTERVAL_MS = 200
 
 class PDFConverter(PDFConverterInterface):
     """
     Konkrete Implementierung des PDF-Konverters mit einheitlichem Logging.
+    Die eigentliche Konvertierung läuft in den Worker-Prozessen der ProcessEngine.
     """
     update_progress = pyqtSignal(int)
     update_log = pyqtSignal(str)
-
-    def __init__(self, pdf_files, save_dir):
+    # progress.BatchProgress mit Seiten, Seiten/s, Bytes/s und Restzeit
+    update_page_progress = pyqtSignal(object)
+
+    def __init__(self, pdf_files, save_dir, max_workers=None, stage_options=None, resume=False, memory_budget=None,
+                 forward_log=True, budget=None, job_id=None):
+        """
+        :param pdf_files: Liste von Pfaden zu PDF-Dateien. Bilddateien werden im
+                          Thread des Konverters einzeln in PDFs umgewandelt.
+        :param save_dir: Zielverzeichnis für alle Ausgaben.
+        :param max_workers: Anzahl der Worker-Prozesse, standardmäßig die Anzahl der CPU-Kerne.
+        :param stage_options: Zusätzliche Argumente für ConversionStages, z. B. {'sharding': True}.
+        :param resume: Einen abgebrochenen Batch anhand des Journals in save_dir fortsetzen.
+        :param memory_budget: Speicherbudget in Bytes für gleichzeitig laufende Dateien,
+                              standardmäßig drei Viertel des physischen Speichers.
+        :param forward_log: Log-Meldungen über update_log ausgeben. Laufen mehrere Konverter
+                            gleichzeitig, liest besser nur das Fenster die gemeinsame Pipeline.
+        :param budget: Optionales admission.MemoryBudget, das sich gleichzeitige Konverter teilen.
+        :param job_id: Kennung des Auftrags für ein eigenes Journal und eine eigene Metrikdatei in save_dir.
+        """
         super().__init__(pdf_files) 
         self.pdf_files = pdf_files
         self.save_dir = save_dir
+        self.max_workers = max_workers
+        self.stage_options = stage_options or {}
+        self.resume = resume
+        self.memory_budget = memory_budget
+        self.results = {}
         self.logger = logging.getLogger(__name__)
-        self.setup_logging()
-
-    def setup_logging(self):
-        """
-        Richtet das Logging für die Klasse ein.
-        """
-        self.logger.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-        # File handler
-        file_handler = logging.FileHandler('pdf_converter.log')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-
-        # Custom handler for GUI updates
-        gui_handler = GUILogHandler(self.update_log)
-        gui_handler.setFormatter(formatter)
-        self.logger.addHandler(gui_handler)
+        self.setup_logging(forward_log)
+        self.stages = ConversionStages(save_dir, self.logger, **self.stage_options)
+        self.engine = ProcessEngine(self.save_dir, max_workers=self.max_workers, logger=self.logger,
+                                    stage_options=self.stage_options, resume=self.resume,
+                                    memory_budget=self.memory_budget, budget=budget, job_id=job_id)
+
+    def setup_logging(self, forward_log=True):
+        """
+        Richtet das Logging für die Klasse ein. Alle Instanzen teilen sich die
+        Pipeline des Prozesses; die GUI erhält die Meldungen gesammelt im Takt
+        von LOG_FEED_INTERVAL_MS statt einzeln pro Eintrag.
+        """
+        pipeline = get_log_pipeline()
+        pipeline.attach(self.logger)
+        self.log_feed = None
+        if not forward_log:
+            return
+        self.log_feed = pipeline.subscribe()
+
+        # Der Timer gehört zum GUI-Thread, in dem der Konverter angelegt wird
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(LOG_FEED_INTERVAL_MS)
+        self.log_timer.timeout.connect(self.flush_log_feed)
+        self.started.connect(self.log_timer.start)
+        self.finished.connect(self.stop_log_feed)
+
+    def flush_log_feed(self):
+        """
+        Gibt die seit dem letzten Aufruf gesammelten Meldungen als einen Eintrag an die GUI.
+        """
+        if self.log_feed is None:
+            return
+        lines = self.log_feed.drain()
+        if lines:
+            self.update_log.emit('\n'.join(lines))
+
+    def stop_log_feed(self):
+        self.log_timer.stop()
+        self.flush_log_feed()
+        get_log_pipeline().unsubscribe(self.log_feed)
+        self.log_feed = None
 
     def log_info(self, message):
         """
@@ -58,169 +102,52 @@ class PDFConverter(PDFConverterInterface):
 
     def run(self):
         """
-        Hauptmethode zur Konvertierung von PDF-Dateien in DOCX.
-        """
-        total_files = len(self.pdf_files)
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(self.process_file, index, pdf_file) for index, pdf_file in enumerate(self.pdf_files, start=1)]
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    self.log_error(f"Fehler bei der Verarbeitung einer Datei: {str(e)}")
-
-    def process_file(self, index, pdf_file):
-        try:
-            # PDF in DOCX konvertieren
-            docx_file = self.convert_pdf_to_docx(pdf_file)
-            if docx_file:
-                # Formatierung des konvertierten Dokuments anpassen
-                self.format_docx(docx_file)
-
-                # PDF in Bilder konvertieren
-                self.convert_pdf_to_images(pdf_file)
-
-                # Text aus PDF extrahieren
-                self.extract_text_from_pdf(pdf_file)
-
-                self.log_info(f"Erfolgreich verarbeitet: {pdf_file}")
-            else:
-                self.log_error(f"Fehler bei der Konvertierung von {pdf_file}")
-
-            progress = int((index / len(self.pdf_files)) * 100)
-            self.update_progress.emit(progress)
-        except Exception as e:
-            self.log_error(f"Fehler bei der Verarbeitung von {pdf_file}: {str(e)}")
-
-    def convert_pdf_to_docx(self, pdf_file):
-        """
-        Konvertiere eine PDF-Datei in DOCX-Format.
-        
-        :param pdf_file: Pfad zur PDF-Datei.
-        :return: Ausgegebener DOCX-Dateipfad oder None bei Fehlern.
-        """
-        try:
-            output_dir = os.path.join(self.save_dir, 'docx')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            docx_file = os.path.join(output_dir, os.path.basename(pdf_file).rsplit('.', 1)[0] + '.docx')
-
-            cv = Converter(pdf_file)
-            cv.convert(docx_file)
-            cv.close()
-            
-            return docx_file
-        except Exception as e:
-            self.log_error(f"Fehler bei der Konvertierung von PDF zu DOCX: {str(e)}")
-            return None
+        Hauptmethode zur Konvertierung. PDFs durchlaufen die in stage_options
+        gewählten Schritte in den Worker-Prozessen, Bilder werden zu PDFs.
+        Läuft über start() im eigenen Thread, nie im GUI-Thread.
+        """
+        pdf_files = [file for file in self.pdf_files if file.lower().endswith('.pdf')]
+        for file in self.pdf_files:
+            if file not in pdf_files and not self.cancelled:
+                self.results[file] = self.stages.convert_from_file(file)
+        if pdf_files and not self.cancelled:
+            self.results.update(self.engine.run(pdf_files, on_progress=self.report_progress))
 
-    def format_docx(self, docx_file):
+    def cancel(self):
+        """
+        Bricht die Konvertierung ab und beendet laufende Worker-Prozesse.
+        Wird aus dem GUI-Thread aufgerufen und kehrt sofort zurück.
         """
-        Passe die Formatierung des konvertierten DOCX-Dokuments an.
-        """
-        try:
-            doc = docx.Document(docx_file)
-            
-            # Formatierung für alle Absätze anpassen
-            for paragraph in doc.paragraphs:
-                paragraph.style.font.name = 'Arial'
-                paragraph.style.font.size = docx.shared.Pt(11)
-            
-            # Formatierung für Tabellen anpassen
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            paragraph.style.font.name = 'Arial'
-                            paragraph.style.font.size = docx.shared.Pt(11)
-            
-            # Formatiertes Dokument speichern
-            doc.save(docx_file)
-            
-            self.log_info(f"Dokument formatiert und gespeichert: {docx_file}")
-        except Exception as e:
-            self.log_error(f"Fehler bei der Formatierung des Dokuments {docx_file}: {str(e)}")
-
-    def convert_pdf_to_images(self, pdf_file):
-        """
-        Konvertiere eine PDF-Datei in Bilder (PNG).
-        
-        :param pdf_file: Pfad zur PDF-Datei.
-        """
-        try:
-            output_dir = os.path.join(self.save_dir, 'images', os.path.basename(pdf_file).rsplit('.', 1)[0])
-            os.makedirs(output_dir, exist_ok=True)
-            
-            images = convert_from_path(pdf_file)
-            if not images:
-                raise ValueError("Keine Bilder aus der PDF-Datei konvertiert.")
-            
-            for i, image in enumerate(images):
-                image_file = os.path.join(output_dir, f"page_{i + 1}.png")
-                image.save(image_file, 'PNG')
-            
-            self.log_info(f"PDF in Bilder konvertiert: {pdf_file}")
-        except Exception as e:
-            self.log_error(f"Fehler bei der Konvertierung von PDF zu Bildern: {str(e)}")
-
-    def extract_text_from_pdf(self, pdf_file, use_ocr=False):
-        """
-        Extrahiere Text aus einer PDF-Datei. Optional kann OCR verwendet werden.
-        
-        :param pdf_file: Pfad zur PDF-Datei.
-        :param use_ocr: Boolean, ob OCR für die Textextraktion verwendet werden soll.
-        :return: Extrahierter Text als String.
-        """
-        try:
-            extracted_text = ""
-            
-            # Versuche zuerst, den Text direkt mit PyPDF2 zu extrahieren
-            reader = PdfReader(pdf_file)
-            for page in reader.pages:
-                extracted_text += page.extract_text() or ""
-            
-            if not extracted_text and use_ocr:
-                self.log_info("Kein Text gefunden. OCR wird verwendet.")
-                images = convert_from_path(pdf_file)
-                for image in images:
-                    extracted_text += pytesseract.image_to_string(image)
-            
-            if not extracted_text:
-                raise ValueError(f"Kein Text aus der PDF-Datei extrahiert: {pdf_file}")
-            
-            self.log_info(f"Text erfolgreich aus PDF extrahiert: {pdf_file}")
-            return extracted_text
-        except Exception as e:
-            self.log_error(f"Fehler bei der Textextraktion aus der PDF: {str(e)}")
-            return None
+        self.engine.cancel()
 
-    def convert_from_file(self, file):
+    @property
+    def cancelled(self):
+        return self.engine.cancelled
+
+    def report_progress(self, progress):
         """
-        Konvertiere eine beliebige Datei (z. B. PDF oder Bild) in ein anderes Format.
-        
-        :param file: Pfad zur Eingabedatei.
-        """
-        try:
-            if file.lower().endswith('.pdf'):
-                self.convert_pdf_to_docx(file)
-            elif file.lower().endswith((".png", ".jpg", ".jpeg")):
-                output_pdf = os.path.join(self.save_dir, os.path.basename(file).rsplit('.', 1)[0] + '.pdf')
-                image = Image.open(file)
-                image.convert('RGB').save(output_pdf)
-                self.log_info(f"Bild in PDF konvertiert: {file}")
-            else:
-                raise ValueError(f"Dateiformat wird nicht unterstützt: {file}")
-        except Exception as e:
-            self.log_error(f"Fehler bei der Dateikonvertierung: {str(e)}")
-
-class GUILogHandler(logging.Handler):
-    """
-    Benutzerdefinierter Log-Handler zur Aktualisierung der GUI.
-    """
-    def __init__(self, signal):
-        super().__init__()
-        self.signal = signal
+        Gibt den Fortschritt auf Seitenebene an die GUI weiter. Der Prozentwert
+        wird nach Dateigröße gewichtet und steigt daher nur an.
+
+        :param progress: progress.BatchProgress mit Seiten, Durchsatz und Restzeit.
+        """
+        self.update_progress.emit(int(progress.percent))
+        self.update_page_progress.emit(progress)
+
+    def process_file(self, pdf_file, done_stages=(), outputs=None):
+        return self.stages.process_file(pdf_file, done_stages=done_stages, outputs=outputs)
 
-    def emit(self, record):
-        log_entry = self.format(record)
-        self.signal.emit(log_entry)
\ No newline at end of file
+    def convert_pdf_to_docx(self, pdf_file, session=None):
+        return self.stages.convert_pdf_to_docx(pdf_file, session=session)
+
+    def format_docx(self, docx_file):
+        return self.stages.format_docx(docx_file)
+
+    def convert_pdf_to_images(self, pdf_file, session=None):
+        return self.stages.convert_pdf_to_images(pdf_file, session=session)
+
+    def extract_text_from_pdf(self, pdf_file, use_ocr=False, session=None):
+        return self.stages.extract_text_from_pdf(pdf_file, use_ocr=use_ocr, session=session)
+
+    def convert_from_file(self, file):
+        return self.stages.convert_from_file(file)
@@ -0,0 +1,137 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic journal file
+import json
+import os
+import time
+import zipfile
+
+JOURNAL_NAME = '.pdf_magic_journal.jsonl'
+
+
+def job_file_name(name, job_id=None):
+    """
+    Dateiname eines Journals oder einer Metrikdatei, bei Angabe einer
+    Auftragskennung mit dieser vor der Endung, z. B. .pdf_magic_journal.job1.jsonl.
+    """
+    if job_id is None:
+        return name
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{job_id}{extension}"
+
+
+class BatchJournal:
+    """
+    Protokoll der abgeschlossenen Verarbeitungsschritte eines Batches.
+    Jeder Schritt wird als eine JSON-Zeile angehängt und sofort auf die
+    Festplatte geschrieben, sodass ein abgebrochener Batch fortgesetzt werden kann.
+    """
+
+    def __init__(self, save_dir, job_id=None):
+        """
+        :param save_dir: Zielverzeichnis des Batches, das Journal liegt neben den Ausgaben.
+        :param job_id: Optionale Kennung des Auftrags, wenn mehrere Aufträge gleichzeitig
+                       in dasselbe Verzeichnis schreiben; jeder erhält dann ein eigenes Journal.
+        """
+        self.path = os.path.join(save_dir, job_file_name(JOURNAL_NAME, job_id))
+
+    def reset(self):
+        """
+        Beginnt ein neues Journal für einen neuen Batch.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+
+    def seal(self):
+        """
+        Schließt eine nach einem Absturz unvollständige letzte Zeile ab, bevor ein
+        fortgesetzter Batch neue Zeilen anhängt. Sonst verschmölze die erste neue
+        Zeile mit dem Rest und ginge beim Einlesen ebenfalls verloren.
+        """
+        try:
+            with open(self.path, 'rb+') as f:
+                if f.seek(0, os.SEEK_END) == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        except FileNotFoundError:
+            pass
+
+    def record(self, pdf_file, stage, outputs=()):
+        """
+        Hält den Abschluss eines Schritts fest. Die Zeile wird mit einem einzigen
+        write() im Append-Modus geschrieben, damit parallele Worker-Prozesse
+        sich nicht gegenseitig überschreiben.
+
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param stage: Name des Schritts, siehe stages.STAGES.
+        :param outputs: Pfade der vom Schritt geschriebenen Dateien.
+        """
+        entry = {
+            'file': os.path.abspath(pdf_file),
+            'stage': stage,
+            'outputs': [{'path': path, 'size': os.path.getsize(path)} for path in outputs],
+            'time': time.time(),
+        }
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load(self):
+        """
+        Liest das Journal ein. Eine unvollständige letzte Zeile nach einem
+        Absturz wird ignoriert.
+
+        :return: Dict mit Dateipfad -> {Schritt: Liste der Ausgaben}.
+        """
+        state = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                state.setdefault(entry['file'], {})[entry['stage']] = entry['outputs']
+        return state
+
+    def completed_stages(self, pdf_files):
+        """
+        Ermittelt je Datei die Schritte, deren Ausgaben noch vollständig und gültig sind.
+
+        :param pdf_files: Liste von Pfaden zu PDF-Dateien.
+        :return: Dict mit Dateipfad -> Menge der erledigten Schritte.
+        """
+        state = self.load()
+        completed = {}
+        for pdf_file in pdf_files:
+            stages = state.get(os.path.abspath(pdf_file), {})
+            done = {stage for stage, outputs in stages.items() if _outputs_valid(outputs)}
+            # Die Formatierung überschreibt die DOCX-Datei, ihr Eintrag gilt daher auch für die Konvertierung
+            if 'format' in done:
+                done.add('docx')
+            completed[pdf_file] = done
+        return completed
+
+
+def _outputs_valid(outputs):
+    """
+    Prüft, ob alle Ausgaben eines Schritts unverändert vorhanden sind.
+    """
+    for output in outputs:
+        path = output['path']
+        try:
+            if os.path.getsize(path) != output['size']:
+                return False
+        except OSError:
+            return False
+        if path.lower().endswith('.docx') and not zipfile.is_zipfile(path):
+            return False
+    return True
@@ -0,0 +1,172 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic log pipeline file
+import atexit
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_LOG_FILE = 'pdf_converter.log'
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Höchstzahl der Einträge, die der Schreib-Thread auf einmal in die Datei schreibt
+BATCH_SIZE = 500
+# Höchstzahl der Zeilen, die eine Oberfläche zwischen zwei Abrufen puffert
+FEED_MAX_LINES = 2000
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+class BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler, der mehrere Einträge mit einem write() und einem flush() schreibt.
+    """
+
+    def emit_batch(self, lines):
+        text = ''.join(line + self.terminator for line in lines)
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(text) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(text)
+            self.stream.flush()
+        finally:
+            self.release()
+
+
+class LogFeed:
+    """
+    Gepufferte Log-Zeilen für eine Oberfläche. Der Schreib-Thread hängt Zeilen an,
+    die Oberfläche holt sie in festen Abständen gesammelt mit drain() ab.
+    Läuft der Puffer über, werden die ältesten Zeilen verworfen und gezählt.
+    """
+
+    def __init__(self, max_lines=FEED_MAX_LINES):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def extend(self, lines):
+        with self.lock:
+            overflow = len(self.lines) + len(lines) - self.lines.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self.lines.extend(lines)
+
+    def drain(self):
+        """
+        :return: Liste der seit dem letzten Abruf eingegangenen Zeilen.
+        """
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            lines.insert(0, f"... {dropped} Meldungen ausgelassen ...")
+        return lines
+
+
+class LogPipeline:
+    """
+    Gemeinsame Logging-Pipeline eines Prozesses. Logger übergeben ihre Einträge
+    über einen QueueHandler ohne zu blockieren; ein einzelner Schreib-Thread
+    formatiert sie, schreibt sie gesammelt in eine rotierende Datei und verteilt
+    sie an die angemeldeten LogFeeds.
+    """
+
+    def __init__(self, log_file=DEFAULT_LOG_FILE, max_bytes=MAX_LOG_BYTES, backup_count=LOG_BACKUP_COUNT):
+        """
+        :param log_file: Pfad zur Log-Datei.
+        :param max_bytes: Größe, ab der die Log-Datei rotiert wird.
+        :param backup_count: Anzahl der aufbewahrten rotierten Dateien.
+        """
+        self.log_file = log_file
+        self.queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.formatter = logging.Formatter(LOG_FORMAT)
+        directory = os.path.dirname(os.path.abspath(log_file))
+        os.makedirs(directory, exist_ok=True)
+        self.file_handler = BatchRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                     encoding='utf-8', delay=True)
+        self.feeds = []
+        self.feeds_lock = threading.Lock()
+        self._stop = object()
+        self.thread = threading.Thread(target=self._write_loop, name='pdf_magic-log-writer', daemon=True)
+        self.thread.start()
+
+    def attach(self, logger, level=logging.INFO):
+        """
+        Leitet einen Logger in die Pipeline um. Mehrfache Aufrufe fügen keinen
+        weiteren Handler hinzu.
+        """
+        logger.setLevel(level)
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+        # Die Pipeline übernimmt die Ausgabe, damit kein Handler im aufrufenden Thread blockiert
+        logger.propagate = False
+        return logger
+
+    def subscribe(self, max_lines=FEED_MAX_LINES):
+        feed = LogFeed(max_lines)
+        with self.feeds_lock:
+            self.feeds.append(feed)
+        return feed
+
+    def unsubscribe(self, feed):
+        with self.feeds_lock:
+            if feed in self.feeds:
+                self.feeds.remove(feed)
+
+    def _write_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._stop]
+            if records:
+                lines = [self.formatter.format(record) for record in records]
+                try:
+                    self.file_handler.emit_batch(lines)
+                except Exception:
+                    self.file_handler.handleError(records[-1])
+                with self.feeds_lock:
+                    feeds = list(self.feeds)
+                for feed in feeds:
+                    feed.extend(lines)
+            if len(records) < len(batch):
+                return
+
+    def close(self):
+        """
+        Schreibt alle ausstehenden Einträge und beendet den Schreib-Thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(self._stop)
+            self.thread.join()
+        self.file_handler.close()
+
+
+def get_log_pipeline(log_file=None):
+    """
+    Liefert die Pipeline des Prozesses und legt sie beim ersten Aufruf an.
+
+    :param log_file: Pfad zur Log-Datei, wird nur beim ersten Aufruf berücksichtigt.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline(log_file or DEFAULT_LOG_FILE)
+            atexit.register(_pipeline.close)
+        return _pipeline
@@ -2,42 +2,72 @@
 # Datum: 15.10.2024
 # Projekt: PDF Magic main file
 
+import itertools
 import logging
-from impl import PDFConverter
+from admission import MemoryBudget, default_memory_budget
+from impl import LOG_FEED_INTERVAL_MS, PDFConverter
+from log_pipeline import get_log_pipeline
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QProgressBar, QTextEdit, 
-                             QFileDialog, QLabel, QMessageBox)
+                             QFileDialog, QLabel, QMessageBox, QScrollArea)
 from PyQt5.QtGui import QColor, QDragEnterEvent, QDropEvent
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import sys
 import os
+import re
+import hashlib
 import subprocess
-import pkg_resources
+from importlib import metadata
 
 # Logging einrichten
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+REQUIREMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'requirements.txt')
+# Merkt sich die zuletzt erfolgreich geprüften Anforderungen, damit der Start ohne Prüfung auskommt
+REQUIREMENTS_STAMP = os.path.join(os.path.expanduser('~'), '.cache', 'pdf_magic', 'requirements.stamp')
+
+def _is_installed(requirement):
+    name = re.split(r'[<>=!~;\[\s]', requirement, maxsplit=1)[0]
+    try:
+        metadata.version(name)
+        return True
+    except metadata.PackageNotFoundError:
+        return False
+
 # Requirements installieren
-def install_requirements(requirements_file=r"src\requirements.txt"):
+def install_requirements(requirements_file=REQUIREMENTS_FILE, stamp_file=REQUIREMENTS_STAMP):
+    """
+    Installiert fehlende Pakete aus der requirements.txt. Das Ergebnis wird pro
+    Interpreter und Inhalt der requirements.txt zwischengespeichert, sodass die
+    Prüfung nur nach Änderungen erneut läuft.
+    """
     try:
         with open(requirements_file) as f:
-            requirements = f.read().splitlines()
+            content = f.read()
+
+        stamp = hashlib.sha256(f"{sys.executable}\n{sys.version}\n{content}".encode()).hexdigest()
+        if os.path.exists(stamp_file):
+            with open(stamp_file) as f:
+                if f.read() == stamp:
+                    return
 
-        installed_packages = {pkg.key for pkg in pkg_resources.working_set}
-        missing_packages = [pkg for pkg in requirements if pkg.split('==')[0] not in installed_packages]
+        requirements = [line.strip() for line in content.splitlines() if line.strip() and not line.startswith('#')]
+        missing_packages = [pkg for pkg in requirements if not _is_installed(pkg)]
 
         if missing_packages:
             print(f"Installiere fehlende Pakete: {', '.join(missing_packages)}")
             subprocess.check_call([sys.executable, '-m', 'pip', 'install', *missing_packages])
         else:
             print("Alle Anforderungen sind bereits erfüllt")
+
+        os.makedirs(os.path.dirname(stamp_file), exist_ok=True)
+        with open(stamp_file, 'w') as f:
+            f.write(stamp)
     except Exception as e:
         print(f"Fehler beim Installieren der Anforderungen: {str(e)}")
         sys.exit(1)
 
-install_requirements()
-
 class ModernButton(QPushButton):
     def __init__(self, text, color):
         super().__init__(text)
@@ -157,6 +187,71 @@ class EnhancedDropArea(QWidget):
         self.files.clear()
         self.update_label()
 
+class JobRow(QWidget):
+    """
+    Fortschrittszeile eines Auftrags mit eigener Fortschrittsanzeige und
+    Schaltfläche zum Abbrechen bzw. Entfernen.
+    """
+    # Wird im GUI-Thread gesendet, sobald der Konverter-Thread beendet ist
+    job_done = pyqtSignal(object)
+
+    def __init__(self, title, converter, parent=None):
+        """
+        :param title: Bezeichnung des Auftrags, z. B. "PDF zu Bild (3 Dateien)".
+        :param converter: PDFConverter des Auftrags, noch nicht gestartet.
+        """
+        super().__init__(parent)
+        self.converter = converter
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 2, 0, 2)
+        self.title_label = QLabel(title)
+        self.title_label.setMinimumWidth(180)
+        layout.addWidget(self.title_label)
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar, 1)
+        self.status_label = QLabel("Wartet ...")
+        self.status_label.setMinimumWidth(160)
+        layout.addWidget(self.status_label)
+        self.action_button = QPushButton("Abbrechen")
+        self.action_button.clicked.connect(self.cancel)
+        layout.addWidget(self.action_button)
+
+        # Gebundene Methoden des Widgets, damit Qt die Signale in den GUI-Thread überträgt
+        converter.started.connect(self.mark_running)
+        converter.update_progress.connect(self.progress_bar.setValue)
+        converter.update_page_progress.connect(self.update_page_progress)
+        converter.finished.connect(self.finish)
+
+    def mark_running(self):
+        self.status_label.setText("Läuft")
+
+    def update_page_progress(self, progress):
+        eta = progress.eta_seconds
+        eta_text = f"{int(eta // 60)}:{int(eta % 60):02d} min" if eta is not None else "--"
+        self.progress_bar.setFormat(f"%p % - {progress.pages_per_second:.1f} Seiten/s - Rest {eta_text}")
+
+    def cancel(self):
+        self.converter.cancel()
+        self.action_button.setEnabled(False)
+        self.status_label.setText("Wird abgebrochen ...")
+
+    def finish(self):
+        results = self.converter.results
+        total = len(self.converter.pdf_files)
+        succeeded = sum(1 for success in results.values() if success)
+        if self.converter.cancelled:
+            self.status_label.setText(f"Abgebrochen ({succeeded}/{total})")
+        else:
+            self.progress_bar.setValue(100)
+            self.progress_bar.setFormat("%p %")
+            self.status_label.setText(f"Fertig: {succeeded}/{total} erfolgreich")
+        self.action_button.clicked.disconnect(self.cancel)
+        self.action_button.clicked.connect(self.deleteLater)
+        self.action_button.setText("Entfernen")
+        self.action_button.setEnabled(True)
+        self.job_done.emit(self.converter)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -179,7 +274,12 @@ class MainWindow(QMainWindow):
                 'button5': '#9b59b6'
             }
 
-            self.converter = None
+            # Laufende Aufträge; die Referenz hält den QThread bis zum Ende am Leben
+            self.jobs = []
+            # Alle Aufträge teilen sich Speicherbudget und CPU-Kerne, statt dass jeder
+            # Auftrag beides für sich allein annimmt
+            self.job_budget = MemoryBudget(default_memory_budget(), max_jobs=os.cpu_count() or 1)
+            self.job_numbers = itertools.count(1)
 
             self.setStyleSheet(f"QMainWindow {{background-color: {self.colors['background']};}}")
 
@@ -224,13 +324,26 @@ class MainWindow(QMainWindow):
 
             layout.addLayout(button_layout)
 
-            self.progress_bar = QProgressBar()
-            layout.addWidget(self.progress_bar)
+            job_container = QWidget()
+            self.job_layout = QVBoxLayout(job_container)
+            self.job_layout.addStretch()
+            job_area = QScrollArea()
+            job_area.setWidgetResizable(True)
+            job_area.setWidget(job_container)
+            job_area.setMinimumHeight(120)
+            layout.addWidget(job_area)
 
             self.log_text = QTextEdit()
             self.log_text.setReadOnly(True)
             layout.addWidget(self.log_text)
 
+            # Ein gemeinsamer Log-Feed für alle Aufträge, sonst erschiene jede Meldung pro Auftrag
+            self.log_feed = get_log_pipeline().subscribe()
+            self.log_timer = QTimer(self)
+            self.log_timer.setInterval(LOG_FEED_INTERVAL_MS)
+            self.log_timer.timeout.connect(self.flush_log_feed)
+            self.log_timer.start()
+
         except Exception as e:
             logger.error(f"Fehler beim Initialisieren des Hauptfensters: {str(e)}")
 
@@ -239,12 +352,8 @@ class MainWindow(QMainWindow):
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
         log_path = os.path.join(log_dir, log_file)
-        logging.basicConfig(level=logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s',
-                            handlers=[
-                                logging.FileHandler(log_path, mode='a'),
-                                logging.StreamHandler()
-                            ])
+        # Gemeinsame Pipeline mit rotierender Datei, die alle Konverter verwenden
+        get_log_pipeline(log_path)
         logging.info("Logging in Datei initialisiert: %s", log_path)
 
     def set_save_directory(self):
@@ -254,47 +363,81 @@ class MainWindow(QMainWindow):
             self.log_text.append(f"<span style='color: {self.colors['secondary']};'>Speicherort festgelegt: {self.save_dir}</span>")
             logger.info(f"Speicherort festgelegt: {self.save_dir}")
 
-    def start_conversion(self):
-        pdf_files = self.drop_area.get_files()
+    def start_job(self, title, files, stages=None):
+        """
+        Startet einen Auftrag im Hintergrund und zeigt ihn als eigene Zeile an.
+        Mehrere Aufträge laufen gleichzeitig, jeder mit eigenem Worker-Pool; wie
+        viele Dateien insgesamt laufen, regelt das gemeinsame Budget. Journal und
+        Metriken jedes Auftrags liegen in eigenen Dateien.
+
+        :param title: Bezeichnung des Auftrags.
+        :param files: Liste der Eingabedateien.
+        :param stages: Auszuführende Schritte, siehe stages.STAGES; standardmäßig alle.
+        """
+        stage_options = {'stages': stages} if stages else None
+        converter = PDFConverter(list(files), self.save_dir, stage_options=stage_options, forward_log=False,
+                                 budget=self.job_budget, job_id=f"job{next(self.job_numbers)}")
+        row = JobRow(f"{title} ({len(files)} Datei(en))", converter)
+        row.job_done.connect(self.job_finished)
+        self.job_layout.insertWidget(self.job_layout.count() - 1, row)
+        self.jobs.append(converter)
+        converter.start()
+
+    def job_finished(self, converter):
+        if converter in self.jobs:
+            self.jobs.remove(converter)
+        color = self.colors['accent'] if converter.cancelled else self.colors['secondary']
+        text = "Auftrag abgebrochen." if converter.cancelled else "Auftrag abgeschlossen."
+        self.log_text.append(f"<span style='color: {color};'>{text}</span>")
+
+    def take_selected_files(self):
+        pdf_files = list(self.drop_area.get_files())
         if not pdf_files:
             self.log_text.append(f"<span style='color: #FF6B6B;'>Keine PDF-Dateien ausgewählt.</span>")
-            return
-        self.converter = PDFConverter(pdf_files, self.save_dir)
-        self.converter.update_progress.connect(self.update_progress_bar)
-        self.converter.update_log.connect(self.update_log_text)
-        self.convert_button.setEnabled(False)
-        self.converter.run()
+            return None
         self.drop_area.clear_files()
+        return pdf_files
 
-    def update_progress_bar(self, progress):
-        self.progress_bar.setValue(progress)
+    def start_conversion(self):
+        pdf_files = self.take_selected_files()
+        if pdf_files:
+            self.start_job("Konvertieren", pdf_files)
+
+    def flush_log_feed(self):
+        lines = self.log_feed.drain()
+        if lines:
+            self.update_log_text('\n'.join(lines))
 
     def update_log_text(self, log_entry):
         self.log_text.append(log_entry)
 
     def start_pdf_to_image_conversion(self):
-        pdf_files = self.drop_area.get_files()
-        if not pdf_files:
-            self.log_text.append(f"<span style='color: #FF6B6B;'>Keine PDF-Dateien ausgewählt.</span>")
-            return
-        self.converter = PDFConverter(pdf_files, self.save_dir)
-        self.converter.convert_pdf_to_images(pdf_files)
-        self.drop_area.clear_files()
+        pdf_files = self.take_selected_files()
+        if pdf_files:
+            self.start_job("PDF zu Bild", pdf_files, stages=['images'])
 
     def start_text_extraction(self):
-        pdf_files = self.drop_area.get_files()
-        if not pdf_files:
-            self.log_text.append(f"<span style='color: #FF6B6B;'>Keine PDF-Dateien ausgewählt.</span>")
-            return
-        self.converter = PDFConverter(pdf_files, self.save_dir)
-        self.converter.extract_text_from_pdf(pdf_files)
-        self.drop_area.clear_files()
+        pdf_files = self.take_selected_files()
+        if pdf_files:
+            self.start_job("Text extrahieren", pdf_files, stages=['text'])
 
     def start_file_conversion(self):
         file, _ = QFileDialog.getOpenFileName(self, "Datei auswählen", "", "Alle Dateien (*)")
         if file:
-            self.converter = PDFConverter([file], self.save_dir)
-            self.converter.convert_from_file(file)
+            # PDFs werden zu DOCX, Bilder zu PDF
+            self.start_job("Datei konvertieren", [file], stages=['docx'])
+
+    def closeEvent(self, event):
+        """
+        Bricht laufende Aufträge beim Schließen ab und wartet auf deren Threads.
+        """
+        for converter in list(self.jobs):
+            converter.cancel()
+        for converter in list(self.jobs):
+            converter.wait()
+        self.log_timer.stop()
+        get_log_pipeline().unsubscribe(self.log_feed)
+        super().closeEvent(event)
 
     def conversion_finished(self):
         """
@@ -319,6 +462,7 @@ class MainWindow(QMainWindow):
             logger.error(f"Fehler beim Abschluss der Konvertierung: {str(e)}")
 
 if __name__ == "__main__":
+    install_requirements()
     MainWindow.setup_logging(log_dir='logs', log_file='pdf_converter.log')
     try:
         app = QApplication(sys.argv)
@@ -0,0 +1,231 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic metrics file
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from journal import job_file_name
+
+METRICS_NAME = 'pdf_magic_metrics.jsonl'
+PROMETHEUS_NAME = 'pdf_magic.prom'
+PROFILE_DIR = 'profile'
+# Abtastintervall für den Speicherbedarf während eines Schritts in Sekunden
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+def _rss_bytes():
+    """
+    Aktueller Speicherbedarf (RSS) des Prozesses, None wenn er nicht ermittelt werden kann.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Ohne /proc steht nur der Höchstwert seit Prozessstart zur Verfügung
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _RssSampler:
+    """
+    Tastet den Speicherbedarf in einem Hintergrund-Thread ab und merkt sich den Höchstwert.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = _rss_bytes()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            self._update()
+
+    def _update(self):
+        rss = _rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopped.set()
+        self.thread.join()
+        self._update()
+
+
+class StageMetrics:
+    """
+    Misst Wanduhrzeit, CPU-Zeit und Speicherbedarf der Verarbeitungsschritte
+    und hängt je Schritt eine JSON-Zeile an die Metrikdatei im Zielverzeichnis an.
+    Wie beim Batch-Journal schreiben alle Worker-Prozesse in dieselbe Datei.
+    """
+
+    def __init__(self, save_dir, job_id=None):
+        """
+        :param save_dir: Zielverzeichnis des Batches, die Metrikdatei liegt neben den Ausgaben.
+        :param job_id: Optionale Kennung des Auftrags, siehe journal.BatchJournal.
+        """
+        self.path = os.path.join(save_dir, job_file_name(METRICS_NAME, job_id))
+
+    def reset(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+
+    @contextlib.contextmanager
+    def measure(self, pdf_file, stage, pages=None):
+        """
+        Misst den umschlossenen Block als einen Schritt. Liefert ein Dict, in dem
+        der Aufrufer 'success' auf False setzen kann, wenn der Schritt ohne
+        Ausnahme fehlgeschlagen ist.
+
+        :param pdf_file: Pfad der verarbeiteten Datei.
+        :param stage: Name des Schritts, z. B. 'docx' oder 'ocr'.
+        :param pages: Anzahl der im Schritt verarbeiteten Seiten, falls bekannt.
+        """
+        outcome = {'success': False}
+        started = time.perf_counter()
+        times = os.times()
+        thread_started = time.thread_time()
+        with _RssSampler() as sampler:
+            try:
+                outcome['success'] = True
+                yield outcome
+            except BaseException:
+                outcome['success'] = False
+                raise
+            finally:
+                ended = os.times()
+                self.record({
+                    'file': os.path.abspath(pdf_file),
+                    'stage': stage,
+                    'pages': pages,
+                    'success': outcome['success'],
+                    'wall_seconds': round(time.perf_counter() - started, 6),
+                    'cpu_seconds': round(ended.user + ended.system - times.user - times.system, 6),
+                    # Laufen Schritte gleichzeitig, enthält cpu_seconds auch die der anderen Schritte
+                    'thread_cpu_seconds': round(time.thread_time() - thread_started, 6),
+                    # Externe Programme wie pdftoppm und tesseract laufen als Kindprozesse
+                    'child_cpu_seconds': round(ended.children_user + ended.children_system
+                                               - times.children_user - times.children_system, 6),
+                    'peak_rss_bytes': sampler.peak,
+                    'pid': os.getpid(),
+                    'time': time.time(),
+                })
+
+    def record(self, entry):
+        if entry.get('pages'):
+            entry['wall_seconds_per_page'] = round(entry['wall_seconds'] / entry['pages'], 6)
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        try:
+            fd = os.open(self.path, flags, 0o644)
+        except FileNotFoundError:
+            # Ohne Engine legt niemand das Zielverzeichnis vorab an
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, flags, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def load(self):
+        """
+        :return: Liste aller aufgezeichneten Einträge.
+        """
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def write_prometheus(self, prom_file=None):
+        """
+        Fasst die Einträge je Schritt zusammen und schreibt sie im Textformat des
+        Prometheus-Node-Exporters. Die Datei wird atomar ersetzt, damit der
+        Exporter nie eine halb geschriebene Datei liest.
+
+        :param prom_file: Zieldatei, standardmäßig pdf_magic.prom neben der Metrikdatei.
+        :return: Pfad der geschriebenen Datei.
+        """
+        prom_file = prom_file or os.path.join(os.path.dirname(self.path), PROMETHEUS_NAME)
+        totals = {}
+        for entry in self.load():
+            total = totals.setdefault(entry['stage'], {'runs': 0, 'failures': 0, 'pages': 0, 'wall': 0.0,
+                                                       'cpu': 0.0, 'child_cpu': 0.0, 'peak_rss': 0})
+            total['runs'] += 1
+            total['failures'] += 0 if entry['success'] else 1
+            total['pages'] += entry.get('pages') or 0
+            total['wall'] += entry['wall_seconds']
+            total['cpu'] += entry['cpu_seconds']
+            total['child_cpu'] += entry['child_cpu_seconds']
+            total['peak_rss'] = max(total['peak_rss'], entry.get('peak_rss_bytes') or 0)
+
+        series = (
+            ('pdf_magic_stage_runs_total', 'counter', "Ausführungen des Schritts.", 'runs'),
+            ('pdf_magic_stage_failures_total', 'counter', "Fehlgeschlagene Ausführungen des Schritts.", 'failures'),
+            ('pdf_magic_stage_pages_total', 'counter', "Verarbeitete Seiten.", 'pages'),
+            ('pdf_magic_stage_wall_seconds_total', 'counter', "Wanduhrzeit in Sekunden.", 'wall'),
+            ('pdf_magic_stage_cpu_seconds_total', 'counter', "CPU-Zeit des Python-Prozesses in Sekunden.", 'cpu'),
+            ('pdf_magic_stage_child_cpu_seconds_total', 'counter', "CPU-Zeit externer Programme in Sekunden.",
+             'child_cpu'),
+            ('pdf_magic_stage_peak_rss_bytes', 'gauge', "Höchster Speicherbedarf eines Worker-Prozesses.", 'peak_rss'),
+        )
+        lines = []
+        for name, kind, help_text, key in series:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage in sorted(totals):
+                lines.append(f'{name}{{stage="{stage}"}} {totals[stage][key]}')
+
+        tmp_file = prom_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_file, prom_file)
+        return prom_file
+
+
+@contextlib.contextmanager
+def profile_file(save_dir, pdf_file, top=25):
+    """
+    Profiliert die Verarbeitung einer einzelnen Datei mit cProfile und tracemalloc.
+    Schreibt <name>.prof (auswertbar mit pstats oder snakeviz) und <name>.tracemalloc.txt
+    mit den größten Speicherallokationen nach profile/ im Zielverzeichnis.
+    """
+    import cProfile
+    import tracemalloc
+
+    name = os.path.basename(pdf_file).rsplit('.', 1)[0]
+    profile_dir = os.path.join(save_dir, PROFILE_DIR)
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+        with open(os.path.join(profile_dir, f"{name}.tracemalloc.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Aktuell: {current / 1024 / 1024:.1f} MB, Höchstwert: {peak / 1024 / 1024:.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:top]:
+                f.write(f"{stat}\n")
@@ -0,0 +1,46 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic OCR file
+import os
+from pipeline import Pipeline, Stage
+
+# Seiten mit weniger Zeichen in der Textebene gelten als gescannt
+MIN_PAGE_TEXT_CHARS = 20
+
+
+def needs_ocr(page_text):
+    """
+    Prüft, ob die Textebene einer Seite brauchbaren Text enthält.
+    """
+    return len((page_text or "").strip()) < MIN_PAGE_TEXT_CHARS
+
+
+def ocr_pages(page_files, max_workers=None, on_page=None):
+    """
+    Führt OCR für mehrere Seiten gleichzeitig aus. Tesseract läuft als eigener
+    Prozess, daher genügen Threads zur Begrenzung der Parallelität. Wird ein
+    Iterable übergeben, z. B. ein Generator, der die Seiten erst rendert,
+    beginnt die Erkennung bereits während weitere Seiten gerendert werden;
+    die begrenzte Queue bremst das Rendern, wenn die OCR nicht nachkommt.
+
+    :param page_files: Dict oder Iterable mit (Seitennummer, Pfad zum Seitenbild).
+    :param max_workers: Maximale Anzahl gleichzeitiger OCR-Aufrufe, standardmäßig die Anzahl der CPU-Kerne.
+    :param on_page: Optionaler Callback, der nach jeder erkannten Seite mit deren Nummer aufgerufen wird.
+    :return: Dict mit Seitennummer -> erkannter Text.
+    """
+    if isinstance(page_files, dict):
+        if not page_files:
+            return {}
+        max_workers = min(max_workers or os.cpu_count() or 1, len(page_files))
+        page_files = page_files.items()
+    import pytesseract
+
+    def recognize(item):
+        page_number, page_file = item
+        text = pytesseract.image_to_string(page_file)
+        if on_page is not None:
+            on_page(page_number)
+        return page_number, text
+
+    pipeline = Pipeline([Stage('ocr', recognize, workers=max_workers or os.cpu_count() or 1)])
+    return dict(pipeline.run(page_files))
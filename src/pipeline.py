@@ -0,0 +1,126 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic pipeline file
+import queue
+import threading
+
+# Standardgröße einer Queue zwischen zwei Stufen je Worker der folgenden Stufe
+QUEUE_ITEMS_PER_WORKER = 2
+
+_DONE = object()
+
+
+class Stage:
+    """
+    Stufe einer Pipeline: func wird in workers Threads auf jedes Element
+    angewendet. Gibt func None zurück, wird das Element nicht weitergereicht.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=None):
+        """
+        :param name: Name der Stufe, u. a. für Thread-Namen.
+        :param func: Funktion, die ein Element verarbeitet und das Element für die nächste Stufe liefert.
+        :param workers: Anzahl der Threads dieser Stufe.
+        :param queue_size: Plätze in der Eingangs-Queue, standardmäßig QUEUE_ITEMS_PER_WORKER je Worker.
+        """
+        if workers < 1:
+            raise ValueError(f"Stufe {name} benötigt mindestens einen Worker.")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size or workers * QUEUE_ITEMS_PER_WORKER)
+        self.remaining = workers
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    Kette von Stufen, verbunden durch begrenzte Queues. Jede Stufe hat eigene
+    Worker; ist die Queue einer Stufe voll, wartet die vorherige Stufe
+    (Gegendruck). So laufen CPU- und I/O-lastige Stufen gleichzeitig, und der
+    Speicherbedarf hängt von den Queue-Größen ab, nicht von der Anzahl der Elemente.
+    Schlägt ein Element fehl, verwerfen alle Stufen die übrigen Elemente, und
+    run() löst die erste Ausnahme erneut aus.
+    """
+
+    def __init__(self, stages):
+        """
+        :param stages: Liste von Stage-Objekten in Verarbeitungsreihenfolge.
+        """
+        if not stages:
+            raise ValueError("Eine Pipeline benötigt mindestens eine Stufe.")
+        self.stages = list(stages)
+        self.error = None
+        self.error_lock = threading.Lock()
+
+    def run(self, source):
+        """
+        Speist die Elemente aus source im aufrufenden Thread ein und wartet, bis
+        alle Stufen fertig sind.
+
+        :param source: Iterable der Eingangselemente, z. B. ein Generator, der Seiten rendert.
+        :return: Liste der Ergebnisse der letzten Stufe in Fertigstellungsreihenfolge.
+        """
+        results = []
+        results_lock = threading.Lock()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            following = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(stage, following, results, results_lock),
+                                          name=f"{stage.name}_{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        first = self.stages[0]
+        try:
+            for item in source:
+                if self.error is not None:
+                    break
+                first.queue.put(item)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+            for _ in range(first.workers):
+                first.queue.put(_DONE)
+            for thread in threads:
+                thread.join()
+        if self.error is not None:
+            raise self.error
+        return results
+
+    def _work(self, stage, following, results, results_lock):
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                break
+            # Nach einem Fehler nur noch leeren, damit keine Stufe am Gegendruck hängen bleibt
+            if self.error is not None:
+                continue
+            try:
+                output = stage.func(item)
+            except BaseException as e:
+                self._fail(e)
+                continue
+            if output is None:
+                continue
+            if following is not None:
+                following.queue.put(output)
+            else:
+                with results_lock:
+                    results.append(output)
+        with stage.lock:
+            stage.remaining -= 1
+            last = stage.remaining == 0
+        # Der letzte Worker einer Stufe beendet die Worker der nächsten
+        if last and following is not None:
+            for _ in range(following.workers):
+                following.queue.put(_DONE)
+
+    def _fail(self, error):
+        with self.error_lock:
+            if self.error is None:
+                self.error = error
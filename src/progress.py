@@ -0,0 +1,219 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic progress file
+import os
+import threading
+import time
+
+# Mindestabstand zwischen zwei Fortschrittsmeldungen in Sekunden
+REPORT_INTERVAL = 0.5
+
+
+class BatchProgress:
+    """
+    Momentaufnahme des Fortschritts eines Batches auf Seitenebene.
+    Eine Seite gilt als verarbeitet, wenn alle ausstehenden Schritte für sie
+    abgeschlossen sind; Teilfortschritte werden anteilig gezählt.
+    """
+
+    def __init__(self, files_done, files_total, pages_done, pages_total, bytes_done, bytes_total, elapsed):
+        self.files_done = files_done
+        self.files_total = files_total
+        self.pages_done = pages_done
+        self.pages_total = pages_total
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.elapsed = elapsed
+
+    @property
+    def percent(self):
+        if not self.bytes_total:
+            return 100.0 if self.files_done >= self.files_total else 0.0
+        return min(100.0, 100.0 * self.bytes_done / self.bytes_total)
+
+    @property
+    def pages_per_second(self):
+        return self.pages_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self):
+        """
+        Geschätzte Restzeit anhand des bisherigen Durchsatzes, None solange noch nichts verarbeitet ist.
+        """
+        if self.files_done >= self.files_total:
+            return 0.0
+        if self.bytes_per_second <= 0:
+            return None
+        return max(0.0, (self.bytes_total - self.bytes_done) / self.bytes_per_second)
+
+    def to_dict(self):
+        eta = self.eta_seconds
+        return {
+            'files_done': self.files_done,
+            'files_total': self.files_total,
+            'pages_done': round(self.pages_done, 1),
+            'pages_total': self.pages_total,
+            'bytes_done': int(self.bytes_done),
+            'bytes_total': self.bytes_total,
+            'percent': round(self.percent, 1),
+            'elapsed_seconds': round(self.elapsed, 3),
+            'pages_per_second': round(self.pages_per_second, 2),
+            'bytes_per_second': round(self.bytes_per_second),
+            'eta_seconds': None if eta is None else round(eta, 1),
+        }
+
+    def __str__(self):
+        eta = self.eta_seconds
+        eta_text = '--:--' if eta is None else time.strftime('%H:%M:%S', time.gmtime(eta))
+        pages_total = '?' if self.pages_total is None else self.pages_total
+        return (f"{self.percent:5.1f} % | Dateien {self.files_done}/{self.files_total} | "
+                f"Seiten {self.pages_done:.0f}/{pages_total} | {self.pages_per_second:.1f} Seiten/s | "
+                f"{self.bytes_per_second / 1024 / 1024:.1f} MB/s | Rest {eta_text}")
+
+
+class ProgressTracker:
+    """
+    Sammelt Seitenmeldungen aller Dateien eines Batches und gibt in festen
+    Abständen eine BatchProgress-Momentaufnahme an den Callback weiter.
+    Die Dateigröße dient als Gewicht, daher steigt der Gesamtfortschritt auch
+    dann gleichmäßig, wenn die Seitenzahl einer Datei erst beim Öffnen bekannt wird.
+    Alle Methoden sind threadsicher.
+    """
+
+    def __init__(self, pdf_files, on_progress=None, interval=REPORT_INTERVAL):
+        """
+        :param pdf_files: Liste von Pfaden zu PDF-Dateien.
+        :param on_progress: Callback, der eine BatchProgress-Momentaufnahme erhält.
+        :param interval: Mindestabstand zwischen zwei Meldungen in Sekunden.
+        """
+        self.on_progress = on_progress
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.last_report = 0.0
+        self.sizes = {pdf_file: _file_size(pdf_file) for pdf_file in pdf_files}
+        self.page_counts = {}
+        self.units = {}
+        self.units_done = {}
+        self.finished = set()
+
+    def add(self, pdf_file):
+        """
+        Nimmt im fortlaufenden Betrieb eine weitere Datei auf.
+        """
+        with self.lock:
+            self.sizes[pdf_file] = _file_size(pdf_file)
+
+    def discard(self, pdf_file):
+        """
+        Vergisst eine abgeschlossene Datei, damit der Tracker im Dauerbetrieb nicht wächst.
+        """
+        with self.lock:
+            for values in (self.sizes, self.page_counts, self.units, self.units_done):
+                values.pop(pdf_file, None)
+            self.finished.discard(pdf_file)
+
+    def file_progress(self, pdf_file):
+        """
+        Fortschritt einer einzelnen Datei.
+
+        :return: Tupel (verarbeitete Seiten, Seitenzahl oder None, Anteil zwischen 0 und 1).
+        """
+        with self.lock:
+            fraction = self._fraction(pdf_file)
+            page_count = self.page_counts.get(pdf_file)
+            return (page_count or 0) * fraction, page_count, fraction
+
+    def start(self, pdf_file, page_count, stage_count):
+        """
+        Meldet die Seitenzahl einer Datei und die Anzahl der ausstehenden Schritte.
+        """
+        with self.lock:
+            self.page_counts[pdf_file] = page_count
+            self.units[pdf_file] = max(1, page_count * stage_count)
+        self._report()
+
+    def advance(self, pdf_file, stage, pages):
+        """
+        Meldet, dass ein Schritt weitere Seiten einer Datei abgeschlossen hat.
+        """
+        with self.lock:
+            self.units_done[pdf_file] = self.units_done.get(pdf_file, 0) + pages
+        self._report()
+
+    def finish(self, pdf_file):
+        """
+        Markiert eine Datei als abgeschlossen, unabhängig vom Ergebnis.
+        """
+        with self.lock:
+            self.finished.add(pdf_file)
+        self._report(force=True)
+
+    def _fraction(self, pdf_file):
+        if pdf_file in self.finished:
+            return 1.0
+        units = self.units.get(pdf_file)
+        if not units:
+            return 0.0
+        return min(1.0, self.units_done.get(pdf_file, 0) / units)
+
+    def snapshot(self):
+        with self.lock:
+            fractions = {pdf_file: self._fraction(pdf_file) for pdf_file in self.sizes}
+            known_pages = len(self.page_counts) == len(self.sizes)
+            return BatchProgress(
+                files_done=len(self.finished),
+                files_total=len(self.sizes),
+                pages_done=sum(self.page_counts.get(pdf_file, 0) * fraction
+                               for pdf_file, fraction in fractions.items()),
+                pages_total=sum(self.page_counts.values()) if known_pages else None,
+                bytes_done=sum(self.sizes[pdf_file] * fraction for pdf_file, fraction in fractions.items()),
+                bytes_total=sum(self.sizes.values()),
+                elapsed=time.monotonic() - self.started,
+            )
+
+    def _report(self, force=False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+        self.on_progress(self.snapshot())
+
+
+class QueueReporter:
+    """
+    Leitet Seitenmeldungen aus einem Worker-Prozess über eine Queue an den
+    ProgressTracker im Elternprozess weiter. Bietet dieselben Methoden wie der Tracker.
+    """
+
+    def __init__(self, progress_queue):
+        self.queue = progress_queue
+
+    def start(self, pdf_file, page_count, stage_count):
+        self.queue.put(('start', pdf_file, page_count, stage_count))
+
+    def advance(self, pdf_file, stage, pages):
+        self.queue.put(('advance', pdf_file, stage, pages))
+
+
+def apply_message(tracker, message):
+    """
+    Überträgt eine Meldung eines QueueReporter auf den Tracker.
+    Läuft im Elternprozess.
+    """
+    kind, *args = message
+    getattr(tracker, kind)(*args)
+
+
+def _file_size(pdf_file):
+    try:
+        return os.path.getsize(pdf_file)
+    except OSError:
+        return 0
@@ -0,0 +1,52 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic render file
+import os
+import tempfile
+
+DEFAULT_DPI = 200
+# Anzahl der Seiten, die pro Aufruf von pdftoppm gerendert werden
+DEFAULT_WINDOW = 8
+
+
+def get_page_count(pdf_file):
+    """
+    Ermittelt die Seitenzahl über pdfinfo, ohne das Dokument zu rendern.
+    """
+    from pdf2image import pdfinfo_from_path
+    return int(pdfinfo_from_path(pdf_file)['Pages'])
+
+
+def _windows(page_count, window, first_page=1, last_page=None):
+    last_page = min(last_page or page_count, page_count)
+    for first in range(first_page, last_page + 1, window):
+        yield first, min(first + window - 1, last_page)
+
+
+def render_to_files(pdf_file, output_dir, dpi=DEFAULT_DPI, window=DEFAULT_WINDOW, page_count=None,
+                    fmt='png', first_page=1, last_page=None, on_pages=None, grayscale=False):
+    """
+    Lässt pdftoppm die Seiten fensterweise direkt auf die Festplatte schreiben,
+    ohne sie in PIL zu dekodieren. Es liegt immer nur ein Fenster im temporären
+    Verzeichnis, der Speicherbedarf hängt daher nicht von der Seitenzahl ab.
+
+    :param on_pages: Optionaler Callback, der nach jedem Fenster mit der Anzahl der geschriebenen Seiten aufgerufen wird.
+    :param grayscale: Seiten in Graustufen rendern.
+
+    :return: Liste der geschriebenen Dateipfade in Seitenreihenfolge.
+    """
+    from pdf2image import convert_from_path
+    os.makedirs(output_dir, exist_ok=True)
+    page_count = page_count or get_page_count(pdf_file)
+    paths = []
+    for first, last in _windows(page_count, window, first_page, last_page):
+        with tempfile.TemporaryDirectory(dir=output_dir) as window_dir:
+            rendered = convert_from_path(pdf_file, dpi=dpi, first_page=first, last_page=last,
+                                         output_folder=window_dir, fmt=fmt, paths_only=True, grayscale=grayscale)
+            for offset, rendered_file in enumerate(sorted(rendered)):
+                image_file = os.path.join(output_dir, f"page_{first + offset}.{fmt}")
+                os.replace(rendered_file, image_file)
+                paths.append(image_file)
+            if on_pages is not None:
+                on_pages(len(rendered))
+    return paths
@@ -0,0 +1,447 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic service file
+import http.server
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import urllib.parse
+import uuid
+import zipfile
+from progress import ProgressTracker
+from stages import output_locations
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Höchstzahl wartender Aufträge, darüber antwortet der Dienst mit 503
+DEFAULT_MAX_QUEUED = 100
+DEFAULT_MAX_UPLOAD = 512 * 1024 * 1024
+# Blockgröße für Uploads und Downloads
+CHUNK_SIZE = 1024 * 1024
+UPLOAD_DIR = 'uploads'
+OUTPUT_DIR = 'output'
+JOB_PATH = re.compile(r'^/jobs/([0-9a-f]{32})(?:/(files/.+|archive))?$')
+
+
+class ServiceError(Exception):
+    """
+    Fehler, der als HTTP-Antwort mit Statuscode an den Client geht.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Job:
+    """
+    Ein Konvertierungsauftrag für eine PDF-Datei.
+    """
+
+    def __init__(self, job_id, name, input_file):
+        self.id = job_id
+        self.name = name
+        self.input_file = input_file
+        self.state = 'queued'
+        self.created = time.time()
+        self.finished = None
+        self.outputs = []
+        self.progress = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'created': self.created,
+            'finished': self.finished,
+            'progress': self.progress,
+            'outputs': [{'path': path, 'url': f"/jobs/{self.id}/files/{path}"} for path in self.outputs],
+        }
+
+
+class JobManager:
+    """
+    Verwaltet die Aufträge des Dienstes. Die Konvertierung läuft in einem
+    eigenen Thread über ProcessEngine.serve, Request-Threads legen Aufträge
+    nur ab und lesen ihren Zustand. Bricht dieser Thread ab, schlagen die
+    offenen Aufträge fehl und der Dienst nimmt keine neuen mehr an.
+    """
+
+    def __init__(self, root_dir, engine_factory, max_queued=DEFAULT_MAX_QUEUED, allowed_paths=(), logger=None,
+                 on_failure=None):
+        """
+        :param root_dir: Arbeitsverzeichnis mit uploads/ und output/.
+        :param engine_factory: Funktion, die zu einem Ausgabeverzeichnis eine ProcessEngine erzeugt.
+        :param max_queued: Höchstzahl wartender Aufträge.
+        :param allowed_paths: Verzeichnisse, aus denen Dateien per Pfad eingereicht werden dürfen.
+        :param logger: Logger für Statusmeldungen.
+        :param on_failure: Optionaler Callback ohne Argumente, wenn die Verarbeitung abbricht, z. B. um den Server zu beenden.
+        """
+        self.upload_dir = os.path.join(root_dir, UPLOAD_DIR)
+        self.output_dir = os.path.join(root_dir, OUTPUT_DIR)
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.engine = engine_factory(self.output_dir)
+        self.max_queued = max_queued
+        self.allowed_paths = [os.path.realpath(path) for path in allowed_paths]
+        self.logger = logger or logging.getLogger(__name__)
+        self.jobs = {}
+        self.by_input = {}
+        self.lock = threading.Lock()
+        self.file_queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.tracker = ProgressTracker([])
+        self.on_failure = on_failure
+        self.error = None
+        self.worker = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self.worker.start()
+
+    def stop(self):
+        """
+        Nimmt keine neuen Aufträge mehr an und wartet auf die laufenden.
+        """
+        self.stop_event.set()
+        self.worker.join()
+
+    def _serve(self):
+        try:
+            self.engine.serve(self.file_queue, self.stop_event, self.finished, self.tracker)
+        except BaseException as e:
+            self.error = e
+            self.logger.error(f"Verarbeitung abgebrochen, Dienst nimmt keine Aufträge mehr an: {str(e)}")
+            with self.lock:
+                self.stop_event.set()
+                pending = list(self.by_input)
+            for pdf_file in pending:
+                self.finished(pdf_file, False)
+            if self.on_failure is not None:
+                self.on_failure()
+
+    def _reserve(self, name):
+        with self.lock:
+            if self.stop_event.is_set():
+                raise ServiceError(503, "Dienst wird beendet.")
+            queued = sum(1 for job in self.jobs.values() if job.state in ('receiving', 'queued'))
+            if queued >= self.max_queued:
+                raise ServiceError(503, "Warteschlange ist voll, bitte später erneut versuchen.")
+            job_id = uuid.uuid4().hex
+            job = Job(job_id, name, os.path.join(self.upload_dir, f"{job_id}.pdf"))
+            # Zählt schon während des Uploads, damit gleichzeitige Uploads das Limit nicht überschreiten
+            job.state = 'receiving'
+            self.jobs[job_id] = job
+            return job
+
+    def _enqueue(self, job):
+        with self.lock:
+            if self.error is not None:
+                # Upload lief noch, als die Verarbeitung abbrach
+                job.state = 'failed'
+                job.finished = time.time()
+                return job
+            job.state = 'queued'
+            self.by_input[job.input_file] = job
+        self.tracker.add(job.input_file)
+        self.file_queue.put(job.input_file)
+        self.logger.info(f"Auftrag {job.id} angenommen: {job.name}")
+        return job
+
+    def _discard(self, job):
+        with self.lock:
+            self.jobs.pop(job.id, None)
+        if os.path.exists(job.input_file):
+            os.remove(job.input_file)
+
+    def submit_upload(self, name, stream, length):
+        """
+        Speichert einen hochgeladenen Request-Body blockweise als Eingabe eines neuen Auftrags.
+
+        :param name: Ursprünglicher Dateiname.
+        :param stream: Lesbarer Stream mit dem Request-Body.
+        :param length: Länge des Bodys in Bytes.
+        """
+        job = self._reserve(name)
+        try:
+            with open(job.input_file, 'wb') as f:
+                remaining = length
+                while remaining:
+                    chunk = stream.read(min(remaining, CHUNK_SIZE))
+                    if not chunk:
+                        raise ServiceError(400, "Upload unvollständig.")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            with open(job.input_file, 'rb') as f:
+                if f.read(5) != b'%PDF-':
+                    raise ServiceError(415, "Die hochgeladene Datei ist keine PDF.")
+        except BaseException:
+            self._discard(job)
+            raise
+        return self._enqueue(job)
+
+    def submit_path(self, path):
+        """
+        Reicht eine Datei aus einem freigegebenen Verzeichnis ein. Die Datei wird
+        verlinkt oder kopiert, damit die Ausgaben nach der Auftrags-ID benannt sind.
+        """
+        real_path = os.path.realpath(path)
+        if not any(os.path.commonpath([real_path, allowed]) == allowed for allowed in self.allowed_paths):
+            raise ServiceError(403, "Pfad liegt außerhalb der freigegebenen Verzeichnisse.")
+        if not os.path.isfile(real_path) or not real_path.lower().endswith('.pdf'):
+            raise ServiceError(404, f"PDF-Datei nicht gefunden: {path}")
+        job = self._reserve(os.path.basename(real_path))
+        try:
+            try:
+                os.link(real_path, job.input_file)
+            except OSError:
+                shutil.copyfile(real_path, job.input_file)
+        except BaseException:
+            self._discard(job)
+            raise
+        return self._enqueue(job)
+
+    def finished(self, pdf_file, success):
+        """
+        Callback der Engine nach jeder Datei.
+        """
+        with self.lock:
+            job = self.by_input.pop(pdf_file, None)
+        if job is None:
+            return
+        job.progress = self._progress(job, final=True)
+        job.outputs = self._collect_outputs(job)
+        job.finished = time.time()
+        job.state = 'done' if success else 'failed'
+        self.tracker.discard(pdf_file)
+        self.logger.info(f"Auftrag {job.id} {'abgeschlossen' if success else 'fehlgeschlagen'}: {job.name}")
+
+    def _progress(self, job, final=False):
+        pages_done, page_count, fraction = self.tracker.file_progress(job.input_file)
+        if final:
+            pages_done, fraction = page_count or 0, 1.0
+        return {'pages_done': round(pages_done, 1), 'pages_total': page_count, 'percent': round(100 * fraction, 1)}
+
+    def _collect_outputs(self, job):
+        outputs = []
+        for location in output_locations(self.output_dir, job.input_file).values():
+            if os.path.isfile(location):
+                paths = [location]
+            elif os.path.isdir(location):
+                # Seitendateien in Seitenreihenfolge, page_2.txt vor page_10.txt
+                names = sorted((name for name in os.listdir(location) if not name.startswith('.')),
+                               key=lambda name: (len(name), name))
+                paths = [os.path.join(location, name) for name in names]
+            else:
+                continue
+            outputs.extend(os.path.relpath(path, self.output_dir).replace(os.sep, '/') for path in paths)
+        return outputs
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None or job.state == 'receiving':
+            raise ServiceError(404, f"Unbekannter Auftrag: {job_id}")
+        if job.state in ('queued', 'running') and job.input_file in self.tracker.sizes:
+            job.progress = self._progress(job)
+            if job.progress['pages_total'] is not None:
+                job.state = 'running'
+        return job
+
+    def list(self):
+        with self.lock:
+            job_ids = [job.id for job in self.jobs.values() if job.state != 'receiving']
+        return [self.get(job_id).to_dict() for job_id in job_ids]
+
+    def output_file(self, job, relative):
+        """
+        Pfad einer Ausgabedatei des Auftrags. Nur Dateien aus job.outputs sind erreichbar.
+        """
+        if relative not in job.outputs:
+            raise ServiceError(404, f"Ausgabe nicht gefunden: {relative}")
+        return os.path.join(self.output_dir, *relative.split('/'))
+
+    def delete(self, job_id):
+        """
+        Entfernt einen abgeschlossenen Auftrag mit Eingabe und Ausgaben.
+        """
+        job = self.get(job_id)
+        if job.state not in ('done', 'failed'):
+            raise ServiceError(409, "Auftrag läuft noch.")
+        for location in output_locations(self.output_dir, job.input_file).values():
+            if os.path.isdir(location):
+                shutil.rmtree(location, ignore_errors=True)
+            elif os.path.exists(location):
+                os.remove(location)
+        self._discard(job)
+
+
+class ServiceHandler(http.server.BaseHTTPRequestHandler):
+    """
+    HTTP-Schnittstelle:
+
+    - POST /jobs?name=datei.pdf mit der PDF als Body, oder JSON {"path": "..."}
+    - GET /jobs, GET /jobs/<id>
+    - GET /jobs/<id>/files/<pfad> lädt eine Ausgabe herunter
+    - GET /jobs/<id>/archive lädt alle Ausgaben als ZIP herunter
+    - DELETE /jobs/<id> entfernt einen abgeschlossenen Auftrag
+    """
+
+    server_version = 'PDFMagic'
+    manager = None
+    max_upload = DEFAULT_MAX_UPLOAD
+
+    def log_message(self, format, *args):
+        self.manager.logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        self.streaming = False
+        try:
+            method()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            if self.streaming:
+                # Kopfzeilen und ein Teil des Bodys sind gesendet, eine Fehlerantwort
+                # würde im Download landen; der Client erkennt den Abbruch an der Verbindung
+                self.manager.logger.error(f"Download abgebrochen bei {self.command} {self.path}: {str(e)}")
+                self.close_connection = True
+            elif isinstance(e, ServiceError):
+                self._send_json(e.status, {'error': str(e)})
+            else:
+                self.manager.logger.error(f"Fehler bei {self.command} {self.path}: {str(e)}")
+                self._send_json(500, {'error': str(e)})
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def do_DELETE(self):
+        self._handle(self._delete)
+
+    def _get(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok'})
+            return
+        if path == '/jobs':
+            self._send_json(200, {'jobs': self.manager.list()})
+            return
+        match = JOB_PATH.match(path)
+        if match is None:
+            raise ServiceError(404, f"Unbekannter Pfad: {path}")
+        job = self.manager.get(match.group(1))
+        target = match.group(2)
+        if target is None:
+            self._send_json(200, job.to_dict())
+        elif target == 'archive':
+            self._send_archive(job)
+        else:
+            self._send_file(job, urllib.parse.unquote(target[len('files/'):]))
+
+    def _post(self):
+        parts = urllib.parse.urlsplit(self.path)
+        if parts.path != '/jobs':
+            raise ServiceError(404, f"Unbekannter Pfad: {parts.path}")
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            raise ServiceError(411, "Content-Length fehlt.")
+        content_type = self.headers.get_content_type()
+        if content_type == 'application/json':
+            if length > CHUNK_SIZE:
+                raise ServiceError(413, "JSON-Anfrage zu groß.")
+            try:
+                payload = json.loads(self.rfile.read(length))
+                path = payload['path']
+            except (ValueError, KeyError, TypeError):
+                raise ServiceError(400, 'Erwartet wird {"path": "/pfad/zur/datei.pdf"}.')
+            job = self.manager.submit_path(path)
+        else:
+            if length > self.max_upload:
+                raise ServiceError(413, "Datei überschreitet die maximale Upload-Größe.")
+            name = urllib.parse.parse_qs(parts.query).get('name', ['upload.pdf'])[0]
+            job = self.manager.submit_upload(os.path.basename(name), self.rfile, length)
+        self.send_response(202)
+        self.send_header('Location', f"/jobs/{job.id}")
+        body = json.dumps(job.to_dict(), ensure_ascii=False).encode('utf-8')
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delete(self):
+        match = JOB_PATH.match(urllib.parse.urlsplit(self.path).path)
+        if match is None or match.group(2) is not None:
+            raise ServiceError(404, f"Unbekannter Pfad: {self.path}")
+        self.manager.delete(match.group(1))
+        self._send_json(200, {'deleted': match.group(1)})
+
+    def _send_download_headers(self, content_type, filename):
+        # filename* für Umlaute, filename als ASCII-Rückfall für einfache Clients
+        fallback = filename.encode('ascii', 'replace').decode('ascii').replace('?', '_').replace('"', '')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Disposition',
+                         f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{urllib.parse.quote(filename)}")
+
+    def _download_name(self, job, relative):
+        base = os.path.splitext(job.name)[0]
+        name = os.path.basename(relative)
+        return name.replace(job.id, base, 1) if name.startswith(job.id) else name
+
+    def _send_file(self, job, relative):
+        file_path = self.manager.output_file(job, relative)
+        size = os.path.getsize(file_path)
+        self.send_response(200)
+        self._send_download_headers('application/octet-stream', self._download_name(job, relative))
+        self.send_header('Content-Length', str(size))
+        with open(file_path, 'rb') as f:
+            self.end_headers()
+            self.streaming = True
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def _send_archive(self, job):
+        """
+        Streamt alle Ausgaben als ZIP. Die Länge ist vorab unbekannt, daher endet
+        die Antwort mit dem Schließen der Verbindung. Die Dateien werden vor den
+        Kopfzeilen aufgelöst, damit fehlende Ausgaben noch als Fehler gemeldet werden.
+        """
+        if job.state != 'done':
+            raise ServiceError(409, "Auftrag ist noch nicht abgeschlossen.")
+        files = [(self.manager.output_file(job, relative), relative.replace(job.id, os.path.splitext(job.name)[0]))
+                 for relative in job.outputs]
+        self.send_response(200)
+        self._send_download_headers('application/zip', os.path.splitext(job.name)[0] + '.zip')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        self.streaming = True
+        with zipfile.ZipFile(self.wfile, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file_path, arcname in files:
+                with open(file_path, 'rb') as source, archive.open(arcname, 'w') as target:
+                    shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+
+def create_server(manager, host=DEFAULT_HOST, port=DEFAULT_PORT, max_upload=DEFAULT_MAX_UPLOAD):
+    """
+    Erzeugt den HTTP-Server. Jede Anfrage läuft in einem eigenen Thread, die
+    Konvertierung selbst im Worker-Pool der Engine.
+    """
+    handler = type('BoundServiceHandler', (ServiceHandler,), {'manager': manager, 'max_upload': max_upload})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,206 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic session file
+import os
+import shutil
+import tempfile
+import threading
+from encode import ImageOptions, encode_pages
+from render import DEFAULT_WINDOW, render_to_files
+
+
+class DocumentSession:
+    """
+    Sitzung für ein einzelnes PDF-Dokument.
+    Hält das geparste Dokument und die gerenderten Seiten, damit alle
+    Verarbeitungsschritte einer Datei die PDF nur einmal öffnen und rendern.
+    Laufen Schritte gleichzeitig, wird das Rendern serialisiert. Ist mit
+    plan_full_render ein vollständiges Rendern angekündigt, führt der erste
+    Aufrufer es für alle aus, damit jede Seite nur einmal gerastert wird.
+    """
+
+    def __init__(self, pdf_file):
+        """
+        :param pdf_file: Pfad zur PDF-Datei.
+        """
+        self.pdf_file = pdf_file
+        self._reader = None
+        self._converter = None
+        self._page_files = None
+        self._render_dir = None
+        self._selected_files = {}
+        self._planned_render = None
+        self._page_texts = None
+        self._page_count = None
+        self._render_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def reader(self):
+        """
+        PyPDF2-Reader, wird beim ersten Zugriff geöffnet.
+        """
+        if self._reader is None:
+            from PyPDF2 import PdfReader
+            self._reader = PdfReader(self.pdf_file)
+        return self._reader
+
+    @property
+    def converter(self):
+        """
+        pdf2docx-Converter, wird beim ersten Zugriff geöffnet.
+        """
+        if self._converter is None:
+            from pdf2docx import Converter
+            self._converter = Converter(self.pdf_file)
+        return self._converter
+
+    @property
+    def page_count(self):
+        if self._page_count is None:
+            self._page_count = len(self.reader.pages)
+        return self._page_count
+
+    def plan_full_render(self, output_dir, options=None):
+        """
+        Kündigt an, dass ein Schritt dieser Sitzung alle Seiten nach output_dir
+        rendern wird. Sind die Seiten für die OCR verwendbar, rendert
+        render_selected_pages dann ebenfalls alle Seiten dorthin, statt einzelne
+        Seiten ein zweites Mal zu rastern; render_pages übernimmt die Dateien danach.
+
+        :param output_dir: Zielverzeichnis des späteren render_pages-Aufrufs.
+        :param options: encode.ImageOptions oder Dict des späteren render_pages-Aufrufs.
+        """
+        options = ImageOptions.from_dict(options)
+        if options.reusable_for_ocr:
+            self._planned_render = (output_dir, options)
+
+    def render_pages(self, output_dir=None, on_pages=None, options=None):
+        """
+        Gerenderte Seiten als Bilddateien. Farbige PNG-Seiten mit 200 DPI werden
+        nur beim ersten Aufruf gerastert, danach teilen sich alle Schritte
+        dieselben Dateien. Die Seiten werden fensterweise gerendert und parallel
+        kodiert, der Speicherbedarf hängt daher nicht von der Seitenzahl ab.
+
+        :param output_dir: Zielverzeichnis der Seiten. Ohne Angabe wird ein
+                           temporäres Verzeichnis der Sitzung verwendet.
+        :param on_pages: Optionaler Callback mit der Anzahl der jeweils bereitgestellten Seiten.
+        :param options: encode.ImageOptions oder Dict mit Format, DPI und Farbmodus, standardmäßig PNG.
+        :return: Liste der Dateipfade in Seitenreihenfolge.
+        """
+        options = ImageOptions.from_dict(options)
+        with self._render_lock:
+            return self._render_pages(output_dir, on_pages, options)
+
+    def _render_pages(self, output_dir, on_pages, options):
+        if output_dir is None and (self._page_files is None or not options.reusable_for_ocr):
+            if self._render_dir is None:
+                self._render_dir = tempfile.mkdtemp(prefix='pdf_magic_')
+            output_dir = self._render_dir
+        if not options.reusable_for_ocr:
+            return encode_pages(self.pdf_file, output_dir, options, page_count=self.page_count, on_pages=on_pages)
+        if self._page_files is None:
+            self._page_files = encode_pages(self.pdf_file, output_dir, options, page_count=self.page_count,
+                                            on_pages=on_pages)
+            return self._page_files
+        if output_dir is not None and self._page_files and os.path.dirname(self._page_files[0]) != output_dir:
+            # Bereits gerenderte Seiten in das gewünschte Verzeichnis verschieben
+            os.makedirs(output_dir, exist_ok=True)
+            moved = []
+            for page_file in self._page_files:
+                target = os.path.join(output_dir, os.path.basename(page_file))
+                shutil.move(page_file, target)
+                moved.append(target)
+            self._page_files = moved
+        if on_pages is not None:
+            on_pages(len(self._page_files))
+        return self._page_files
+
+    def render_selected_pages(self, page_numbers):
+        """
+        Rendert nur die angegebenen Seiten. Sind bereits alle Seiten gerendert,
+        werden deren Dateien wiederverwendet. Zusammenhängende Seiten werden
+        gemeinsam gerendert.
+
+        :param page_numbers: Seitennummern (1-basiert).
+        :return: Dict mit Seitennummer -> Dateipfad.
+        """
+        with self._render_lock:
+            return self._render_selected_pages(page_numbers)
+
+    def iter_selected_pages(self, page_numbers, window=DEFAULT_WINDOW):
+        """
+        Wie render_selected_pages, liefert die Seiten aber fensterweise, sobald
+        sie gerendert sind, damit die Verarbeitung schon während des Renderns beginnt.
+
+        :param page_numbers: Seitennummern (1-basiert).
+        :param window: Höchstzahl der Seiten pro Renderdurchlauf.
+        :return: Generator von (Seitennummer, Dateipfad)-Tupeln.
+        """
+        page_numbers = sorted(set(page_numbers))
+        for start in range(0, len(page_numbers), window):
+            yield from self.render_selected_pages(page_numbers[start:start + window]).items()
+
+    def _render_selected_pages(self, page_numbers):
+        # Steht das vollständige Rendern ohnehin an, wird es jetzt unter der Sperre
+        # ausgeführt, statt die Seiten hier und dort zu rastern
+        if self._page_files is None and self._planned_render is not None:
+            output_dir, options = self._planned_render
+            self._planned_render = None
+            self._render_pages(output_dir, None, options)
+        if self._page_files is not None:
+            return {number: self._page_files[number - 1] for number in page_numbers}
+
+        missing = sorted(set(page_numbers) - set(self._selected_files))
+        if missing:
+            if self._render_dir is None:
+                self._render_dir = tempfile.mkdtemp(prefix='pdf_magic_')
+            for first, last in _consecutive_runs(missing):
+                page_files = render_to_files(self.pdf_file, self._render_dir, page_count=self.page_count,
+                                             first_page=first, last_page=last)
+                self._selected_files.update(zip(range(first, last + 1), page_files))
+        return {number: self._selected_files[number] for number in page_numbers}
+
+    @property
+    def page_texts(self):
+        """
+        Text der einzelnen Seiten aus der Textebene der PDF.
+        """
+        if self._page_texts is None:
+            self._page_texts = [page.extract_text() or "" for page in self.reader.pages]
+        return self._page_texts
+
+    def close(self):
+        """
+        Gibt das geparste Dokument und die gerenderten Seiten frei.
+        """
+        if self._converter is not None:
+            self._converter.close()
+            self._converter = None
+        if self._render_dir is not None:
+            shutil.rmtree(self._render_dir, ignore_errors=True)
+            self._render_dir = None
+        self._page_files = None
+        self._selected_files = {}
+        self._planned_render = None
+        self._reader = None
+        self._page_texts = None
+        self._page_count = None
+
+
+def _consecutive_runs(numbers):
+    """
+    Fasst sortierte Seitennummern zu (erste, letzte)-Bereichen zusammen.
+    """
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return [tuple(run) for run in runs]
@@ -0,0 +1,163 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic sharding file
+import concurrent.futures
+import copy
+import io
+import math
+import os
+import shutil
+import tempfile
+
+# Dokumente unterhalb dieser Seitenzahl werden in einem Stück konvertiert
+SHARD_THRESHOLD_PAGES = 60
+MIN_SHARD_PAGES = 10
+MAX_SHARD_PAGES = 100
+
+_REL_NAMESPACE = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+def plan_shards(page_count, workers=None, min_pages=MIN_SHARD_PAGES, max_pages=MAX_SHARD_PAGES):
+    """
+    Teilt ein Dokument in Seitenbereiche auf. Die Größe der Bereiche richtet sich
+    nach der Seitenzahl, damit jeder Worker etwa zwei Bereiche erhält.
+
+    :param page_count: Anzahl der Seiten im Dokument.
+    :param workers: Anzahl der Worker, standardmäßig die Anzahl der CPU-Kerne.
+    :param min_pages: Mindestgröße eines Bereichs.
+    :param max_pages: Höchstgröße eines Bereichs.
+    :return: Liste von (start, end)-Tupeln, 0-basiert, end exklusiv wie bei pdf2docx.
+    """
+    workers = workers or os.cpu_count() or 1
+    shard_pages = math.ceil(page_count / (workers * 2))
+    shard_pages = max(min_pages, min(max_pages, shard_pages))
+    return [(start, min(start + shard_pages, page_count)) for start in range(0, page_count, shard_pages)]
+
+
+def _convert_shard(pdf_file, start, end, docx_file):
+    """
+    Konvertiert einen Seitenbereich in einem Worker-Prozess.
+    """
+    from pdf2docx import Converter
+    cv = Converter(pdf_file)
+    try:
+        cv.convert(docx_file, start=start, end=end)
+    finally:
+        cv.close()
+    return docx_file
+
+
+def convert_sharded(pdf_file, docx_file, page_count, workers=None, on_pages=None):
+    """
+    Konvertiert eine große PDF-Datei in parallelen Seitenbereichen und fügt
+    die Teildokumente zu einer DOCX-Datei zusammen.
+
+    :param pdf_file: Pfad zur PDF-Datei.
+    :param docx_file: Pfad der zu erzeugenden DOCX-Datei.
+    :param page_count: Anzahl der Seiten im Dokument.
+    :param workers: Anzahl der Worker-Prozesse, standardmäßig die Anzahl der CPU-Kerne.
+    :param on_pages: Optionaler Callback, der nach jedem fertigen Bereich mit dessen Seitenzahl aufgerufen wird.
+    :return: Anzahl der konvertierten Bereiche.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = plan_shards(page_count, workers)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(docx_file)) as shard_dir:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            futures = [executor.submit(_convert_shard, pdf_file, start, end,
+                                       os.path.join(shard_dir, f"shard_{i:04d}.docx"))
+                       for i, (start, end) in enumerate(shards)]
+            if on_pages is not None:
+                shard_pages = {future: end - start for future, (start, end) in zip(futures, shards)}
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        if future.exception() is None:
+                            on_pages(shard_pages[future])
+                except BaseException:
+                    # z. B. ein Abbruch aus on_pages: übrige Bereiche nicht mehr starten
+                    for future in futures:
+                        future.cancel()
+                    raise
+            # Reihenfolge der Bereiche beibehalten
+            shard_files = [future.result() for future in futures]
+        merge_docx(shard_files, docx_file)
+    return len(shards)
+
+
+def merge_docx(shard_files, docx_file):
+    """
+    Fügt die Teildokumente der Reihe nach zu einem Dokument zusammen.
+    Formatvorlagen und Nummerierung stammen aus dem ersten Teil; da alle Teile
+    aus derselben pdf2docx-Vorlage entstehen, stimmen ihre IDs überein.
+    Jeder Teil behält seine Abschnitte, Bilder und Hyperlinks werden übernommen.
+
+    :param shard_files: Pfade der Teildokumente in Seitenreihenfolge.
+    :param docx_file: Pfad der zu erzeugenden DOCX-Datei.
+    """
+    if len(shard_files) == 1:
+        shutil.copyfile(shard_files[0], docx_file)
+        return
+
+    import docx
+    from docx.oxml.ns import qn
+
+    merged = docx.Document(shard_files[0])
+    body = merged.element.body
+    for shard_file in shard_files[1:]:
+        shard = docx.Document(shard_file)
+        shard_body = shard.element.body
+
+        # Letzten Abschnitt des bisherigen Dokuments abschließen
+        _close_section(body)
+
+        for element in list(shard_body):
+            if element.tag == qn('w:sectPr'):
+                continue
+            _copy_relationships(element, shard.part, merged.part)
+            body.sectPr.addprevious(element)
+
+        # Seiteneinstellungen des letzten Abschnitts übernehmen
+        if shard_body.sectPr is not None:
+            body.replace(body.sectPr, copy.deepcopy(shard_body.sectPr))
+
+    merged.save(docx_file)
+
+
+def _close_section(body):
+    """
+    Verschiebt die Abschnittseigenschaften am Ende des Dokuments in den letzten
+    Absatz, damit der Abschnittswechsel beim Anhängen erhalten bleibt.
+    """
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    sect_pr = body.sectPr
+    if sect_pr is None:
+        return
+    previous = sect_pr.getprevious()
+    if previous is None or previous.tag != qn('w:p') or previous.find(f"{qn('w:pPr')}/{qn('w:sectPr')}") is not None:
+        previous = OxmlElement('w:p')
+        sect_pr.addprevious(previous)
+    previous.get_or_add_pPr().append(copy.deepcopy(sect_pr))
+
+
+def _copy_relationships(element, source_part, target_part):
+    """
+    Überträgt die von einem Element referenzierten Bilder und Hyperlinks in das
+    Zieldokument und passt die Relationship-IDs an.
+    """
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    mapping = {}
+    for node in element.iter():
+        for key, r_id in node.attrib.items():
+            if not key.startswith(_REL_NAMESPACE) or r_id not in source_part.rels:
+                continue
+            if r_id not in mapping:
+                rel = source_part.rels[r_id]
+                if rel.is_external:
+                    mapping[r_id] = target_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+                elif rel.reltype == RT.IMAGE:
+                    mapping[r_id], _ = target_part.get_or_add_image(io.BytesIO(rel.target_part.blob))
+                else:
+                    continue
+            node.set(key, mapping[r_id])
@@ -0,0 +1,691 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic stages file
+import contextlib
+import functools
+import logging
+import os
+from assemble import IMAGE_EXTENSIONS, images_to_pdf
+from cache import ResultCache
+from docx_patch import patch_docx_fonts
+from encode import ImageOptions
+from extract import PARALLEL_TEXT_THRESHOLD_PAGES, extract_pages_parallel, page_text_path
+from journal import BatchJournal
+from metrics import StageMetrics, profile_file
+from ocr import needs_ocr, ocr_pages
+from session import DocumentSession
+from sharding import SHARD_THRESHOLD_PAGES, convert_sharded
+
+# Verarbeitungsschritte und die Schritte, deren Ergebnisse sie voraussetzen.
+# Jeder Schritt wird von der Methode _stage_<name> ausgeführt.
+STAGE_GRAPH = {
+    'docx': (),
+    'format': ('docx',),
+    'images': (),
+    'text': (),
+}
+# Reihenfolge der Schritte in Journal, Cache und Ausgaben
+STAGES = tuple(STAGE_GRAPH)
+
+
+def output_name(pdf_file):
+    """
+    Name, unter dem die Ausgaben einer PDF-Datei abgelegt werden: der Dateiname ohne Endung.
+    """
+    return os.path.basename(pdf_file).rsplit('.', 1)[0]
+
+
+def output_locations(save_dir, pdf_file):
+    """
+    Orte aller Ausgaben einer PDF-Datei. Die Schritte schreiben dorthin, der
+    HTTP-Dienst listet und löscht von dort.
+
+    :return: Dict mit 'docx' und 'text' (Dateien) sowie 'text_pages' und 'images' (Verzeichnisse).
+    """
+    name = output_name(pdf_file)
+    return {
+        'docx': os.path.join(save_dir, 'docx', name + '.docx'),
+        'text': os.path.join(save_dir, 'text', name + '.txt'),
+        'text_pages': os.path.join(save_dir, 'text', name),
+        'images': os.path.join(save_dir, 'images', name),
+    }
+
+
+def find_name_collisions(pdf_files):
+    """
+    Sucht verschiedene Dateien mit demselben Ausgabenamen, z. B. a/report.pdf und
+    b/report.pdf. Ihre Ausgaben und Journaleinträge würden sich gegenseitig überschreiben.
+
+    :param pdf_files: Liste von Pfaden zu PDF-Dateien.
+    :return: Dict mit Ausgabename -> Liste der Dateien in Eingabereihenfolge, nur für mehrfach vergebene Namen.
+    """
+    by_name = {}
+    for pdf_file in pdf_files:
+        files = by_name.setdefault(os.path.normcase(output_name(pdf_file)), {})
+        files.setdefault(os.path.realpath(pdf_file), pdf_file)
+    return {name: list(files.values()) for name, files in by_name.items() if len(files) > 1}
+
+
+class ConversionCancelled(BaseException):
+    """
+    Die Verarbeitung wurde über das cancel_event abgebrochen. Leitet wie
+    KeyboardInterrupt von BaseException ab, damit die Fehlerbehandlung der
+    einzelnen Schritte den Abbruch nicht als gewöhnlichen Fehler auffängt.
+    """
+
+
+def select_stages(stages=None):
+    """
+    Normalisiert eine Auswahl von Ausgaben zu den auszuführenden Schritten.
+    Voraussetzungen laut STAGE_GRAPH werden mitgezogen, z. B. setzt die
+    Formatierung die DOCX-Konvertierung voraus.
+
+    :param stages: Iterable von Schrittnamen, standardmäßig alle Schritte.
+    :return: Tupel der Schritte in Ausführungsreihenfolge.
+    """
+    selected = set(STAGES if stages is None else stages)
+    unknown = selected - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unbekannte Verarbeitungsschritte: {', '.join(sorted(unknown))}")
+    missing = list(selected)
+    while missing:
+        for dependency in STAGE_GRAPH[missing.pop()]:
+            if dependency not in selected:
+                selected.add(dependency)
+                missing.append(dependency)
+    return tuple(stage for stage in STAGES if stage in selected)
+
+
+class FileResult:
+    """
+    Ergebnis von process_file für eine Datei: Rückgabewert und Ausgabedateien
+    je Schritt, z. B. values['text'] mit dem extrahierten Text oder
+    values['images'] mit den Seitenbildern. Wahr genau dann, wenn alle
+    ausgeführten Schritte erfolgreich waren.
+    """
+
+    def __init__(self, pdf_file, stages=()):
+        """
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param stages: Auszuführende Schritte.
+        """
+        self.pdf_file = pdf_file
+        self.stages = tuple(stages)
+        self.values = {}
+        self.outputs = {}
+        self.cached = False
+
+    @property
+    def failed(self):
+        return [stage for stage in self.stages if stage not in self.outputs]
+
+    @property
+    def success(self):
+        return not self.failed
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        return f"FileResult({self.pdf_file!r}, success={self.success}, stages={list(self.stages)})"
+
+
+class ConversionStages:
+    """
+    Qt-freie Konvertierungsschritte für eine einzelne Datei.
+    Wird vom PDFConverter-Thread und von den Worker-Prozessen der Engine genutzt.
+    """
+
+    def __init__(self, save_dir, logger=None, sharding=False, shard_workers=None, use_ocr=False, ocr_workers=None,
+                 cache_dir=None, cache_max_bytes=None, journal=False, stages=None, progress=None,
+                 metrics=False, profile=None, image_options=None, parallel_text=False, text_workers=None,
+                 cancel_event=None, job_id=None):
+        """
+        :param save_dir: Zielverzeichnis für alle Ausgaben.
+        :param logger: Logger für Statusmeldungen, standardmäßig der Modul-Logger.
+        :param sharding: Große PDFs in parallelen Seitenbereichen nach DOCX konvertieren.
+        :param shard_workers: Anzahl der Prozesse für die Seitenbereiche, standardmäßig die Anzahl der CPU-Kerne.
+        :param use_ocr: Seiten ohne Textebene in process_file per OCR erkennen.
+        :param ocr_workers: Maximale Anzahl gleichzeitiger OCR-Aufrufe pro Datei.
+        :param cache_dir: Verzeichnis des Ergebnis-Caches. Ohne Angabe wird nicht gecacht.
+        :param cache_max_bytes: Maximale Größe des Ergebnis-Caches in Bytes.
+        :param journal: Abgeschlossene Schritte im Batch-Journal neben den Ausgaben festhalten.
+        :param stages: Auszuführende Schritte in process_file, standardmäßig alle (siehe STAGES).
+        :param progress: Optionaler Empfänger der Seitenmeldungen mit start() und advance(),
+                         z. B. progress.ProgressTracker oder progress.QueueReporter.
+        :param metrics: Zeit, CPU-Zeit und Speicherbedarf je Schritt in der Metrikdatei neben den Ausgaben festhalten.
+        :param profile: Dateiname einer PDF, deren Verarbeitung mit cProfile und tracemalloc profiliert wird.
+        :param image_options: Dict mit Argumenten für encode.ImageOptions (Format, DPI, Farbmodus, Kompression).
+        :param parallel_text: Die Textebene großer PDFs in parallelen Seitenbereichen lesen und
+                              je Seite eine Textdatei schreiben, siehe extract_text_to_pages.
+        :param text_workers: Anzahl der Prozesse dafür, standardmäßig die Anzahl der CPU-Kerne.
+        :param cancel_event: Optionales threading- oder multiprocessing-Event; ist es gesetzt,
+                             bricht process_file zwischen zwei Seiten oder Schritten ab.
+        :param job_id: Kennung des Auftrags für Journal und Metrikdatei, siehe journal.BatchJournal.
+        """
+        self.save_dir = save_dir
+        self.logger = logger or logging.getLogger(__name__)
+        self.sharding = sharding
+        self.shard_workers = shard_workers
+        self.use_ocr = use_ocr
+        self.ocr_workers = ocr_workers
+        self.cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.journal = BatchJournal(save_dir, job_id) if journal else None
+        self.stages = select_stages(stages)
+        self.progress = progress
+        self.metrics = StageMetrics(save_dir, job_id) if metrics else None
+        self.profile = profile
+        self.image_options = ImageOptions.from_dict(image_options)
+        self.parallel_text = parallel_text
+        self.text_workers = text_workers
+        self.cancel_event = cancel_event
+
+    def log_info(self, message):
+        """
+        Protokolliert eine Informationsnachricht.
+        """
+        self.logger.info(message)
+
+    def log_error(self, message):
+        """
+        Protokolliert eine Fehlermeldung.
+        """
+        self.logger.error(message)
+
+    def process_file(self, pdf_file, done_stages=(), outputs=None):
+        """
+        Führt die für die angeforderten Ausgaben nötigen Schritte für eine PDF-Datei aus.
+
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param done_stages: Laut Batch-Journal bereits abgeschlossene Schritte, die übersprungen werden.
+        :param outputs: Angeforderte Ausgaben (siehe STAGES), standardmäßig die Schritte aus dem Konstruktor.
+        :return: FileResult mit den Ergebnissen je Schritt, wahr bei vollständigem Erfolg.
+        """
+        stages = self.stages if outputs is None else select_stages(outputs)
+        if self.profile and os.path.basename(pdf_file) == os.path.basename(self.profile):
+            self.log_info(f"Profiliere Verarbeitung: {pdf_file}")
+            with profile_file(self.save_dir, pdf_file):
+                return self._process_file(pdf_file, done_stages, stages)
+        return self._process_file(pdf_file, done_stages, stages)
+
+    def _process_file(self, pdf_file, done_stages, stages):
+        result = FileResult(pdf_file, stages)
+        try:
+            self._check_cancelled()
+            name = output_name(pdf_file)
+            cache_key = None
+            if self.cache is not None and not done_stages:
+                cache_key = self.cache.make_key(pdf_file, self.cache_options(stages))
+                outputs = self.cache.materialize(cache_key, self.save_dir, name)
+                if outputs is not None:
+                    self.log_info(f"Cache-Treffer, Ausgaben übernommen: {pdf_file}")
+                    self._record_cached(pdf_file, outputs, result)
+                    return result
+                self.log_info(f"Cache-Fehlschlag, Datei wird konvertiert: {pdf_file}")
+
+            if done_stages:
+                self.log_info(f"Setze Verarbeitung fort, übersprungen: {', '.join(sorted(done_stages))} ({pdf_file})")
+            pending = [stage for stage in stages if stage not in done_stages]
+            result.stages = tuple(pending)
+
+            # Alle Schritte teilen sich eine Sitzung, damit die PDF nur einmal
+            # geparst und gerastert wird
+            with DocumentSession(pdf_file) as session:
+                if self.progress is not None and pending:
+                    self.progress.start(pdf_file, session.page_count, len(pending))
+                # Bild- und Textschritt laufen gleichzeitig, die OCR nutzt dann die Seiten des Bildschritts
+                if self.use_ocr and 'images' in pending and 'text' in pending:
+                    session.plan_full_render(self.images_dir(pdf_file), self.image_options)
+                self._run_graph(pdf_file, session, pending, done_stages, result)
+
+            if result.failed:
+                self.log_error(f"Verarbeitung unvollständig, fehlgeschlagen: {', '.join(result.failed)} ({pdf_file})")
+                return result
+
+            # Nur vollständige Ergebnisse in den Cache aufnehmen
+            if cache_key is not None:
+                self.cache.store(cache_key, self._cache_outputs(result.outputs))
+
+            self.log_info(f"Erfolgreich verarbeitet: {pdf_file}")
+            return result
+        except ConversionCancelled:
+            self.log_info(f"Verarbeitung abgebrochen: {pdf_file}")
+            result.outputs.clear()
+            return result
+        except Exception as e:
+            self.log_error(f"Fehler bei der Verarbeitung von {pdf_file}: {str(e)}")
+            result.outputs.clear()
+            return result
+
+    def _run_graph(self, pdf_file, session, pending, done_stages, result):
+        """
+        Führt die Schritte laut STAGE_GRAPH aus. Ein Schritt startet, sobald seine
+        Voraussetzungen erledigt sind; voneinander unabhängige Schritte laufen
+        gleichzeitig in Threads. Schlägt eine Voraussetzung fehl, entfallen die
+        davon abhängigen Schritte.
+        """
+        import concurrent.futures
+        # Seitenzahl vor dem Start der Threads lesen, danach greift nur noch die Textextraktion auf den Reader zu
+        session.page_count
+        finished = set(done_stages)
+        failed = set()
+        waiting = list(pending)
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(pending), 1),
+                                                   thread_name_prefix='stage') as executor:
+            while waiting or running:
+                if self.cancelled:
+                    waiting.clear()
+                for stage in list(waiting):
+                    dependencies = STAGE_GRAPH[stage]
+                    if any(dependency in failed for dependency in dependencies):
+                        waiting.remove(stage)
+                        failed.add(stage)
+                        self.log_error(f"Schritt {stage} entfällt, Voraussetzung fehlgeschlagen: {pdf_file}")
+                    elif all(dependency in finished for dependency in dependencies):
+                        waiting.remove(stage)
+                        future = executor.submit(getattr(self, f'_stage_{stage}'), pdf_file, session, result)
+                        running[future] = stage
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        stage_result = future.result()
+                    except ConversionCancelled:
+                        stage_result = None
+                    except Exception as e:
+                        self.log_error(f"Fehler im Schritt {stage} für {pdf_file}: {str(e)}")
+                        stage_result = None
+                    if stage_result is None:
+                        failed.add(stage)
+                        continue
+                    value, outputs = stage_result
+                    result.values[stage] = value
+                    result.outputs[stage] = outputs
+                    finished.add(stage)
+                    self._record(pdf_file, stage, outputs)
+        self._check_cancelled()
+
+    def _stage_docx(self, pdf_file, session, result):
+        """
+        PDF in DOCX konvertieren.
+
+        :return: Tupel (Wert, Ausgabedateien) oder None bei Fehlern, wie alle _stage_-Methoden.
+        """
+        docx_file = self._measured(pdf_file, 'docx', session.page_count,
+                                   self.convert_pdf_to_docx, pdf_file, session=session)
+        if not docx_file:
+            self.log_error(f"Fehler bei der Konvertierung von {pdf_file}")
+            return None
+        return docx_file, [docx_file]
+
+    def _stage_format(self, pdf_file, session, result):
+        """
+        Formatierung des konvertierten Dokuments anpassen.
+        """
+        # Nach einem fortgesetzten Batch stammt die DOCX aus dem vorherigen Lauf
+        docx_file = result.values.get('docx') or self.docx_path(pdf_file)
+        if not self._measured(pdf_file, 'format', session.page_count, self.format_docx, docx_file):
+            return None
+        self._advance(pdf_file, 'format', session.page_count)
+        return docx_file, [docx_file]
+
+    def _stage_images(self, pdf_file, session, result):
+        """
+        PDF in Bilder konvertieren.
+        """
+        page_files = self._measured(pdf_file, 'images', session.page_count,
+                                    self.convert_pdf_to_images, pdf_file, session=session)
+        if not page_files:
+            return None
+        return page_files, page_files
+
+    def _stage_text(self, pdf_file, session, result):
+        """
+        Text aus PDF extrahieren und speichern. Große PDFs werden bei aktiviertem
+        parallel_text seitenweise geschrieben; der Wert ist dann die Liste der Seitendateien.
+        """
+        if self.parallel_text and session.page_count >= PARALLEL_TEXT_THRESHOLD_PAGES:
+            page_files = self._measured(pdf_file, 'text', session.page_count, self.extract_text_to_pages,
+                                        pdf_file, use_ocr=self.use_ocr, session=session)
+            if not page_files:
+                return None
+            return page_files, page_files
+        text = self._measured(pdf_file, 'text', session.page_count,
+                              self.extract_text_from_pdf, pdf_file, use_ocr=self.use_ocr, session=session)
+        if text is None:
+            return None
+        return text, [self.save_text(pdf_file, text)]
+
+    def _measure(self, pdf_file, stage, pages=None):
+        """
+        Misst einen Schritt, falls die Metriken aktiviert sind.
+        """
+        if self.metrics is None:
+            return contextlib.nullcontext({})
+        return self.metrics.measure(pdf_file, stage, pages)
+
+    def _measured(self, pdf_file, stage, pages, func, *args, **kwargs):
+        """
+        Ruft einen Schritt gemessen auf. Ein leeres Ergebnis zählt als Fehlschlag.
+        """
+        with self._measure(pdf_file, stage, pages) as measurement:
+            result = func(*args, **kwargs)
+            measurement['success'] = result is not None and result is not False
+        return result
+
+    @property
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _check_cancelled(self):
+        """
+        Löst ConversionCancelled aus, sobald das cancel_event gesetzt ist.
+        """
+        if self.cancelled:
+            raise ConversionCancelled()
+
+    def _advance(self, pdf_file, stage, pages):
+        """
+        Meldet abgeschlossene Seiten eines Schritts, falls ein Fortschrittsempfänger
+        gesetzt ist. Nach jeder Seite wird auf einen Abbruch geprüft.
+        """
+        self._check_cancelled()
+        if self.progress is not None and pages:
+            self.progress.advance(pdf_file, stage, pages)
+
+    def _record(self, pdf_file, stage, outputs=()):
+        """
+        Hält einen abgeschlossenen Schritt im Batch-Journal fest, falls aktiviert.
+        """
+        if self.journal is not None:
+            self.journal.record(pdf_file, stage, outputs)
+
+    def _record_cached(self, pdf_file, outputs, result):
+        """
+        Hält die aus dem Cache übernommenen Ausgaben im Batch-Journal und im Ergebnis fest.
+        """
+        by_dir = {}
+        # Seitenbilder nach Seitennummer ordnen (page_2 vor page_10)
+        for path in sorted(outputs, key=lambda path: (os.path.dirname(path), len(path), path)):
+            top_dir = os.path.relpath(path, self.save_dir).split(os.sep)[0]
+            by_dir.setdefault(top_dir, []).append(path)
+        result.cached = True
+        for stage in result.stages:
+            stage_outputs = by_dir.get('docx' if stage == 'format' else stage, [])
+            result.outputs[stage] = stage_outputs
+            if stage == 'text' and stage_outputs == [self.text_path(pdf_file)]:
+                with open(stage_outputs[0], encoding='utf-8') as f:
+                    result.values[stage] = f.read()
+            elif stage in ('images', 'text'):
+                result.values[stage] = stage_outputs
+            elif stage_outputs:
+                result.values[stage] = stage_outputs[0]
+            self._record(pdf_file, stage, stage_outputs)
+
+    def _cache_outputs(self, outputs):
+        """
+        Wandelt die Ausgaben der Schritte in (Vorlage, Pfad)-Tupel für den Cache um.
+        """
+        templates = {}
+        for files in outputs.values():
+            for path in files:
+                parts = os.path.relpath(path, self.save_dir).split(os.sep)
+                if len(parts) == 2:
+                    # docx/<name>.docx, text/<name>.txt
+                    template = f"{parts[0]}/{{name}}{os.path.splitext(path)[1]}"
+                else:
+                    # images/<name>/page_1.png, text/<name>/page_1.txt
+                    template = f"{parts[0]}/{{name}}/{parts[-1]}"
+                templates[template] = path
+        return [(template, path) for template, path in templates.items()]
+
+    def cache_options(self, stages=None):
+        """
+        Optionen, die die Ausgaben beeinflussen und daher Teil des Cache-Schlüssels sind.
+        """
+        stages = self.stages if stages is None else stages
+        return {'sharding': self.sharding, 'use_ocr': self.use_ocr, 'stages': list(stages),
+                'images': self.image_options.to_dict(), 'parallel_text': self.parallel_text}
+
+    def convert_pdf_to_docx(self, pdf_file, session=None):
+        """
+        Konvertiere eine PDF-Datei in DOCX-Format.
+        
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param session: Optionale DocumentSession, die das geöffnete Dokument hält.
+        :return: Ausgegebener DOCX-Dateipfad oder None bei Fehlern.
+        """
+        try:
+            docx_file = self.docx_path(pdf_file)
+            os.makedirs(os.path.dirname(docx_file), exist_ok=True)
+
+            if session is None:
+                with DocumentSession(pdf_file) as own_session:
+                    self._convert_docx(pdf_file, docx_file, own_session)
+            else:
+                self._convert_docx(pdf_file, docx_file, session)
+            
+            return docx_file
+        except Exception as e:
+            self.log_error(f"Fehler bei der Konvertierung von PDF zu DOCX: {str(e)}")
+            return None
+
+    def docx_path(self, pdf_file):
+        """
+        Pfad der DOCX-Ausgabe einer PDF-Datei.
+        """
+        return output_locations(self.save_dir, pdf_file)['docx']
+
+    def text_path(self, pdf_file):
+        """
+        Pfad der Textausgabe einer PDF-Datei.
+        """
+        return output_locations(self.save_dir, pdf_file)['text']
+
+    def text_pages_dir(self, pdf_file):
+        """
+        Verzeichnis der Seitendateien einer PDF-Datei bei seitenweiser Textausgabe.
+        """
+        return output_locations(self.save_dir, pdf_file)['text_pages']
+
+    def images_dir(self, pdf_file):
+        """
+        Verzeichnis der Seitenbilder einer PDF-Datei.
+        """
+        return output_locations(self.save_dir, pdf_file)['images']
+
+    def save_text(self, pdf_file, text):
+        """
+        Speichert den extrahierten Text einer PDF-Datei.
+
+        :return: Pfad der geschriebenen Textdatei.
+        """
+        text_file = self.text_path(pdf_file)
+        os.makedirs(os.path.dirname(text_file), exist_ok=True)
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return text_file
+
+    def _convert_docx(self, pdf_file, docx_file, session):
+        """
+        Konvertiert große Dokumente bei aktiviertem Sharding in Seitenbereichen,
+        alle anderen in einem Durchlauf.
+        """
+        if self.sharding and session.page_count >= SHARD_THRESHOLD_PAGES:
+            shard_count = convert_sharded(pdf_file, docx_file, session.page_count, workers=self.shard_workers,
+                                          on_pages=functools.partial(self._advance, pdf_file, 'docx'))
+            self.log_info(f"PDF in {shard_count} Seitenbereichen zu DOCX konvertiert: {pdf_file}")
+        else:
+            session.converter.convert(docx_file)
+            self._advance(pdf_file, 'docx', session.page_count)
+
+    def format_docx(self, docx_file):
+        """
+        Passe die Formatierung des konvertierten DOCX-Dokuments an.
+
+        :return: True, wenn das Dokument formatiert wurde.
+        """
+        try:
+            # Schriftart und -größe der Absatz- und Tabellenvorlagen direkt im
+            # Zip-Archiv setzen, ohne das Dokument mit python-docx zu laden
+            patch_docx_fonts(docx_file, font_name='Arial', font_size_pt=11)
+            
+            self.log_info(f"Dokument formatiert und gespeichert: {docx_file}")
+            return True
+        except Exception as e:
+            self.log_error(f"Fehler bei der Formatierung des Dokuments {docx_file}: {str(e)}")
+            return False
+
+    def convert_pdf_to_images(self, pdf_file, session=None):
+        """
+        Konvertiere eine PDF-Datei in Bilder, Format und Auflösung laut image_options.
+        
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param session: Optionale DocumentSession, deren gerenderte Seiten wiederverwendet werden.
+        :return: Liste der Bilddateien oder None bei Fehlern.
+        """
+        own_session = None
+        try:
+            if session is None:
+                session = own_session = DocumentSession(pdf_file)
+
+            output_dir = self.images_dir(pdf_file)
+            os.makedirs(output_dir, exist_ok=True)
+            
+            # Seiten fensterweise rendern und parallel kodieren
+            page_files = session.render_pages(output_dir, on_pages=functools.partial(self._advance, pdf_file, 'images'),
+                                              options=self.image_options)
+            if not page_files:
+                raise ValueError("Keine Bilder aus der PDF-Datei konvertiert.")
+            
+            self.log_info(f"PDF in Bilder konvertiert: {pdf_file}")
+            return page_files
+        except Exception as e:
+            self.log_error(f"Fehler bei der Konvertierung von PDF zu Bildern: {str(e)}")
+            return None
+        finally:
+            if own_session is not None:
+                own_session.close()
+
+    def extract_text_from_pdf(self, pdf_file, use_ocr=False, session=None):
+        """
+        Extrahiere Text aus einer PDF-Datei. Optional kann OCR verwendet werden.
+        
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param use_ocr: Boolean, ob OCR für die Textextraktion verwendet werden soll.
+        :param session: Optionale DocumentSession, deren Reader und Seitenbilder wiederverwendet werden.
+        :return: Extrahierter Text als String.
+        """
+        own_session = None
+        try:
+            if session is None:
+                session = own_session = DocumentSession(pdf_file)
+
+            # Versuche zuerst, den Text direkt mit PyPDF2 zu extrahieren
+            with self._measure(pdf_file, 'text_layer', session.page_count):
+                page_texts = list(session.page_texts)
+
+            ocr_numbers = []
+            if use_ocr:
+                # Nur Seiten ohne brauchbare Textebene per OCR erkennen
+                ocr_numbers = [number for number, text in enumerate(page_texts, start=1) if needs_ocr(text)]
+            self._advance(pdf_file, 'text', len(page_texts) - len(ocr_numbers))
+            if ocr_numbers:
+                self.log_info(f"Kein Text auf {len(ocr_numbers)} von {len(page_texts)} Seiten gefunden. OCR wird verwendet.")
+                on_page = lambda number: self._advance(pdf_file, 'text', 1)
+                with self._measure(pdf_file, 'ocr', len(ocr_numbers)):
+                    # Erkennung beginnt, während die übrigen Seiten noch gerendert werden
+                    page_files = session.iter_selected_pages(ocr_numbers)
+                    for number, text in ocr_pages(page_files, self.ocr_workers, on_page=on_page).items():
+                        page_texts[number - 1] = text
+
+            extracted_text = "".join(page_texts)
+            
+            if not extracted_text:
+                raise ValueError(f"Kein Text aus der PDF-Datei extrahiert: {pdf_file}")
+            
+            self.log_info(f"Text erfolgreich aus PDF extrahiert: {pdf_file}")
+            return extracted_text
+        except Exception as e:
+            self.log_error(f"Fehler bei der Textextraktion aus der PDF: {str(e)}")
+            return None
+        finally:
+            if own_session is not None:
+                own_session.close()
+
+    def extract_text_to_pages(self, pdf_file, use_ocr=False, session=None):
+        """
+        Liest die Textebene in parallelen Seitenbereichen (siehe extract.extract_pages_parallel)
+        und schreibt jede Seite als page_<n>.txt nach text/<name>/. Der Text wird
+        nie als Ganzes im Speicher gehalten. Seiten ohne Textebene werden optional
+        per OCR erkannt und in ihrer Seitendatei ersetzt.
+
+        :param pdf_file: Pfad zur PDF-Datei.
+        :param use_ocr: Boolean, ob OCR für Seiten ohne Textebene verwendet werden soll.
+        :param session: Optionale DocumentSession, deren Seitenzahl und Seitenbilder wiederverwendet werden.
+        :return: Liste der Seitendateien in Seitenreihenfolge oder None bei Fehlern.
+        """
+        own_session = None
+        try:
+            if session is None:
+                session = own_session = DocumentSession(pdf_file)
+            output_dir = self.text_pages_dir(pdf_file)
+
+            page_files = []
+            ocr_numbers = []
+            has_text = False
+            with self._measure(pdf_file, 'text_layer', session.page_count):
+                for page_number, page_file, missing in extract_pages_parallel(pdf_file, output_dir, session.page_count,
+                                                                              workers=self.text_workers):
+                    page_files.append(page_file)
+                    if use_ocr and missing:
+                        ocr_numbers.append(page_number)
+                    else:
+                        has_text = has_text or os.path.getsize(page_file) > 0
+                        self._advance(pdf_file, 'text', 1)
+
+            if ocr_numbers:
+                self.log_info(f"Kein Text auf {len(ocr_numbers)} von {len(page_files)} Seiten gefunden. OCR wird verwendet.")
+                on_page = lambda number: self._advance(pdf_file, 'text', 1)
+                with self._measure(pdf_file, 'ocr', len(ocr_numbers)):
+                    page_images = session.iter_selected_pages(ocr_numbers)
+                    for number, text in ocr_pages(page_images, self.ocr_workers, on_page=on_page).items():
+                        with open(page_text_path(output_dir, number), 'w', encoding='utf-8') as f:
+                            f.write(text)
+                        has_text = has_text or bool(text)
+
+            if not has_text:
+                raise ValueError(f"Kein Text aus der PDF-Datei extrahiert: {pdf_file}")
+
+            self.log_info(f"Text aus {len(page_files)} Seiten parallel extrahiert: {pdf_file}")
+            return page_files
+        except Exception as e:
+            self.log_error(f"Fehler bei der Textextraktion aus der PDF: {str(e)}")
+            return None
+        finally:
+            if own_session is not None:
+                own_session.close()
+
+    def convert_from_file(self, file):
+        """
+        Konvertiere eine beliebige Datei (z. B. PDF oder Bild) in ein anderes Format.
+        
+        :param file: Pfad zur Eingabedatei.
+        :return: True bei Erfolg, sonst False.
+        """
+        try:
+            if file.lower().endswith('.pdf'):
+                return self.convert_pdf_to_docx(file) is not None
+            elif file.lower().endswith(IMAGE_EXTENSIONS):
+                output_pdf = os.path.join(self.save_dir, os.path.basename(file).rsplit('.', 1)[0] + '.pdf')
+                images_to_pdf([file], output_pdf)
+                self.log_info(f"Bild in PDF konvertiert: {file}")
+                return True
+            else:
+                raise ValueError(f"Dateiformat wird nicht unterstützt: {file}")
+        except Exception as e:
+            self.log_error(f"Fehler bei der Dateikonvertierung: {str(e)}")
+            return False
@@ -0,0 +1,52 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic startup budget file
+import json
+import os
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_budget.json')
+RUNS = 5
+
+
+def measure_import(module, runs=RUNS):
+    """
+    Misst die kumulative Importzeit eines Moduls in einem frischen Interpreter.
+
+    :return: Tupel (Millisekunden, Menge der geladenen Top-Level-Module).
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    code = f"import sys, json, {module}; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    best = None
+    loaded = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=src_dir,
+                                capture_output=True, text=True, check=True)
+        loaded = set(json.loads(result.stdout))
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[2] == module:
+                cumulative_ms = int(parts[1]) / 1000
+                best = cumulative_ms if best is None else min(best, cumulative_ms)
+    return best, loaded
+
+
+def main():
+    with open(BUDGET_FILE, encoding='utf-8') as f:
+        budget = json.load(f)
+
+    failed = False
+    for module, max_ms in budget['modules'].items():
+        elapsed_ms, loaded = measure_import(module)
+        heavy = sorted(loaded & set(budget['forbidden']))
+        status = "OK" if elapsed_ms <= max_ms and not heavy else "ÜBERSCHRITTEN"
+        print(f"{module:<10} {elapsed_ms:8.1f} ms / {max_ms} ms  {status}")
+        if heavy:
+            print(f"           lädt beim Import: {', '.join(heavy)}")
+        failed = failed or status != "OK"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic watch file
+import logging
+import os
+import queue
+import select
+import shutil
+import struct
+import threading
+import time
+
+# Ereignisse aus <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+# Sekunden, die Größe und Änderungszeit einer Datei unverändert sein müssen
+DEFAULT_SETTLE_SECONDS = 2.0
+# Abfrageintervall des Polling-Rückfalls in Sekunden
+POLL_INTERVAL = 2.0
+# Dateien, die noch geschrieben oder von anderen Programmen zwischengespeichert werden
+IGNORED_SUFFIXES = ('.part', '.tmp', '.crdownload', '.partial')
+DONE_NAME = 'done'
+ERROR_NAME = 'error'
+
+
+def is_candidate(path):
+    name = os.path.basename(path)
+    return name.lower().endswith('.pdf') and not name.startswith('.') and not name.lower().endswith(IGNORED_SUFFIXES)
+
+
+def scan_directory(directory):
+    """
+    Einmaliges Auflisten der PDF-Dateien eines Eingangsordners (ohne Unterordner).
+    """
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries if entry.is_file() and is_candidate(entry.path)]
+
+
+class InotifyWatcher:
+    """
+    Meldet neue und geänderte Dateien über inotify (Linux). Eingebunden über
+    ctypes, damit keine zusätzliche Abhängigkeit nötig ist. Unterordner werden
+    nicht überwacht, dort liegen u. a. die Ordner für erledigte Dateien.
+    """
+
+    def __init__(self, directories):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, f"Ordner kann nicht überwacht werden: {directory}")
+            self.directories[wd] = directory
+
+    def events(self, timeout):
+        """
+        Wartet höchstens timeout Sekunden auf Ereignisse.
+
+        :return: Tupel (Menge der betroffenen Dateipfade, True bei Überlauf der Ereignis-Queue).
+        """
+        paths = set()
+        overflow = False
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        while readable:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd in self.directories and name:
+                    paths.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return paths, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Rückfall ohne inotify (z. B. Windows, macOS oder Netzlaufwerke): listet die
+    Eingangsordner in festen Abständen auf und meldet neue oder geänderte Dateien.
+    """
+
+    def __init__(self, directories, interval=POLL_INTERVAL):
+        self.directories = list(directories)
+        self.interval = interval
+        self.known = {}
+        self.next_scan = 0.0
+
+    def events(self, timeout):
+        delay = self.next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return set(), False
+        time.sleep(max(delay, 0))
+        self.next_scan = time.monotonic() + self.interval
+        paths = set()
+        current = {}
+        for directory in self.directories:
+            for path in scan_directory(directory):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                current[path] = (stat.st_size, stat.st_mtime_ns)
+                if self.known.get(path) != current[path]:
+                    paths.add(path)
+        self.known = current
+        return paths, False
+
+    def close(self):
+        pass
+
+
+def create_watcher(directories, logger=None):
+    """
+    inotify, falls verfügbar, sonst PollingWatcher.
+    """
+    try:
+        return InotifyWatcher(directories)
+    except (OSError, AttributeError) as e:
+        (logger or logging.getLogger(__name__)).info(f"inotify nicht verfügbar ({e}), Ordner werden abgefragt.")
+        return PollingWatcher(directories)
+
+
+def move_to(path, target_dir):
+    """
+    Verschiebt eine Datei, ohne vorhandene Dateien gleichen Namens zu überschreiben.
+
+    :return: Neuer Pfad der Datei.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    name, extension = os.path.splitext(os.path.basename(path))
+    target = os.path.join(target_dir, name + extension)
+    if os.path.exists(target):
+        target = os.path.join(target_dir, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}{extension}")
+    shutil.move(path, target)
+    return target
+
+
+class HotFolder:
+    """
+    Überwacht Eingangsordner und übergibt vollständig geschriebene PDFs an die
+    ProcessEngine. Eine Datei gilt als vollständig, wenn Größe und Änderungszeit
+    für settle Sekunden unverändert bleiben. Geprüft werden nur Dateien, für die
+    ein Ereignis eingegangen ist; nur beim Start und nach einem Überlauf der
+    inotify-Queue werden die Ordner vollständig aufgelistet. Erledigte Dateien
+    werden nach done/, fehlgeschlagene nach error/ im jeweiligen Eingangsordner verschoben.
+    Bricht die Verarbeitung der Engine ab, endet auch die Überwachung; der
+    Fehler steht danach in error.
+    """
+
+    def __init__(self, directories, engine, done_dir=None, error_dir=None, settle=DEFAULT_SETTLE_SECONDS,
+                 logger=None):
+        """
+        :param directories: Liste der zu überwachenden Eingangsordner.
+        :param engine: engine.ProcessEngine, begrenzt die Anzahl gleichzeitig verarbeiteter Dateien.
+        :param done_dir: Zielordner für erfolgreich verarbeitete Eingaben, standardmäßig done/ im Eingangsordner.
+        :param error_dir: Zielordner für fehlgeschlagene Eingaben, standardmäßig error/ im Eingangsordner.
+        :param settle: Sekunden ohne Änderung, nach denen eine Datei als vollständig gilt.
+        :param logger: Logger für Statusmeldungen.
+        """
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.engine = engine
+        self.done_dir = done_dir
+        self.error_dir = error_dir
+        self.settle = settle
+        self.logger = logger or logging.getLogger(__name__)
+        self.stop_event = threading.Event()
+        self.file_queue = queue.Queue()
+        # Datei -> (Größe, Änderungszeit, Zeitpunkt der letzten Änderung)
+        self.pending = {}
+        self.active = set()
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.error = None
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        """
+        Blockiert, bis stop() aufgerufen wird, und verarbeitet bis dahin
+        übernommene Dateien noch zu Ende.
+        """
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+        watcher = create_watcher(self.directories, self.logger)
+        worker = threading.Thread(target=self._serve, daemon=True)
+        worker.start()
+        self.logger.info(f"Überwache {', '.join(self.directories)}")
+        try:
+            self.rescan()
+            while not self.stop_event.is_set():
+                timeout = self.settle / 2 if self.pending else 1.0
+                paths, overflow = watcher.events(timeout)
+                if overflow:
+                    self.logger.info("Ereignis-Queue übergelaufen, Eingangsordner werden neu aufgelistet.")
+                    self.rescan()
+                for path in paths:
+                    self.observe(path)
+                self.check_pending()
+        finally:
+            self.stop_event.set()
+            watcher.close()
+            worker.join()
+
+    def _serve(self):
+        try:
+            self.engine.serve(self.file_queue, self.stop_event, self.finished)
+        except BaseException as e:
+            # Ohne Engine würden neue Dateien nur noch in die Queue gelegt
+            self.error = e
+            self.logger.error(f"Verarbeitung abgebrochen, Überwachung wird beendet: {str(e)}")
+            self.stop_event.set()
+
+    def rescan(self):
+        for directory in self.directories:
+            for path in scan_directory(directory):
+                self.observe(path)
+
+    def observe(self, path):
+        """
+        Merkt sich eine Datei nach einem Ereignis und setzt ihre Wartezeit zurück, falls sie sich geändert hat.
+        """
+        if not is_candidate(path):
+            return
+        with self.lock:
+            if path in self.active:
+                return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.pending.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous = self.pending.get(path)
+        if previous is None or previous[:2] != signature:
+            self.pending[path] = signature + (time.monotonic(),)
+
+    def check_pending(self):
+        """
+        Übergibt Dateien, die seit settle Sekunden unverändert sind, an die Engine.
+        """
+        now = time.monotonic()
+        for path, (size, mtime, changed) in list(self.pending.items()):
+            if now - changed < self.settle:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            del self.pending[path]
+            if size == 0:
+                continue
+            with self.lock:
+                self.active.add(path)
+            self.logger.info(f"Neue Datei: {path}")
+            self.file_queue.put(path)
+
+    def finished(self, pdf_file, success):
+        """
+        Callback der Engine: verschiebt die Eingabe nach done/ bzw. error/.
+        """
+        directory = os.path.dirname(pdf_file)
+        if success:
+            self.processed += 1
+            target_dir = self.done_dir or os.path.join(directory, DONE_NAME)
+        else:
+            self.failed += 1
+            target_dir = self.error_dir or os.path.join(directory, ERROR_NAME)
+        try:
+            target = move_to(pdf_file, target_dir)
+            self.logger.info(f"{'Erledigt' if success else 'Fehlgeschlagen'}: {pdf_file} -> {target}")
+        except OSError as e:
+            self.logger.error(f"Datei konnte nicht verschoben werden: {pdf_file} ({str(e)})")
+        finally:
+            with self.lock:
+                self.active.discard(pdf_file)
@@ -0,0 +1,27 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic test configuration file
+import os
+import sys
+
+import pytest
+
+# Die Module liegen flach in src/ und importieren sich gegenseitig ohne Paketpräfix
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """
+    Legt eine PDF mit einer Textzeile je Seite an und liefert ihren Pfad.
+    """
+    def make(name='doc.pdf', pages=3):
+        import fitz
+        document = fitz.open()
+        for number in range(1, pages + 1):
+            document.new_page().insert_text((72, 72), f"Seite {number}")
+        path = tmp_path / name
+        document.save(str(path))
+        document.close()
+        return str(path)
+    return make
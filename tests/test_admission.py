@@ -0,0 +1,64 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic admission test file
+import threading
+
+from admission import MemoryBudget, parse_size
+
+
+def test_reserve_within_budget():
+    budget = MemoryBudget(100)
+
+    assert budget.try_reserve(60)
+    assert budget.try_reserve(40)
+    assert not budget.try_reserve(1)
+    assert (budget.reserved, budget.running) == (100, 2)
+
+
+def test_release_frees_budget():
+    budget = MemoryBudget(100)
+    budget.try_reserve(70)
+    assert not budget.try_reserve(50)
+
+    budget.release(70)
+
+    assert budget.try_reserve(50)
+    assert (budget.reserved, budget.running) == (50, 1)
+
+
+def test_oversized_job_runs_only_alone():
+    budget = MemoryBudget(100)
+
+    assert budget.try_reserve(500)
+    assert not budget.try_reserve(1)
+    budget.release(500)
+    budget.try_reserve(1)
+    assert not budget.try_reserve(500)
+
+
+def test_max_jobs_limits_running_jobs():
+    budget = MemoryBudget(1000, max_jobs=2)
+
+    assert budget.try_reserve(1)
+    assert budget.try_reserve(1)
+    assert not budget.try_reserve(1)
+    budget.release(1)
+    assert budget.try_reserve(1)
+
+
+def test_wait_returns_on_release():
+    budget = MemoryBudget(100)
+    budget.try_reserve(100)
+    timer = threading.Timer(0.05, budget.release, args=(100,))
+    timer.start()
+
+    budget.wait(5)
+
+    timer.join()
+    assert budget.running == 0
+
+
+def test_parse_size_units():
+    assert parse_size('512') == 512
+    assert parse_size('8K') == 8 * 1024
+    assert parse_size('1.5G') == int(1.5 * 1024 ** 3)
@@ -0,0 +1,55 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic assemble test file
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from assemble import images_to_pdf
+
+
+def save_image(tmp_path, name, size, color, **options):
+    path = tmp_path / name
+    Image.new('RGB', size, color).save(str(path), **options)
+    return str(path)
+
+
+def test_jpeg_data_is_embedded_unchanged(tmp_path):
+    jpeg_file = save_image(tmp_path, 'page.jpg', (120, 80), 'red', quality=90)
+    output_pdf = str(tmp_path / 'out.pdf')
+
+    assert images_to_pdf([jpeg_file], output_pdf) == 1
+
+    reader = PdfReader(output_pdf)
+    xobjects = reader.pages[0]['/Resources']['/XObject']
+    image = next(iter(xobjects.values())).get_object()
+    assert image['/Filter'] == '/DCTDecode'
+    # DCTDecode wird von PyPDF2 nicht dekodiert, get_data() liefert den Stream unverändert
+    with open(jpeg_file, 'rb') as f:
+        assert image.get_data() == f.read()
+
+
+def test_pages_follow_input_order_and_size(tmp_path):
+    files = [save_image(tmp_path, 'a.png', (100, 50), 'blue', dpi=(100, 100)),
+             save_image(tmp_path, 'b.jpg', (50, 100), 'green', dpi=(50, 50))]
+    output_pdf = str(tmp_path / 'out.pdf')
+
+    assert images_to_pdf(files, output_pdf) == 2
+
+    reader = PdfReader(output_pdf)
+    # Seitengröße in Punkt aus Pixelgröße und Auflösung
+    sizes = [(round(float(page.mediabox.width)), round(float(page.mediabox.height))) for page in reader.pages]
+    assert sizes == [(72, 36), (72, 144)]
+
+
+def test_failed_assembly_keeps_existing_output(tmp_path):
+    output_pdf = tmp_path / 'out.pdf'
+    output_pdf.write_bytes(b'previous')
+    broken = tmp_path / 'broken.png'
+    broken.write_bytes(b'not an image')
+
+    with pytest.raises(Exception):
+        images_to_pdf([str(broken)], str(output_pdf))
+
+    assert output_pdf.read_bytes() == b'previous'
+    assert not (tmp_path / 'out.pdf.part').exists()
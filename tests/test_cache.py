@@ -0,0 +1,93 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic cache test file
+import os
+
+from cache import ResultCache
+
+
+def make_output(tmp_path, relative, content):
+    path = tmp_path / 'save' / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def store_entry(cache, tmp_path, key, size):
+    docx_file = make_output(tmp_path, os.path.join('docx', 'doc.docx'), b'x' * size)
+    cache.store(key, [(os.path.join('docx', '{name}.docx'), docx_file)])
+
+
+def test_store_and_materialize_under_new_name(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    docx_file = make_output(tmp_path, os.path.join('docx', 'doc.docx'), b'docx')
+    image_file = make_output(tmp_path, os.path.join('images', 'doc', 'page_1.png'), b'png')
+    cache.store('ab' * 32, [(os.path.join('docx', '{name}.docx'), docx_file),
+                            (os.path.join('images', '{name}', 'page_1.png'), image_file)])
+
+    target_dir = tmp_path / 'other'
+    outputs = cache.materialize('ab' * 32, str(target_dir), 'renamed')
+
+    assert outputs == [str(target_dir / 'docx' / 'renamed.docx'),
+                       str(target_dir / 'images' / 'renamed' / 'page_1.png')]
+    assert (target_dir / 'docx' / 'renamed.docx').read_bytes() == b'docx'
+    assert (target_dir / 'images' / 'renamed' / 'page_1.png').read_bytes() == b'png'
+
+
+def test_materialize_unknown_key_returns_none(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'))
+
+    assert cache.materialize('cd' * 32, str(tmp_path / 'out'), 'doc') is None
+
+
+def test_make_key_depends_on_content_and_options(tmp_path):
+    first = tmp_path / 'first.pdf'
+    second = tmp_path / 'second.pdf'
+    first.write_bytes(b'%PDF-same')
+    second.write_bytes(b'%PDF-same')
+
+    assert ResultCache.make_key(str(first), {'dpi': 200}) == ResultCache.make_key(str(second), {'dpi': 200})
+    assert ResultCache.make_key(str(first), {'dpi': 200}) != ResultCache.make_key(str(first), {'dpi': 300})
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=250)
+    keys = ['a1' * 32, 'b2' * 32, 'c3' * 32]
+    store_entry(cache, tmp_path, keys[0], 100)
+    store_entry(cache, tmp_path, keys[1], 100)
+    # Der ältere Eintrag wird genutzt und ist damit zuletzt verwendet
+    manifest = os.path.join(cache._entry_dir(keys[1]), 'manifest.json')
+    os.utime(manifest, (1, 1))
+    assert cache.materialize(keys[0], str(tmp_path / 'out'), 'doc') is not None
+
+    store_entry(cache, tmp_path, keys[2], 100)
+
+    assert cache.materialize(keys[1], str(tmp_path / 'out'), 'doc') is None
+    assert cache.materialize(keys[0], str(tmp_path / 'out'), 'doc') is not None
+    assert cache.materialize(keys[2], str(tmp_path / 'out'), 'doc') is not None
+
+
+def test_evict_keeps_entries_within_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=1000)
+    keys = ['d4' * 32, 'e5' * 32]
+    for key in keys:
+        store_entry(cache, tmp_path, key, 100)
+
+    for key in keys:
+        assert cache.materialize(key, str(tmp_path / 'out'), 'doc') is not None
+
+
+def test_store_scans_only_when_limit_is_exceeded(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=250)
+    scans = []
+    evict = ResultCache.evict
+    monkeypatch.setattr(ResultCache, 'evict', lambda self: scans.append(1) or evict(self))
+    keys = ['f6' * 32, 'a7' * 32, 'b8' * 32]
+    for key in keys:
+        # Eine neue Instanz je Datei wie in den Worker-Prozessen der Engine
+        store_entry(ResultCache(cache.cache_dir, cache.max_bytes), tmp_path, key, 100)
+
+    # Einmal zum Zählen, einmal nach dem Überschreiten
+    assert len(scans) == 2
+    assert cache.materialize(keys[0], str(tmp_path / 'out'), 'doc') is None
+    assert cache.materialize(keys[2], str(tmp_path / 'out'), 'doc') is not None
@@ -0,0 +1,76 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic DOCX patch test file
+import shutil
+
+import docx
+import pytest
+from docx.shared import Pt
+
+from docx_patch import patch_docx_fonts
+
+
+def format_with_python_docx(docx_file):
+    """
+    Bisherige Formatierung über das Objektmodell von python-docx, als Referenz.
+    """
+    document = docx.Document(docx_file)
+    for paragraph in document.paragraphs:
+        paragraph.style.font.name = 'Arial'
+        paragraph.style.font.size = Pt(11)
+    for table in document.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    paragraph.style.font.name = 'Arial'
+                    paragraph.style.font.size = Pt(11)
+    document.save(docx_file)
+
+
+def style_fonts(docx_file):
+    document = docx.Document(docx_file)
+    return {style.style_id: (style.font.name, style.font.size)
+            for style in document.styles if style.type == docx.enum.style.WD_STYLE_TYPE.PARAGRAPH}
+
+
+@pytest.fixture
+def source_docx(tmp_path):
+    document = docx.Document()
+    document.add_heading('Überschrift', level=1)
+    document.add_paragraph('Standardabsatz')
+    document.add_paragraph('Zitat', style='Quote')
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).paragraphs[0].style = document.styles['List Bullet']
+    table.cell(1, 1).text = 'Zelle'
+    path = tmp_path / 'source.docx'
+    document.save(str(path))
+    return path
+
+
+def test_patch_matches_python_docx_result(tmp_path, source_docx):
+    reference = tmp_path / 'reference.docx'
+    patched = tmp_path / 'patched.docx'
+    shutil.copyfile(source_docx, reference)
+    shutil.copyfile(source_docx, patched)
+
+    format_with_python_docx(str(reference))
+    patch_docx_fonts(str(patched), font_name='Arial', font_size_pt=11)
+
+    assert style_fonts(str(patched)) == style_fonts(str(reference))
+    # Nur verwendete Vorlagen werden geändert
+    fonts = style_fonts(str(patched))
+    assert fonts['Heading1'] == ('Arial', Pt(11))
+    assert fonts['ListBullet'] == ('Arial', Pt(11))
+    assert fonts['Heading2'] != ('Arial', Pt(11))
+
+
+def test_patch_keeps_document_content(tmp_path, source_docx):
+    patched = tmp_path / 'patched.docx'
+    shutil.copyfile(source_docx, patched)
+
+    patch_docx_fonts(str(patched))
+
+    before = docx.Document(str(source_docx))
+    after = docx.Document(str(patched))
+    assert [p.text for p in after.paragraphs] == [p.text for p in before.paragraphs]
+    assert after.tables[0].cell(1, 1).text == 'Zelle'
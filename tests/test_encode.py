@@ -0,0 +1,98 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic encode test file
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import encode
+from encode import TIFF_NAME, ImageOptions, encode_page_data, encode_pages
+
+
+def write_raw_page(path, mode='RGB'):
+    Image.new(mode, (40, 60), 'white' if mode == 'RGB' else 255).save(path)
+    return path
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """
+    Ersetzt pdftoppm durch eine Attrappe, die je Seite eine Rohdatei schreibt und die Fenster festhält.
+    """
+    windows = []
+
+    def render_to_files(pdf_file, output_dir, dpi=None, window=None, page_count=None, fmt='png', first_page=1,
+                        last_page=None, grayscale=False):
+        windows.append((first_page, last_page))
+        return [write_raw_page(os.path.join(output_dir, f"page_{number}.{fmt}"), 'L' if grayscale else 'RGB')
+                for number in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(encode, 'render_to_files', render_to_files)
+    return windows
+
+
+@pytest.mark.parametrize('arguments', [
+    {'fmt': 'gif'},
+    {'mode': 'sepia'},
+    {'fmt': 'jpeg', 'mode': 'bitonal'},
+    {'png_compression': 10},
+    {'quality': 0},
+])
+def test_invalid_options_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        ImageOptions(**arguments)
+
+
+def test_only_default_png_pages_are_reusable_for_ocr():
+    assert ImageOptions().reusable_for_ocr
+    assert not ImageOptions(fmt='jpeg').reusable_for_ocr
+    assert not ImageOptions(mode='gray').reusable_for_ocr
+    assert not ImageOptions(dpi=300).reusable_for_ocr
+
+
+def test_worker_counts_do_not_change_the_cache_key():
+    assert ImageOptions(workers=1).to_dict() == ImageOptions(workers=8, write_workers=4).to_dict()
+
+
+@pytest.mark.parametrize('fmt, mode, image_format, image_mode', [
+    ('png', 'color', 'PNG', 'RGB'),
+    ('png', 'bitonal', 'PNG', '1'),
+    ('jpeg', 'gray', 'JPEG', 'L'),
+    ('webp', 'color', 'WEBP', 'RGB'),
+])
+def test_encode_page_data_writes_format_and_mode(tmp_path, fmt, mode, image_format, image_mode):
+    raw_file = write_raw_page(str(tmp_path / 'page_1.ppm'))
+
+    data = encode_page_data(raw_file, ImageOptions(fmt=fmt, mode=mode))
+
+    assert not os.path.exists(raw_file)
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.mode) == (image_format, image_mode)
+
+
+def test_encode_pages_keeps_page_order_and_reports_every_page(tmp_path, fake_render):
+    pages = []
+    output_dir = str(tmp_path / 'images')
+
+    page_files = encode_pages('doc.pdf', output_dir, {'workers': 3}, page_count=5, window=2,
+                              on_pages=pages.append)
+
+    assert page_files == [os.path.join(output_dir, f"page_{number}.png") for number in range(1, 6)]
+    assert all(os.path.getsize(page_file) > 0 for page_file in page_files)
+    assert fake_render == [(1, 2), (3, 4), (5, 5)]
+    assert sum(pages) == 5
+    # Die Rohdateien liegen nur vorübergehend im Zielverzeichnis
+    assert sorted(os.listdir(output_dir)) == sorted(os.path.basename(page_file) for page_file in page_files)
+
+
+def test_encode_pages_writes_one_multipage_tiff(tmp_path, fake_render):
+    output_dir = str(tmp_path / 'images')
+
+    page_files = encode_pages('doc.pdf', output_dir, {'fmt': 'tiff', 'mode': 'bitonal'}, page_count=3, window=2)
+
+    assert page_files == [os.path.join(output_dir, TIFF_NAME)]
+    with Image.open(page_files[0]) as image:
+        assert image.n_frames == 3
+        assert image.mode == '1'
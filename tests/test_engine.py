@@ -0,0 +1,100 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic engine test file
+import os
+import queue
+import threading
+
+from engine import ProcessEngine
+from journal import BatchJournal
+
+
+def test_run_extracts_text_in_workers(tmp_path, make_pdf):
+    pdf_files = [make_pdf('first.pdf', pages=2), make_pdf('second.pdf', pages=1)]
+    engine = ProcessEngine(str(tmp_path / 'out'), max_workers=2, stage_options={'stages': ['text']})
+
+    results = engine.run(pdf_files)
+
+    assert all(results[pdf_file] for pdf_file in pdf_files)
+    with open(tmp_path / 'out' / 'text' / 'first.txt', encoding='utf-8') as f:
+        text = f.read()
+    assert 'Seite 1' in text and 'Seite 2' in text
+
+
+def test_resume_skips_completed_files(tmp_path, make_pdf):
+    pdf_file = make_pdf(pages=1)
+    save_dir = str(tmp_path / 'out')
+    ProcessEngine(save_dir, max_workers=1, stage_options={'stages': ['text']}).run([pdf_file])
+    text_file = os.path.join(save_dir, 'text', 'doc.txt')
+    modified = os.path.getmtime(text_file)
+
+    results = ProcessEngine(save_dir, max_workers=1, stage_options={'stages': ['text']}, resume=True).run([pdf_file])
+
+    assert results == {pdf_file: True}
+    assert os.path.getmtime(text_file) == modified
+
+
+def test_colliding_output_names_fail_all_but_first(tmp_path, make_pdf):
+    first = make_pdf('report.pdf', pages=1)
+    os.makedirs(tmp_path / 'other')
+    second = str(tmp_path / 'other' / 'report.pdf')
+    os.link(first, second)
+
+    results = ProcessEngine(str(tmp_path / 'out'), max_workers=1, stage_options={'stages': ['text']}).run(
+        [first, second])
+
+    assert results[first]
+    assert results[second] is False
+
+
+def test_cancelled_engine_starts_nothing(tmp_path, make_pdf):
+    engine = ProcessEngine(str(tmp_path / 'out'), max_workers=1, stage_options={'stages': ['text']})
+    engine.cancel()
+
+    assert engine.run([make_pdf()]) == {}
+    assert not os.path.exists(tmp_path / 'out' / 'text')
+
+
+def test_job_id_writes_own_journal(tmp_path, make_pdf):
+    save_dir = str(tmp_path / 'out')
+    ProcessEngine(save_dir, max_workers=1, stage_options={'stages': ['text']}, job_id='job1').run([make_pdf()])
+
+    assert BatchJournal(save_dir, 'job1').load()
+    assert not os.path.exists(BatchJournal(save_dir).path)
+
+
+def serve_files(engine, pdf_files):
+    """
+    Reicht die Dateien auf einmal ein und liefert die Ergebnisse, sobald alle fertig sind.
+    """
+    file_queue = queue.Queue()
+    for pdf_file in pdf_files:
+        file_queue.put(pdf_file)
+    stop_event = threading.Event()
+    results = []
+    server = threading.Thread(target=engine.serve,
+                              args=(file_queue, stop_event, lambda *result: results.append(result)))
+    server.start()
+    stop_event.set()
+    server.join(60)
+    assert not server.is_alive()
+    return results
+
+
+def test_serve_accepts_the_same_file_twice(tmp_path, make_pdf):
+    pdf_file = make_pdf(pages=1)
+    engine = ProcessEngine(str(tmp_path / 'out'), max_workers=2, stage_options={'stages': ['text']})
+
+    results = serve_files(engine, [pdf_file, pdf_file])
+
+    assert [(path, bool(success)) for path, success in results] == [(pdf_file, True), (pdf_file, True)]
+
+
+def test_serve_keeps_no_journal(tmp_path, make_pdf):
+    save_dir = str(tmp_path / 'out')
+    engine = ProcessEngine(save_dir, max_workers=1, stage_options={'stages': ['text']})
+
+    serve_files(engine, [make_pdf(pages=1)])
+
+    assert os.path.exists(os.path.join(save_dir, 'text', 'doc.txt'))
+    assert not os.path.exists(BatchJournal(save_dir).path)
@@ -0,0 +1,113 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic journal test file
+import zipfile
+
+import pytest
+
+from journal import BatchJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = BatchJournal(str(tmp_path))
+    journal.reset()
+    return journal
+
+
+def write(path, content):
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_completed_stages_requires_unchanged_outputs(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    text_file = write(tmp_path / 'doc.txt', 'text')
+    image_file = write(tmp_path / 'doc.png', 'image')
+    journal.record(pdf_file, 'text', [text_file])
+    journal.record(pdf_file, 'images', [image_file])
+
+    # Geänderte Größe: die Ausgabe gilt als unvollständig
+    write(tmp_path / 'doc.png', 'truncated image')
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: {'text'}}
+
+
+def test_missing_output_invalidates_stage(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    text_file = write(tmp_path / 'doc.txt', 'text')
+    journal.record(pdf_file, 'text', [text_file])
+    (tmp_path / 'doc.txt').unlink()
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: set()}
+
+
+def write_docx(path, content):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', content)
+    return str(path)
+
+
+def test_format_implies_docx(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    docx_file = write_docx(tmp_path / 'doc.docx', 'converted')
+    journal.record(pdf_file, 'docx', [docx_file])
+    # Die Formatierung überschreibt die DOCX-Datei, der Eintrag von docx passt nicht mehr
+    write_docx(tmp_path / 'doc.docx', 'converted and formatted')
+    journal.record(pdf_file, 'format', [docx_file])
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: {'docx', 'format'}}
+
+
+def test_docx_that_is_no_zip_archive_is_invalid(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    journal.record(pdf_file, 'docx', [write(tmp_path / 'doc.docx', 'kein Zip-Archiv')])
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: set()}
+
+
+def test_reset_starts_empty_journal(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    journal.record(pdf_file, 'text', [write(tmp_path / 'doc.txt', 'text')])
+    journal.reset()
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: set()}
+
+
+def test_truncated_line_does_not_swallow_next_record(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    text_file = write(tmp_path / 'doc.txt', 'text')
+    image_file = write(tmp_path / 'doc.png', 'image')
+    journal.record(pdf_file, 'text', [text_file])
+    # Absturz mitten im Schreiben einer Zeile
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"file": "/abgebrochen')
+
+    journal.seal()
+    journal.record(pdf_file, 'images', [image_file])
+
+    assert journal.completed_stages([pdf_file]) == {pdf_file: {'text', 'images'}}
+
+
+def test_seal_leaves_complete_journal_unchanged(tmp_path, journal):
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    journal.record(pdf_file, 'text', [write(tmp_path / 'doc.txt', 'text')])
+    with open(journal.path, 'rb') as f:
+        before = f.read()
+
+    journal.seal()
+
+    with open(journal.path, 'rb') as f:
+        assert f.read() == before
+
+
+def test_job_id_separates_journals(tmp_path):
+    first = BatchJournal(str(tmp_path), 'job1')
+    second = BatchJournal(str(tmp_path), 'job2')
+    pdf_file = write(tmp_path / 'doc.pdf', 'pdf')
+    first.reset()
+    first.record(pdf_file, 'text', [write(tmp_path / 'doc.txt', 'text')])
+    second.reset()
+
+    assert first.path != second.path
+    assert first.completed_stages([pdf_file]) == {pdf_file: {'text'}}
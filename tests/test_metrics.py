@@ -0,0 +1,82 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic metrics test file
+import os
+
+import pytest
+
+from metrics import METRICS_NAME, StageMetrics, profile_file
+from stages import ConversionStages
+
+
+def test_measure_records_one_line_per_stage(tmp_path):
+    metrics = StageMetrics(str(tmp_path))
+    metrics.reset()
+    with metrics.measure('doc.pdf', 'text', pages=4):
+        sum(range(10000))
+
+    entry, = metrics.load()
+
+    assert entry['stage'] == 'text'
+    assert entry['success'] is True
+    assert entry['file'] == os.path.abspath('doc.pdf')
+    assert entry['pages'] == 4
+    assert entry['wall_seconds'] >= 0
+    assert entry['wall_seconds_per_page'] == round(entry['wall_seconds'] / 4, 6)
+    for key in ('cpu_seconds', 'thread_cpu_seconds', 'child_cpu_seconds', 'peak_rss_bytes', 'pid'):
+        assert key in entry
+
+
+def test_failures_are_recorded(tmp_path):
+    metrics = StageMetrics(str(tmp_path))
+    with pytest.raises(ValueError):
+        with metrics.measure('doc.pdf', 'docx'):
+            raise ValueError("defekt")
+    with metrics.measure('doc.pdf', 'images') as outcome:
+        outcome['success'] = False
+
+    assert [entry['success'] for entry in metrics.load()] == [False, False]
+
+
+def test_job_id_writes_own_file(tmp_path):
+    StageMetrics(str(tmp_path), 'job1').record({'stage': 'text', 'wall_seconds': 1.0})
+
+    assert not os.path.exists(tmp_path / METRICS_NAME)
+    assert StageMetrics(str(tmp_path)).load() == []
+    assert len(StageMetrics(str(tmp_path), 'job1').load()) == 1
+
+
+def test_prometheus_export_sums_per_stage(tmp_path):
+    metrics = StageMetrics(str(tmp_path))
+    for success, pages in ((True, 3), (False, 2)):
+        metrics.record({'stage': 'text', 'success': success, 'pages': pages, 'wall_seconds': 1.5,
+                        'cpu_seconds': 1.0, 'child_cpu_seconds': 0.5, 'peak_rss_bytes': 100 * pages})
+
+    with open(metrics.write_prometheus(), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    assert 'pdf_magic_stage_runs_total{stage="text"} 2' in lines
+    assert 'pdf_magic_stage_failures_total{stage="text"} 1' in lines
+    assert 'pdf_magic_stage_pages_total{stage="text"} 5' in lines
+    assert 'pdf_magic_stage_wall_seconds_total{stage="text"} 3.0' in lines
+    assert 'pdf_magic_stage_peak_rss_bytes{stage="text"} 300' in lines
+    assert '# TYPE pdf_magic_stage_runs_total counter' in lines
+
+
+def test_profile_file_writes_profile_and_allocations(tmp_path):
+    with profile_file(str(tmp_path), '/some/dir/doc.pdf'):
+        [bytearray(1024) for _ in range(100)]
+
+    assert os.path.getsize(tmp_path / 'profile' / 'doc.prof') > 0
+    assert (tmp_path / 'profile' / 'doc.tracemalloc.txt').read_text(encoding='utf-8').startswith('Aktuell:')
+
+
+def test_stages_record_metrics_per_stage(tmp_path, make_pdf):
+    pdf_file = make_pdf(pages=2)
+    stages = ConversionStages(str(tmp_path / 'out'), metrics=True)
+
+    stages.process_file(pdf_file, outputs=['text'])
+
+    recorded = {entry['stage']: entry for entry in StageMetrics(str(tmp_path / 'out')).load()}
+    assert recorded['text']['success'] is True
+    assert recorded['text']['pages'] == 2
@@ -0,0 +1,107 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic Tk app test file
+import asyncio
+import importlib
+import os
+
+import pytest
+
+pytest.importorskip('tkinterdnd2')
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'converter_app')
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # Die App schreibt ihr Log beim Import und in den Workern ins aktuelle Verzeichnis
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(APP_DIR)
+    return importlib.import_module('pdf_magic')
+
+
+@pytest.fixture
+def app(app_module):
+    """
+    PDFMagicApp ohne Fenster: GUI-Aufrufe werden festgehalten statt ausgeführt.
+    """
+    app = app_module.PDFMagicApp.__new__(app_module.PDFMagicApp)
+    app.reserved_paths = set()
+    app.logs = []
+    app.posted = []
+    app.update_log = lambda message, status='info': app.logs.append((message.strip(), status.strip()))
+    app.post = lambda func, *args: app.posted.append((func.__name__, args))
+    return app
+
+
+def finished_results(app):
+    calls = [args for name, args in app.posted if name == 'finish_conversion']
+    assert len(calls) == 1
+    return calls[0][0]
+
+
+def test_conversions_never_exceed_the_limit(app, tmp_path):
+    running = {'now': 0, 'peak': 0}
+
+    async def convert_pdf_to_docx(pdf_path, output_dir, executor=None, shard_workers=1):
+        running['now'] += 1
+        running['peak'] = max(running['peak'], running['now'])
+        await asyncio.sleep(0.01)
+        running['now'] -= 1
+        return os.path.join(output_dir, os.path.basename(pdf_path) + '.docx')
+
+    app.convert_pdf_to_docx = convert_pdf_to_docx
+    pdf_paths = [str(tmp_path / f"doc{number}.pdf") for number in range(6)]
+
+    asyncio.run(app.start_conversion(pdf_paths, 'docx', 2))
+
+    assert running['peak'] == 2
+    results = finished_results(app)
+    assert [pdf_path for pdf_path, _ in results] == pdf_paths
+    assert all(docx_path for _, docx_path in results)
+
+
+def test_batch_converts_in_worker_processes(app, make_pdf):
+    pdf_paths = [make_pdf('first.pdf', pages=1), make_pdf('second.pdf', pages=2)]
+
+    asyncio.run(app.start_conversion(pdf_paths, 'docx', 2))
+
+    results = finished_results(app)
+    assert all(os.path.getsize(docx_path) > 0 for _, docx_path in results)
+    assert ('Konvertierung abgeschlossen', 'info') in app.logs
+    # Jede fertige Datei aktualisiert den Fortschrittsbalken
+    progress = [args for name, args in app.posted if name == '_show_progress']
+    assert len(progress) == 2 and progress[-1][0]['done'] == 2
+
+
+def test_same_name_in_one_batch_gets_distinct_paths(app, tmp_path):
+    first = app._reserve_docx_path(str(tmp_path / 'a' / 'doc.pdf'), str(tmp_path))
+    second = app._reserve_docx_path(str(tmp_path / 'b' / 'doc.pdf'), str(tmp_path))
+
+    assert first == str(tmp_path / 'doc.docx')
+    assert second == str(tmp_path / 'doc(1).docx')
+
+
+def test_failed_optimization_keeps_the_docx(app, app_module, make_pdf, tmp_path, monkeypatch):
+    def broken(docx_path):
+        raise ValueError("defektes document.xml")
+
+    monkeypatch.setattr(app_module, 'optimize_docx_xml', broken)
+    # Ohne Executor laufen beide Schritte im Thread-Pool des Loops, die Attrappe greift also
+    docx_path = asyncio.run(app.convert_pdf_to_docx(make_pdf(pages=1), str(tmp_path)))
+
+    assert docx_path == str(tmp_path / 'doc.docx') and os.path.getsize(docx_path) > 0
+    assert ('Optimiere Dokument: doc.docx', 'bearbeiten') in app.logs
+    assert ('Fehler bei der Optimierung der DOCX-Datei: defektes document.xml', 'Fehler') in app.logs
+    assert ('Konvertierung in DOCX abgeschlossen: doc.docx', 'erfolgreich') in app.logs
+
+
+def test_optimization_is_logged(app, make_pdf, tmp_path):
+    asyncio.run(app.convert_pdf_to_docx(make_pdf(pages=1), str(tmp_path)))
+
+    assert [message for message, _ in app.logs] == [
+        'Starte Konvertierung in DOCX: doc.pdf',
+        'Optimiere Dokument: doc.docx',
+        'Dokument optimiert: doc.docx',
+        'Konvertierung in DOCX abgeschlossen: doc.docx',
+    ]
@@ -0,0 +1,87 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic pipeline test file
+import threading
+
+import pytest
+
+from pipeline import Pipeline, Stage
+
+
+def test_all_items_pass_through_all_stages():
+    pipeline = Pipeline([Stage('double', lambda x: x * 2, workers=3),
+                         Stage('increment', lambda x: x + 1, workers=2)])
+
+    assert sorted(pipeline.run(range(50))) == [x * 2 + 1 for x in range(50)]
+
+
+def test_none_drops_item():
+    pipeline = Pipeline([Stage('even', lambda x: x if x % 2 == 0 else None), Stage('keep', lambda x: x)])
+
+    assert sorted(pipeline.run(range(10))) == [0, 2, 4, 6, 8]
+
+
+def test_error_in_stage_is_raised_and_stops_source():
+    consumed = []
+
+    def source():
+        for item in range(1000):
+            consumed.append(item)
+            yield item
+
+    def fail(item):
+        if item == 5:
+            raise RuntimeError('Seite 5 defekt')
+        return item
+
+    threads_before = threading.active_count()
+    pipeline = Pipeline([Stage('fail', fail, workers=2), Stage('keep', lambda x: x, workers=2)])
+
+    with pytest.raises(RuntimeError, match='Seite 5 defekt'):
+        pipeline.run(source())
+    # Gegendruck und Abbruch: die Quelle wurde nicht bis zum Ende gelesen
+    assert len(consumed) < 1000
+    # Alle Worker-Threads sind beendet
+    assert threading.active_count() == threads_before
+
+
+def test_error_in_source_is_raised_after_workers_stop():
+    def source():
+        yield 1
+        raise ValueError('Quelle defekt')
+
+    threads_before = threading.active_count()
+    pipeline = Pipeline([Stage('keep', lambda x: x)])
+
+    with pytest.raises(ValueError, match='Quelle defekt'):
+        pipeline.run(source())
+    assert threading.active_count() == threads_before
+
+
+def test_queue_size_bounds_items_in_flight():
+    release = threading.Event()
+    produced = []
+
+    def source():
+        for item in range(20):
+            produced.append(item)
+            yield item
+
+    def wait(item):
+        release.wait()
+        return item
+
+    pipeline = Pipeline([Stage('wait', wait, workers=1, queue_size=2)])
+    runner = threading.Thread(target=lambda: pipeline.run(source()))
+    runner.start()
+    runner.join(0.5)
+    # Ein Element in Arbeit, zwei in der Queue, eines wartet beim put()
+    assert len(produced) <= 4
+    release.set()
+    runner.join()
+    assert len(produced) == 20
+
+
+def test_stage_requires_worker():
+    with pytest.raises(ValueError):
+        Stage('empty', lambda x: x, workers=0)
@@ -0,0 +1,102 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic progress test file
+import queue
+
+from engine import ProcessEngine
+from progress import BatchProgress, ProgressTracker, QueueReporter, apply_message
+
+
+def make_file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+def test_pages_count_once_all_stages_are_done(tmp_path):
+    pdf_file = make_file(tmp_path, 'doc.pdf', 100)
+    tracker = ProgressTracker([pdf_file])
+    tracker.start(pdf_file, page_count=4, stage_count=2)
+    tracker.advance(pdf_file, 'docx', 4)
+    tracker.advance(pdf_file, 'text', 2)
+
+    pages_done, page_count, fraction = tracker.file_progress(pdf_file)
+
+    assert (pages_done, page_count, fraction) == (3.0, 4, 0.75)
+    assert tracker.snapshot().pages_total == 4
+
+
+def test_batch_percent_is_weighted_by_file_size(tmp_path):
+    small = make_file(tmp_path, 'small.pdf', 100)
+    large = make_file(tmp_path, 'large.pdf', 300)
+    tracker = ProgressTracker([small, large])
+    tracker.finish(small)
+
+    snapshot = tracker.snapshot()
+
+    assert snapshot.percent == 25.0
+    assert snapshot.files_done == 1
+    # Die Seitenzahl der zweiten Datei ist noch unbekannt
+    assert snapshot.pages_total is None
+
+
+def test_eta_follows_throughput():
+    progress = BatchProgress(files_done=1, files_total=2, pages_done=10, pages_total=20,
+                             bytes_done=100, bytes_total=400, elapsed=10.0)
+
+    assert progress.bytes_per_second == 10.0
+    assert progress.eta_seconds == 30.0
+    assert progress.to_dict()['pages_per_second'] == 1.0
+
+
+def test_eta_unknown_before_any_progress_and_zero_when_done():
+    assert BatchProgress(0, 1, 0, None, 0, 100, 5.0).eta_seconds is None
+    assert BatchProgress(1, 1, 3, 3, 100, 100, 5.0).eta_seconds == 0.0
+
+
+def test_reports_are_throttled_except_when_a_file_finishes(tmp_path):
+    pdf_file = make_file(tmp_path, 'doc.pdf', 100)
+    reports = []
+    tracker = ProgressTracker([pdf_file], reports.append, interval=3600)
+    tracker.start(pdf_file, 10, 1)
+    tracker.advance(pdf_file, 'text', 5)
+    tracker.finish(pdf_file)
+
+    assert len(reports) == 2
+    assert reports[-1].percent == 100.0
+
+
+def test_queue_reporter_messages_reach_the_tracker(tmp_path):
+    pdf_file = make_file(tmp_path, 'doc.pdf', 100)
+    tracker = ProgressTracker([pdf_file])
+    messages = queue.Queue()
+    reporter = QueueReporter(messages)
+    reporter.start(pdf_file, 2, 1)
+    reporter.advance(pdf_file, 'text', 1)
+    while not messages.empty():
+        apply_message(tracker, messages.get())
+
+    assert tracker.file_progress(pdf_file) == (1.0, 2, 0.5)
+
+
+def test_discard_forgets_finished_files(tmp_path):
+    pdf_file = make_file(tmp_path, 'doc.pdf', 100)
+    tracker = ProgressTracker([])
+    tracker.add(pdf_file)
+    tracker.start(pdf_file, 3, 1)
+    tracker.discard(pdf_file)
+
+    assert tracker.snapshot().files_total == 0
+
+
+def test_engine_reports_page_progress(tmp_path, make_pdf):
+    pdf_files = [make_pdf('first.pdf', pages=2), make_pdf('second.pdf', pages=3)]
+    reports = []
+    engine = ProcessEngine(str(tmp_path / 'out'), max_workers=1, stage_options={'stages': ['text']})
+
+    engine.run(pdf_files, on_progress=reports.append)
+
+    # Seitenmeldungen laufen über eine eigene Queue und können nach dem Dateiende eintreffen
+    assert all(report.files_total == 2 for report in reports)
+    assert reports[-1].files_done == 2
+    assert reports[-1].percent == 100.0
@@ -0,0 +1,74 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic service test file
+import http.client
+import io
+import os
+import threading
+
+import pytest
+
+import service
+from service import JobManager, ServiceError, create_server
+
+
+class BrokenEngine:
+    """
+    Nimmt die erste Datei an und bricht dann ab.
+    """
+
+    def serve(self, file_queue, stop_event, on_result=None, tracker=None):
+        file_queue.get()
+        raise RuntimeError("Pool defekt")
+
+
+def test_failing_engine_fails_open_jobs_and_rejects_new_ones(tmp_path):
+    failures = []
+    manager = JobManager(str(tmp_path), lambda save_dir: BrokenEngine(), on_failure=lambda: failures.append(True))
+    manager.start()
+    job = manager.submit_upload('doc.pdf', io.BytesIO(b'%PDF-1.4'), 8)
+    manager.worker.join(10)
+
+    assert failures == [True]
+    assert isinstance(manager.error, RuntimeError)
+    assert manager.get(job.id).state == 'failed'
+    with pytest.raises(ServiceError) as excinfo:
+        manager.submit_upload('other.pdf', io.BytesIO(b'%PDF-1.4'), 8)
+    assert excinfo.value.status == 503
+
+
+class IdleEngine:
+    def serve(self, file_queue, stop_event, on_result=None, tracker=None):
+        stop_event.wait()
+
+
+def test_error_during_download_aborts_instead_of_sending_json(tmp_path, monkeypatch):
+    manager = JobManager(str(tmp_path), lambda save_dir: IdleEngine())
+    manager.start()
+    job = manager.submit_upload('doc.pdf', io.BytesIO(b'%PDF-1.4'), 8)
+    text_file = os.path.join(manager.output_dir, 'text', f"{job.id}.txt")
+    os.makedirs(os.path.dirname(text_file))
+    with open(text_file, 'wb') as f:
+        f.write(b'x' * 100)
+    job.outputs = [f"text/{job.id}.txt"]
+    job.state = 'done'
+
+    def broken_copy(source, target, length=0):
+        target.write(source.read(10))
+        raise OSError("Lesefehler")
+
+    monkeypatch.setattr(service.shutil, 'copyfileobj', broken_copy)
+    server = create_server(manager, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+        connection.request('GET', f"/jobs/{job.id}/files/text/{job.id}.txt")
+        response = connection.getresponse()
+        assert response.status == 200
+        with pytest.raises(http.client.IncompleteRead) as excinfo:
+            response.read()
+        assert excinfo.value.partial == b'x' * 10
+    finally:
+        server.shutdown()
+        server.server_close()
+        manager.stop()
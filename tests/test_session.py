@@ -0,0 +1,65 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic session test file
+import os
+
+import session as session_module
+from session import DocumentSession
+
+
+def fake_renderers(monkeypatch):
+    """
+    Ersetzt das Rendern durch Attrappen, die jede gerasterte Seite festhalten.
+    """
+    rendered = []
+
+    def encode_pages(pdf_file, output_dir, options, page_count=None, on_pages=None):
+        os.makedirs(output_dir, exist_ok=True)
+        rendered.extend(range(1, page_count + 1))
+        return [os.path.join(output_dir, f"page_{number}.png") for number in range(1, page_count + 1)]
+
+    def render_to_files(pdf_file, output_dir, page_count=None, first_page=1, last_page=None):
+        rendered.extend(range(first_page, last_page + 1))
+        return [os.path.join(output_dir, f"page_{number}.png") for number in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(session_module, 'encode_pages', encode_pages)
+    monkeypatch.setattr(session_module, 'render_to_files', render_to_files)
+    return rendered
+
+
+def test_ocr_before_images_uses_the_planned_full_render(monkeypatch, make_pdf, tmp_path):
+    rendered = fake_renderers(monkeypatch)
+    images_dir = str(tmp_path / 'images')
+    with DocumentSession(make_pdf(pages=4)) as session:
+        session.plan_full_render(images_dir)
+        selected = dict(session.iter_selected_pages([2, 4]))
+        page_files = session.render_pages(images_dir)
+    assert sorted(rendered) == [1, 2, 3, 4]
+    assert selected == {2: page_files[1], 4: page_files[3]}
+    assert os.path.dirname(page_files[0]) == images_dir
+
+
+def test_images_before_ocr_shares_the_pages(monkeypatch, make_pdf, tmp_path):
+    rendered = fake_renderers(monkeypatch)
+    images_dir = str(tmp_path / 'images')
+    with DocumentSession(make_pdf(pages=3)) as session:
+        session.plan_full_render(images_dir)
+        page_files = session.render_pages(images_dir)
+        selected = session.render_selected_pages([3])
+    assert sorted(rendered) == [1, 2, 3]
+    assert selected == {3: page_files[2]}
+
+
+def test_without_plan_only_selected_pages_are_rendered(monkeypatch, make_pdf):
+    rendered = fake_renderers(monkeypatch)
+    with DocumentSession(make_pdf(pages=5)) as session:
+        session.render_selected_pages([2, 3])
+    assert rendered == [2, 3]
+
+
+def test_plan_is_ignored_for_pages_the_ocr_cannot_use(monkeypatch, make_pdf, tmp_path):
+    rendered = fake_renderers(monkeypatch)
+    with DocumentSession(make_pdf(pages=3)) as session:
+        session.plan_full_render(str(tmp_path / 'images'), {'fmt': 'jpeg'})
+        session.render_selected_pages([1])
+    assert rendered == [1]
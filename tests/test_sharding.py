@@ -0,0 +1,63 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic sharding test file
+import docx
+import pytest
+from docx.enum.section import WD_ORIENT
+
+from sharding import MAX_SHARD_PAGES, MIN_SHARD_PAGES, merge_docx, plan_shards
+
+
+@pytest.mark.parametrize('page_count, workers', [(1, 4), (60, 4), (250, 2), (1000, 8), (5000, 4)])
+def test_plan_shards_covers_all_pages_in_order(page_count, workers):
+    shards = plan_shards(page_count, workers)
+
+    assert shards[0][0] == 0
+    assert shards[-1][1] == page_count
+    assert all(end == start for (_, end), (start, _) in zip(shards, shards[1:]))
+    # Bis auf den letzten Bereich liegen alle Bereiche innerhalb der Grenzen
+    assert all(MIN_SHARD_PAGES <= end - start <= MAX_SHARD_PAGES for start, end in shards[:-1])
+
+
+def test_plan_shards_gives_each_worker_about_two_shards():
+    assert len(plan_shards(400, workers=4)) == 8
+
+
+def test_plan_shards_respects_custom_limits():
+    assert plan_shards(100, workers=1, min_pages=25, max_pages=40) == [(0, 40), (40, 80), (80, 100)]
+
+
+def make_shard(path, texts, landscape=False):
+    document = docx.Document()
+    for text in texts:
+        document.add_paragraph(text)
+    if landscape:
+        section = document.sections[-1]
+        section.orientation = WD_ORIENT.LANDSCAPE
+        section.page_width, section.page_height = section.page_height, section.page_width
+    document.save(str(path))
+    return str(path)
+
+
+def test_merge_docx_keeps_order_and_sections(tmp_path):
+    shards = [make_shard(tmp_path / 'shard_0.docx', ['Seite 1', 'Seite 2']),
+              make_shard(tmp_path / 'shard_1.docx', ['Seite 3'], landscape=True)]
+    merged_file = tmp_path / 'merged.docx'
+
+    merge_docx(shards, str(merged_file))
+
+    merged = docx.Document(str(merged_file))
+    assert [p.text for p in merged.paragraphs if p.text] == ['Seite 1', 'Seite 2', 'Seite 3']
+    # Jeder Teil behält seinen Abschnitt, der letzte die Seiteneinstellungen des letzten Teils
+    assert len(merged.sections) == 2
+    assert merged.sections[0].orientation == WD_ORIENT.PORTRAIT
+    assert merged.sections[-1].orientation == WD_ORIENT.LANDSCAPE
+
+
+def test_merge_single_shard_copies_file(tmp_path):
+    shard = make_shard(tmp_path / 'shard_0.docx', ['Einzig'])
+    merged_file = tmp_path / 'merged.docx'
+
+    merge_docx([shard], str(merged_file))
+
+    assert merged_file.read_bytes() == (tmp_path / 'shard_0.docx').read_bytes()
@@ -0,0 +1,124 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic stages test file
+import threading
+
+import pytest
+
+from stages import STAGE_GRAPH, STAGES, ConversionStages, FileResult, find_name_collisions, select_stages
+
+
+class FakeSession:
+    page_count = 4
+
+
+class RecordingStages(ConversionStages):
+    """
+    Ersetzt die Schritte durch Attrappen, die ihre Start- und Endreihenfolge festhalten.
+    """
+
+    def __init__(self, save_dir, failing=(), **kwargs):
+        super().__init__(save_dir, **kwargs)
+        self.failing = set(failing)
+        self.events = []
+        self.lock = threading.Lock()
+
+    def _fake_stage(self, stage):
+        with self.lock:
+            self.events.append(('start', stage))
+        if stage in self.failing:
+            return None
+        with self.lock:
+            self.events.append(('end', stage))
+        return f"{stage}-value", []
+
+    def _stage_docx(self, pdf_file, session, result):
+        return self._fake_stage('docx')
+
+    def _stage_format(self, pdf_file, session, result):
+        # Die Formatierung sieht das Ergebnis ihrer Voraussetzung
+        assert result.values['docx'] == 'docx-value'
+        return self._fake_stage('format')
+
+    def _stage_images(self, pdf_file, session, result):
+        return self._fake_stage('images')
+
+    def _stage_text(self, pdf_file, session, result):
+        return self._fake_stage('text')
+
+
+def run_graph(stages, pending, done_stages=()):
+    result = FileResult('doc.pdf', pending)
+    stages._run_graph('doc.pdf', FakeSession(), list(pending), set(done_stages), result)
+    return result
+
+
+def test_select_stages_defaults_to_all_stages():
+    assert select_stages() == STAGES
+
+
+def test_select_stages_adds_dependencies_in_stage_order():
+    assert select_stages(['text', 'format']) == ('docx', 'format', 'text')
+
+
+def test_select_stages_rejects_unknown_stage():
+    with pytest.raises(ValueError):
+        select_stages(['docx', 'ocr'])
+
+
+def test_stage_graph_dependencies_are_known_stages():
+    for stage, dependencies in STAGE_GRAPH.items():
+        assert set(dependencies) <= set(STAGES)
+        # Voraussetzungen stehen in STAGES vor dem abhängigen Schritt
+        assert all(STAGES.index(dependency) < STAGES.index(stage) for dependency in dependencies)
+
+
+def test_run_graph_starts_stage_after_its_dependency(tmp_path):
+    stages = RecordingStages(str(tmp_path))
+    result = run_graph(stages, STAGES)
+
+    assert stages.events.index(('end', 'docx')) < stages.events.index(('start', 'format'))
+    assert sorted(result.values) == sorted(STAGES)
+    assert result.success
+
+
+def test_run_graph_skips_dependents_of_failed_stage(tmp_path):
+    stages = RecordingStages(str(tmp_path), failing=['docx'])
+    result = run_graph(stages, STAGES)
+
+    assert ('start', 'format') not in stages.events
+    assert set(result.failed) == {'docx', 'format'}
+    assert result.values.keys() == {'images', 'text'}
+    assert not result
+
+
+def test_run_graph_uses_dependency_done_in_previous_run(tmp_path):
+    stages = RecordingStages(str(tmp_path))
+    # Nach einem fortgesetzten Batch liefert der Schritt docx keinen Wert, format läuft trotzdem
+    stages._stage_format = lambda pdf_file, session, result: stages._fake_stage('format')
+    run_graph(stages, ['format'], done_stages=['docx'])
+
+    assert stages.events == [('start', 'format'), ('end', 'format')]
+
+
+def test_run_graph_stops_scheduling_after_cancel(tmp_path):
+    from stages import ConversionCancelled
+    cancel_event = threading.Event()
+    stages = RecordingStages(str(tmp_path), cancel_event=cancel_event)
+    stages._stage_docx = lambda pdf_file, session, result: cancel_event.set() or stages._fake_stage('docx')
+
+    with pytest.raises(ConversionCancelled):
+        run_graph(stages, ['docx', 'format'])
+    assert ('start', 'format') not in stages.events
+
+
+def test_find_name_collisions_reports_same_basename_only(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    first = str(tmp_path / 'a' / 'report.pdf')
+    second = str(tmp_path / 'b' / 'report.pdf')
+    other = str(tmp_path / 'a' / 'other.pdf')
+
+    assert find_name_collisions([first, other, second]) == {'report': [first, second]}
+    # Derselbe Pfad zweimal ist keine Kollision
+    assert find_name_collisions([first, first]) == {}
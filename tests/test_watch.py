@@ -0,0 +1,21 @@
+# Autor: Leon Gajtner
+# Datum: 18.10.2026
+# Projekt: PDF Magic watch test file
+import threading
+
+from watch import HotFolder
+
+
+class BrokenEngine:
+    def serve(self, file_queue, stop_event, on_result=None, tracker=None):
+        raise RuntimeError("Pool defekt")
+
+
+def test_failing_engine_stops_the_watcher(tmp_path):
+    hot_folder = HotFolder([str(tmp_path / 'in')], BrokenEngine(), settle=0.1)
+    watcher = threading.Thread(target=hot_folder.run, daemon=True)
+    watcher.start()
+    watcher.join(10)
+
+    assert not watcher.is_alive()
+    assert isinstance(hot_folder.error, RuntimeError)